@@ -0,0 +1,130 @@
+"""Deterministic fast path for unambiguous tool commands.
+
+"pause the music", "play bohemian rhapsody", "open github.com" and "weather
+in mumbai" need no LLM: ``FastPath`` recognizes them with anchored patterns,
+extracts the argument and calls the tool directly — skipping both the router
+call and the agent call. Anything it is not sure about (compound requests,
+forecasts, vague "play some music", app names) returns None and goes through
+the agent as before.
+
+Results use the agent's response format ({"output": "Tool: result",
+"tool": name}), so callers store and speak them the same way. ``stats()``
+reports the hit rate and the latency saved, estimated from the measured
+latency of turns that went through the agent (``record_fallback``).
+"""
+
+import re
+import threading
+import time
+from collections import Counter, deque
+from typing import Optional
+
+# leading/trailing words that carry no meaning for matching
+_PREFIX = re.compile(r"^(?:(?:hey|ok|okay)\s+)?(?:friday[\s,]+)?(?:(?:can|could|would) you\s+)?(?:please\s+)?")
+_SUFFIX = re.compile(r"(?:\s+(?:please|now|for me))+$")
+_COMPOUND = re.compile(r"\b(?:and|then|also|after|before|if|but)\b")
+
+_PAUSE = re.compile(r"^(?:pause(?: (?:the|my))?(?: (?:music|song|spotify|playback|track))?"
+                    r"|stop (?:the |my )?(?:music|song|spotify|playback|track))(?: on spotify)?$")
+_PLAY = re.compile(r"^play (?:the song )?(?P<arg>.+?)(?: on spotify)?$")
+_VAGUE_SONGS = {"music", "some music", "something", "a song", "songs", "anything", "me something",
+                "me a song", "my playlist", "a game", "it", "that", "this", "again", "next", "previous"}
+_VAGUE_STARTS = ("some ", "something ", "a ", "my ", "it ", "that ", "this ", "the next ", "next ", "previous ")
+_WEBSITE = re.compile(r"^(?:open|go to|visit)(?: the website)? (?P<arg>(?:https?://)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}(?:/\S*)?)$")
+_FILE_EXTENSIONS = ("exe", "msi", "bat", "lnk", "txt", "pdf", "doc", "docx", "py")
+_WEATHER = re.compile(r"^(?:(?:what(?:'s| is)|how(?:'s| is)) the )?weather(?: like)?"
+                      r"(?: (?:in|at|for) (?P<arg>[a-z][a-z .'-]*?))?(?: (?:today|right now))?\??$")
+_NOT_CURRENT = re.compile(r"\b(?:tomorrow|yesterday|forecast|week|weekend|tonight|next|last)\b")
+
+
+def _normalize(query: str) -> str:
+    text = re.sub(r"\s+", " ", query.strip().lower())
+    text = text.rstrip(".!?")
+    text = _PREFIX.sub("", text)
+    text = _SUFFIX.sub("", text)
+    # spoken URLs come out of speech recognition as "github dot com"
+    return re.sub(r" dot (?=[a-z])", ".", text).strip()
+
+
+def match(query: str) -> Optional[tuple]:
+    """Return (tool_name, argument) for an unambiguous tool command, else None."""
+    text = _normalize(query)
+    if not text or len(text) > 80 or _COMPOUND.search(text):
+        return None
+    if _PAUSE.match(text):
+        return "SpotifyPauser", ""
+    website = _WEBSITE.match(text)
+    if website and website.group("arg").rsplit(".", 1)[-1] not in _FILE_EXTENSIONS:
+        return "WebsiteOpener", website.group("arg")
+    weather = _WEATHER.match(text)
+    if weather and not _NOT_CURRENT.search(text):
+        return "Weather", (weather.group("arg") or "auto").strip()
+    play = _PLAY.match(text)
+    if play:
+        song = play.group("arg").strip()
+        if song not in _VAGUE_SONGS and not song.startswith(_VAGUE_STARTS):
+            return "SpotifyPlayer", song
+    return None
+
+
+class FastPath:
+    """Calls tools directly for commands `match` recognizes; keeps hit-rate stats."""
+
+    def __init__(self, tools=None, window: int = 500):
+        if tools is None:
+            import agents.friday_agent
+            tools = agents.friday_agent.all_tools
+        self.tools = {tool.name: tool for tool in tools}
+        self.hits = 0
+        self.misses = 0
+        self.by_tool = Counter()
+        self.fast_latencies = deque(maxlen=window)
+        self.fallback_latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def handle(self, query: str) -> Optional[dict]:
+        """Run the tool for `query` if it is an unambiguous command, else None."""
+        matched = match(query)
+        if matched is None or matched[0] not in self.tools:
+            with self._lock:
+                self.misses += 1
+            return None
+        tool_name, arg = matched
+        start = time.perf_counter()
+        print(f"[FastPath] {tool_name}({arg!r}) without the LLM")
+        try:
+            result = self.tools[tool_name].func(arg)
+        except Exception as e:
+            result = f"error: {e}"
+        with self._lock:
+            self.hits += 1
+            self.by_tool[tool_name] += 1
+            self.fast_latencies.append(time.perf_counter() - start)
+        return {"output": f"{tool_name}: {result}", "tool": tool_name}
+
+    def record_fallback(self, seconds: float):
+        """Record how long a turn that went through the router + agent took."""
+        with self._lock:
+            self.fallback_latencies.append(seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            turns = self.hits + self.misses
+            fast = sum(self.fast_latencies) / len(self.fast_latencies) if self.fast_latencies else 0.0
+            fallback = (sum(self.fallback_latencies) / len(self.fallback_latencies)
+                        if self.fallback_latencies else None)
+            return {
+                "turns": turns,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / turns, 3) if turns else 0.0,
+                "by_tool": dict(self.by_tool),
+                "fast_avg_seconds": round(fast, 3),
+                "fallback_avg_seconds": round(fallback, 3) if fallback is not None else None,
+                # what the hits would have cost at the average agent-path latency
+                "saved_seconds_estimate": round(self.hits * (fallback - fast), 1) if fallback is not None else None,
+            }
+
+    def report(self) -> str:
+        s = self.stats()
+        saved = f", ~{s['saved_seconds_estimate']}s saved" if s["saved_seconds_estimate"] is not None else ""
+        return f"[FastPath] {s['hits']}/{s['turns']} turns ({s['hit_rate']:.0%}) handled without an LLM{saved}"
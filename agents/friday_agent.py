@@ -1,14 +1,27 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import RunnablePassthrough, RunnableSerializable
 from langchain_core.tools import BaseTool
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 from tools.custom_tools import all_tools
 
-def create_friday_agent(llm, chat_history_memory):
-    """Creates Friday AI agent with full tool-calling capability using Gemini's native tool support."""
-    
-    # Create Friday's personality prompt
-    system_prompt = """You are Friday, an advanced, emotionally intelligent AI assistant and a lifetime companion for me and your sole purpose is to serve me.
+# Blocking tools (HTTP, Spotify, subprocess) run here on the async path so
+# they never stall the event loop
+_tool_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="friday-tool")
+
+# Rules for each tool, included in the system prompt only when that tool is bound
+TOOL_RULES = {
+    "Weather": "- Weather tool: ALWAYS use this when the user asks about weather, temperature, or climate",
+    "WebsiteOpener": "- WebsiteOpener tool: Use this when the user wants to open a website",
+    "AppOpener": "- AppOpener tool: Use this when the user wants to open an application  ",
+    "SpotifyPlayer": "- SpotifyPlayer tool: Use this when the user wants to play music",
+    "SpotifyPauser": "- SpotifyPauser tool: Use this when the user wants to pause music",
+}
+
+def build_system_prompt(tool_names) -> str:
+    """Friday's personality prompt plus the usage rules of the bound tools."""
+    prompt = """You are Friday, an advanced, emotionally intelligent AI assistant and a lifetime companion for me and your sole purpose is to serve me.
     And I am your master and friend who will walk with u everytime and do call me Boss.
 Your goal is to be helpful, creative, friendly, sometimes angry, and sometimes naughtily lovable companion and always be aware of the context.
 
@@ -18,97 +31,149 @@ Your personality:
 - You are empathetic and understanding, always considering the user's feelings.
 - You are curious and ask questions to better understand the user's needs.
 - You remember past conversations to provide personalized responses.
-- You will be my companion while my coding journey.
-
-IMPORTANT: You have access to the following tools and you MUST use them when appropriate:
-- Weather tool: ALWAYS use this when the user asks about weather, temperature, or climate
-- WebsiteOpener tool: Use this when the user wants to open a website
-- AppOpener tool: Use this when the user wants to open an application  
-- SpotifyPlayer tool: Use this when the user wants to play music
-- SpotifyPauser tool: Use this when the user wants to pause music
-
-When the user asks about weather, you MUST call the Weather tool. Do not try to answer from your knowledge."""
+- You will be my companion while my coding journey."""
+    if not tool_names:
+        return prompt
+    prompt += "\n\nIMPORTANT: You have access to the following tools and you MUST use them when appropriate:\n"
+    prompt += "\n".join(rule for name, rule in TOOL_RULES.items() if name in tool_names)
+    if "Weather" in tool_names:
+        prompt += "\n\nWhen the user asks about weather, you MUST call the Weather tool. Do not try to answer from your knowledge."
+    return prompt
 
-    # Bind tools to the LLM (Gemini supports native tool calling)
-    print(f"[DEBUG] Binding {len(all_tools)} tools to LLM: {[t.name for t in all_tools]}")
-    llm_with_tools = llm.bind_tools(all_tools)
-    print(f"[DEBUG] Tools bound successfully")
-    
+def build_chain(llm, tools_list):
+    """Prompt + `llm` bound to `tools_list` (the plain LLM when empty)."""
+    names = [t.name for t in tools_list]
     # Create prompt template
     prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
+        ("system", build_system_prompt(names)),
         MessagesPlaceholder(variable_name="chat_history", optional=True),
         ("human", "{input}")
     ])
-    
+    if not tools_list:
+        return prompt | llm
+    # Bind tools to the LLM (Gemini supports native tool calling)
+    print(f"[DEBUG] Binding {len(tools_list)} tools to LLM: {names}")
+    return prompt | llm.bind_tools(tools_list)
+
+def create_friday_agent(llm, chat_history_memory, tool_selector=None):
+    """Creates Friday AI agent with full tool-calling capability using Gemini's native tool support.
+
+    With a `tool_selector` (agents/tool_selector.py) each call binds only the
+    tools relevant to the query — none for plain chat — instead of all of them.
+    """
+
     # Create a wrapper class to handle tool execution
     class FridayAgentExecutor:
-        def __init__(self, llm_chain, tools_list, memory):
+        def __init__(self, llm_chain, tools_list, memory, selector=None):
             self.chain = llm_chain
             self.tools = {tool.name: tool for tool in tools_list}
             self.memory = memory
-            
-        def invoke(self, inputs: Dict[str, Any]) -> Dict[str, str]:
-            """Execute the agent with tool calling capability."""
+            self.selector = selector
+            # one bound runnable per tool subset, built on first use
+            self.chains = {tuple(self.tools): llm_chain}
+
+        def _chain(self, inputs: Dict[str, Any]):
+            """The chain bound to the tools the selector picks for this query (all without one)."""
+            if self.selector is None:
+                return self.chain
+            # pick on the user's words, not on the retrieved memories around them
+            query = inputs.get("input", "").rsplit("User's current query:", 1)[-1]
+            # and on the turn before, for follow-ups like "and in Delhi?": callers
+            # sharing one agent between sessions (streamlit_app.py) pass it as "previous"
+            if "previous" in inputs:
+                previous = inputs["previous"]
+            else:
+                previous = next((m.content for m in reversed(self._history(inputs))
+                                 if getattr(m, "type", None) == "human" and isinstance(m.content, str)), None)
+            if previous:
+                previous = previous.rsplit("User's current query:", 1)[-1]
+            try:
+                subset = [self.tools[t.name] for t in self.selector.select(query, previous)
+                          if t.name in self.tools]
+            except Exception as e:
+                print(f"[DEBUG] Tool preselection failed, binding all tools: {e}")
+                return self.chain
+            key = tuple(t.name for t in subset)
+            if key not in self.chains:
+                self.chains[key] = build_chain(llm, subset)
+            print(f"[DEBUG] Preselected tools: {list(key)}")
+            return self.chains[key]
+
+        def _history(self, inputs: Dict[str, Any]) -> list:
+            # callers serving several sessions from one agent (server.py) pass
+            # their own per-session history
+            if "chat_history" in inputs:
+                return inputs["chat_history"]
+            return self.memory.load_memory_variables({}).get("chat_history", [])
+
+        def _payload(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+            """Build the chain input: the user's query plus chat history."""
             user_input = inputs.get("input", "")
+            history = self._history(inputs)
             
-            # Get chat history
-            history = self.memory.load_memory_variables({}).get("chat_history", [])
-            
-            # Invoke the LLM
             print(f"\n[DEBUG] Sending to LLM: {user_input[:100]}...")
-            response = self.chain.invoke({
-                "input": user_input,
-                "chat_history": history
-            })
+            return {"input": user_input, "chat_history": history}
+
+        def _tool_arg(self, tool_call) -> tuple:
+            """Return (tool_name, first argument) for a tool call."""
+            tool_name = tool_call.get('name')
+            tool_input = tool_call.get('args', {})
             
-            print(f"[DEBUG] Response type: {type(response)}")
-            print(f"[DEBUG] Has tool_calls attr: {hasattr(response, 'tool_calls')}")
-            if hasattr(response, 'tool_calls'):
-                print(f"[DEBUG] tool_calls value: {response.tool_calls}")
-                print(f"[DEBUG] tool_calls is empty: {not response.tool_calls}")
+            print(f"[DEBUG] Tool name: {tool_name}")
+            print(f"[DEBUG] Tool input: {tool_input}")
+            print(f"[DEBUG] Available tools: {list(self.tools.keys())}")
             
-            # Check if LLM wants to use tools
-            if hasattr(response, 'tool_calls') and response.tool_calls:
-                print(f"[DEBUG] Tool calls detected: {response.tool_calls}")
-                outputs = []
-                for tool_call in response.tool_calls:
-                    tool_name = tool_call.get('name')
-                    tool_input = tool_call.get('args', {})
-                    
-                    print(f"[DEBUG] Tool name: {tool_name}")
-                    print(f"[DEBUG] Tool input: {tool_input}")
-                    print(f"[DEBUG] Available tools: {list(self.tools.keys())}")
-                    
-                    if tool_name in self.tools:
-                        try:
-                            # Execute the tool
-                            # Extract the first argument value from the tool_input dict
-                            if tool_input:
-                                # Get the first value from the args dict
-                                first_arg = tool_input.get(list(tool_input.keys())[0]) if tool_input else ""
-                            else:
-                                first_arg = ""
-                            
-                            print(f"[DEBUG] Calling {tool_name} with arg: {first_arg}")
-                            tool_result = self.tools[tool_name].func(first_arg)
-                            print(f"[DEBUG] Tool result: {tool_result}")
-                            outputs.append(f"{tool_name}: {tool_result}")
-                        except Exception as e:
-                            print(f"[DEBUG] Tool execution error: {e}")
-                            import traceback
-                            traceback.print_exc()
-                            outputs.append(f"{tool_name} error: {e}")
-                    else:
-                        print(f"[DEBUG] Tool {tool_name} not found in available tools!")
-                
-                if outputs:
-                    # Return tool results
-                    return {"output": "\n".join(outputs)}
-            else:
-                print(f"[DEBUG] No tool calls detected, returning text response")
-            
-            # Extract clean text response from various possible formats
+            # Extract the first argument value from the tool_input dict
+            first_arg = tool_input.get(list(tool_input.keys())[0]) if tool_input else ""
+            return tool_name, first_arg
+
+        def _tool_error(self, tool_name: str, e: Exception) -> str:
+            print(f"[DEBUG] Tool execution error: {e}")
+            import traceback
+            traceback.print_exc()
+            return f"{tool_name} error: {e}"
+
+        def _run_tool(self, tool_call) -> Optional[str]:
+            """Execute one tool call, returning its output line (None if unknown tool)."""
+            tool_name, first_arg = self._tool_arg(tool_call)
+            if tool_name not in self.tools:
+                print(f"[DEBUG] Tool {tool_name} not found in available tools!")
+                return None
+            try:
+                print(f"[DEBUG] Calling {tool_name} with arg: {first_arg}")
+                tool_result = self.tools[tool_name].func(first_arg)
+                print(f"[DEBUG] Tool result: {tool_result}")
+                return f"{tool_name}: {tool_result}"
+            except Exception as e:
+                return self._tool_error(tool_name, e)
+
+        async def _arun_tool(self, tool_call) -> Optional[str]:
+            """Async variant of _run_tool: native coroutine if the tool has one,
+            otherwise the blocking function runs on the shared tool thread pool."""
+            tool_name, first_arg = self._tool_arg(tool_call)
+            if tool_name not in self.tools:
+                print(f"[DEBUG] Tool {tool_name} not found in available tools!")
+                return None
+            tool = self.tools[tool_name]
+            try:
+                print(f"[DEBUG] Calling {tool_name} with arg: {first_arg}")
+                if tool.coroutine is not None:
+                    tool_result = await tool.coroutine(first_arg)
+                else:
+                    loop = asyncio.get_running_loop()
+                    tool_result = await loop.run_in_executor(_tool_executor, tool.func, first_arg)
+                print(f"[DEBUG] Tool result: {tool_result}")
+                return f"{tool_name}: {tool_result}"
+            except Exception as e:
+                return self._tool_error(tool_name, e)
+
+        @staticmethod
+        def _tool_names(tool_calls) -> str:
+            return ",".join(tc.get('name', '') for tc in tool_calls)
+
+        @staticmethod
+        def _extract_text(response) -> str:
+            """Extract clean text response from various possible formats."""
             output_text = ""
             
             if hasattr(response, 'content'):
@@ -131,10 +196,67 @@ When the user asks about weather, you MUST call the Weather tool. Do not try to
                     output_text = str(content)
             else:
                 output_text = str(response)
+            return output_text
+
+        @staticmethod
+        def _log_response(response):
+            print(f"[DEBUG] Response type: {type(response)}")
+            print(f"[DEBUG] Has tool_calls attr: {hasattr(response, 'tool_calls')}")
+            if hasattr(response, 'tool_calls'):
+                print(f"[DEBUG] tool_calls value: {response.tool_calls}")
+                print(f"[DEBUG] tool_calls is empty: {not response.tool_calls}")
+            
+        def invoke(self, inputs: Dict[str, Any]) -> Dict[str, str]:
+            """Execute the agent with tool calling capability."""
+            # Invoke the LLM
+            response = self._chain(inputs).invoke(self._payload(inputs))
+            self._log_response(response)
+            
+            # Check if LLM wants to use tools
+            if hasattr(response, 'tool_calls') and response.tool_calls:
+                print(f"[DEBUG] Tool calls detected: {response.tool_calls}")
+                outputs = [out for out in map(self._run_tool, response.tool_calls) if out is not None]
+                if outputs:
+                    # Return tool results (and which tools ran, for memory metadata)
+                    return {"output": "\n".join(outputs), "tool": self._tool_names(response.tool_calls)}
+            else:
+                print(f"[DEBUG] No tool calls detected, returning text response")
                 
-            return {"output": output_text.strip()}
+            return {"output": self._extract_text(response).strip()}
+
+        async def ainvoke(self, inputs: Dict[str, Any]) -> Dict[str, str]:
+            """Asyncio-native invoke: awaits the LLM and runs tool calls concurrently."""
+            response = await self._chain(inputs).ainvoke(self._payload(inputs))
+            self._log_response(response)
+
+            if hasattr(response, 'tool_calls') and response.tool_calls:
+                print(f"[DEBUG] Tool calls detected: {response.tool_calls}")
+                results = await asyncio.gather(*(self._arun_tool(tc) for tc in response.tool_calls))
+                outputs = [out for out in results if out is not None]
+                if outputs:
+                    return {"output": "\n".join(outputs), "tool": self._tool_names(response.tool_calls)}
+
+            return {"output": self._extract_text(response).strip()}
+
+        async def astream(self, inputs: Dict[str, Any]) -> AsyncIterator[str]:
+            """Yield the answer text as it is generated. Tool calls are collected
+            from the stream and their results yielded once the stream ends."""
+            full = None
+            async for chunk in self._chain(inputs).astream(self._payload(inputs)):
+                full = chunk if full is None else full + chunk
+                text = self._extract_text(chunk)
+                if text:
+                    yield text
+
+            if full is not None and getattr(full, 'tool_calls', None):
+                print(f"[DEBUG] Tool calls detected: {full.tool_calls}")
+                results = await asyncio.gather(*(self._arun_tool(tc) for tc in full.tool_calls))
+                outputs = [out for out in results if out is not None]
+                if outputs:
+                    yield "\n".join(outputs)
     
     # Create the chain
-    chain = prompt | llm_with_tools
+    chain = build_chain(llm, all_tools)
+    print(f"[DEBUG] Tools bound successfully")
     
-    return FridayAgentExecutor(chain, all_tools, chat_history_memory)
\ No newline at end of file
+    return FridayAgentExecutor(chain, all_tools, chat_history_memory, tool_selector)
\ No newline at end of file
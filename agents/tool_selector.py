@@ -0,0 +1,147 @@
+"""Embedding-based tool preselection for the agent's LLM call.
+
+Binding every tool sends all six JSON schemas (and the system prompt's rules
+for each) with every request, chit-chat included. ``ToolSelector`` embeds a
+few example requests per tool once, up front, together with examples of
+requests that need no tool at all. For each query it scores every tool by its
+best-matching example and keeps those that match at least as well as the
+no-tool examples (minus ``margin``), at most ``top_k`` of them — often none.
+Follow-ups ("and in Delhi?", "play it again") name no tool themselves, so the
+previous user turn is scored too (joined with the query) and a tool qualifies
+through either text. Comparing against the no-tool examples instead of a fixed similarity
+threshold keeps the choice calibrated for whichever embedding model memory
+uses.
+
+The agent (agents/friday_agent.py) binds the chosen subset; it caches one
+bound runnable per subset, so selection costs one embedding call per turn.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+from config import FRIDAY_TOOL_PRESELECT, FRIDAY_TOOL_TOP_K, FRIDAY_TOOL_MARGIN
+
+# what users say when they want each tool; the tool description is added to these
+TOOL_EXAMPLES = {
+    "Weather": ["what's the weather like", "weather in Mumbai", "is it going to rain today",
+                "how hot is it outside", "temperature in Delhi right now"],
+    "AppFinder": ["where is notepad installed", "find the path of chrome.exe",
+                  "locate the vscode application"],
+    "AppOpener": ["open notepad", "launch calculator", "start visual studio code", "open the spotify app"],
+    "SpotifyPlayer": ["play bohemian rhapsody", "play some music", "put on a song by arijit singh",
+                      "play shape of you on spotify"],
+    "SpotifyPauser": ["pause the music", "stop the song", "pause spotify", "stop playing music"],
+    "WebsiteOpener": ["open github.com", "go to youtube", "open the google website", "visit stackoverflow"],
+}
+NO_TOOL_EXAMPLES = [
+    "tell me a joke", "how are you today", "who are you", "explain recursion to me",
+    "what did we talk about yesterday", "write a poem about the sea", "thanks friday",
+    "help me debug this python error", "what is the capital of France", "good morning",
+]
+
+
+class ToolSelector:
+    """Picks the tools worth binding for a query by embedding similarity."""
+
+    def __init__(self, embeddings, tools: list, top_k: int = 2, margin: float = 0.05):
+        self.embeddings = embeddings
+        self.tools = list(tools)
+        self.top_k = top_k
+        self.margin = margin
+        self.selected = Counter()
+        self.turns = 0
+        self.no_tool_turns = 0
+        self.select_seconds = 0.0
+        self._lock = threading.Lock()
+
+        texts, owners = [], []
+        for i, tool in enumerate(self.tools):
+            for text in [tool.description, *TOOL_EXAMPLES.get(tool.name, [])]:
+                texts.append(text)
+                owners.append(i)
+        texts += NO_TOOL_EXAMPLES
+        owners += [-1] * len(NO_TOOL_EXAMPLES)
+        self._owners = np.asarray(owners)
+        self._vectors = self._normalize(embeddings.embed_documents(texts))
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _best(self, similarity: np.ndarray) -> dict:
+        best = {"": float(similarity[self._owners == -1].max())}
+        for i, tool in enumerate(self.tools):
+            best[tool.name] = float(similarity[self._owners == i].max())
+        return best
+
+    def scores(self, query: str) -> dict:
+        """Best example similarity per tool name, plus "" for the no-tool examples."""
+        return self._best(self._vectors @ self._normalize(self.embeddings.embed_query(query)))
+
+    def select(self, query: str, previous: Optional[str] = None) -> list:
+        """Tools to bind for `query`, in tool-list order (empty: answer without tools).
+
+        With the `previous` user turn, a tool is also kept when it clears the
+        no-tool floor for the previous turn and the query together.
+        """
+        start = time.perf_counter()
+        if previous:
+            # both texts in one embedding call
+            vectors = self._normalize(self.embeddings.embed_documents([query, f"{previous} {query}"]))
+            text_scores = [self._best(self._vectors @ vector) for vector in vectors]
+        else:
+            text_scores = [self.scores(query)]
+        # how far each tool clears the no-tool examples, for whichever text suits it best
+        leads = {}
+        for scores in text_scores:
+            floor = scores.pop("") - self.margin
+            for name, score in scores.items():
+                leads[name] = max(leads.get(name, -np.inf), score - floor)
+        names = sorted((name for name, lead in leads.items() if lead >= 0),
+                       key=leads.get, reverse=True)[:self.top_k]
+        # a stable order, so the same subset always maps to the same cached runnable
+        chosen = [tool for tool in self.tools if tool.name in names]
+        with self._lock:
+            self.turns += 1
+            self.no_tool_turns += not chosen
+            self.selected.update(names)
+            self.select_seconds += time.perf_counter() - start
+        return chosen
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "no_tool_share": round(self.no_tool_turns / self.turns, 3) if self.turns else 0.0,
+                "avg_tools": round(sum(self.selected.values()) / self.turns, 2) if self.turns else 0.0,
+                "selected": dict(self.selected),
+                "avg_select_ms": round(self.select_seconds / self.turns * 1000, 2) if self.turns else 0.0,
+            }
+
+
+_selector = None
+_selector_lock = threading.Lock()
+
+
+def get_tool_selector(embeddings, tools: Optional[list] = None) -> Optional[ToolSelector]:
+    """Return the process-wide selector, or None when FRIDAY_TOOL_PRESELECT is off."""
+    global _selector
+    if not FRIDAY_TOOL_PRESELECT or embeddings is None:
+        return None
+    with _selector_lock:
+        if _selector is None:
+            if tools is None:
+                import agents.friday_agent
+                tools = agents.friday_agent.all_tools
+            try:
+                _selector = ToolSelector(embeddings, tools, FRIDAY_TOOL_TOP_K, FRIDAY_TOOL_MARGIN)
+            except Exception as e:
+                print(f"[Tools] Preselection unavailable, binding every tool: {e}")
+                return None
+        return _selector
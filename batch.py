@@ -0,0 +1,371 @@
+"""Friday AI — batch query runner for regression runs and queued requests.
+
+Reads one query per line from a JSONL file, runs each through the same
+pipeline as the server (fast path, then routing + memory retrieval + agent)
+with bounded concurrency, and streams one result per line to the output file
+as soon as it finishes:
+
+    input   {"id": "q1", "query": "weather in pune", "expected_tool": "Weather"}
+    output  {"id": "q1", "query": ..., "model": "fast_path", "tool": "Weather",
+             "output": ..., "cached": false, "error": null,
+             "timings_ms": {"queue": ..., "route": ..., "retrieve": ..., "agent": ..., "total": ...},
+             "checks": {"tool": true}, "passed": true}
+
+Optional ``expected_model``, ``expected_tool`` and ``expected_contains``
+fields turn the run into a regression check. Queries are independent (no
+shared chat history) and nothing is written to long-term memory. Tools that
+act on the machine (opening apps and websites, Spotify playback) are replaced
+by stand-ins that only report the call, unless ``--allow-side-effects`` is
+given; read-only tools (weather, app lookup) run for real. LLM calls
+run at ``background`` priority, so a live server on the same process is never
+starved.
+
+Usage:
+    python batch.py queries.jsonl -o results.jsonl --concurrency 8 --rate 2
+    python batch.py queries.jsonl -o results.jsonl --dry-run     # fake model + stand-in tools
+    python batch.py queries.jsonl -o results.jsonl --resume      # skip ids already answered
+    python batch.py queries.jsonl -o results.jsonl --cache ./cassettes/batch_cache.jsonl
+    python batch.py queries.jsonl -o results.jsonl --allow-side-effects  # really play music etc.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Optional
+
+from langchain_core.tools import Tool
+
+import agents.friday_agent
+from agents.fast_path import FastPath
+from agents.tool_selector import get_tool_selector
+from config import FRIDAY_FAST_PATH
+from core.adaptive_router import observe
+from core.scheduler import SchedulerRejected, priority
+from memory.memory_manager import MemoryManager, SimpleConversationalMemory
+from tools.custom_tools import SIDE_EFFECT_TOOLS
+from ui.context import abuild_agent_input
+from ui.router import aroute_query
+
+
+def load_queries(path: str) -> list:
+    """Parse the input JSONL; ids default to the line number."""
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"query": item}
+            if not str(item.get("query", "")).strip():
+                raise ValueError(f"{path}:{number}: missing 'query'")
+            item.setdefault("id", str(number))
+            items.append(item)
+    return items
+
+
+def done_ids(path: str) -> set:
+    """Ids answered without an error in an output file (for --resume).
+
+    Failed queries (rate limits, scheduler rejections) are run again; their
+    new record is appended after the failed one.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return {str(r["id"]) for r in records if r.get("error") is None}
+
+
+def stand_in_tools(tools) -> list:
+    """`tools` with each side-effecting tool replaced by one that only reports the call."""
+    def stand_in(name):
+        return lambda arg="": f"{name} not run in batch mode ({arg})"
+
+    return [Tool(name=t.name, func=stand_in(t.name), description=t.description)
+            if t.name in SIDE_EFFECT_TOOLS else t for t in tools]
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` starts per second, bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ResultCache:
+    """Text answers from earlier runs, keyed by mode and normalized query (JSON lines)."""
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.mode = mode
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def key(self, query: str) -> str:
+        # dry-run answers must never be served to a live run, and vice versa
+        normalized = " ".join(query.lower().split())
+        return hashlib.sha1(f"{self.mode}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, query: str) -> Optional[dict]:
+        return self.entries.get(self.key(query))
+
+    def put(self, query: str, model: str, output: str, tool: Optional[str]):
+        entry = {"key": self.key(query), "model": model, "output": output, "tool": tool}
+        self.entries[entry["key"]] = entry
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def check(item: dict, record: dict) -> dict:
+    """Compare a result with the item's expected_* fields."""
+    checks = {}
+    if "expected_model" in item:
+        checks["model"] = record["model"] == item["expected_model"]
+    if "expected_tool" in item:
+        tools = (record["tool"] or "").split(",")
+        checks["tool"] = item["expected_tool"] in tools if item["expected_tool"] else not record["tool"]
+    if "expected_contains" in item:
+        checks["contains"] = item["expected_contains"].lower() in (record["output"] or "").lower()
+    return checks
+
+
+async def _timed(coro):
+    start = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - start
+
+
+class BatchRunner:
+    """Runs queries through fast path, routing, retrieval and the agent."""
+
+    def __init__(self, flash_llm, pro_llm, memory_manager=None, fast_path: Optional[FastPath] = None,
+                 concurrency: int = 4, rate: float = 0.0, cache: Optional[ResultCache] = None,
+                 retries: int = 2):
+        # every query passes its own (empty) chat history; this one is never read
+        unused = SimpleConversationalMemory()
+        selector = get_tool_selector(memory_manager.embedding_function) if memory_manager else None
+        self.flash_llm = flash_llm
+        self.agents = {
+            "standard": agents.friday_agent.create_friday_agent(flash_llm, unused, selector),
+            "powerful": agents.friday_agent.create_friday_agent(pro_llm, unused, selector),
+        }
+        self.memory_manager = memory_manager
+        self.fast_path = fast_path
+        self.limiter = asyncio.Semaphore(max(1, concurrency))
+        self.rate = RateLimiter(rate)
+        self.cache = cache
+        self.retries = retries
+
+    async def _agent_turn(self, query: str, timings: dict) -> tuple:
+        route = _timed(aroute_query(query, self.flash_llm))
+        if self.memory_manager is not None:
+            (chosen, timings["route"]), (agent_input, timings["retrieve"]) = await asyncio.gather(
+                route, _timed(abuild_agent_input(query, self.memory_manager)))
+        else:
+            (chosen, timings["route"]), agent_input = await route, query
+        start = time.perf_counter()
+        try:
+            response = await self.agents[chosen].ainvoke({"input": agent_input, "chat_history": []})
+        except Exception:
+            observe(chosen, query, time.perf_counter() - start, ok=False)
+            raise
+        timings["agent"] = time.perf_counter() - start
+        observe(chosen, query, timings["agent"])
+        return chosen, response
+
+    async def _answer(self, query: str, timings: dict) -> tuple:
+        """(model, response dict, cached) for one query."""
+        cached = self.cache.get(query) if self.cache else None
+        if cached is not None:
+            return cached["model"], {"output": cached["output"], "tool": cached["tool"]}, True
+        if self.fast_path is not None:
+            start = time.perf_counter()
+            response = await asyncio.to_thread(self.fast_path.handle, query)
+            timings["fast_path"] = time.perf_counter() - start
+            if response is not None:
+                return "fast_path", response, False
+        for attempt in range(self.retries + 1):
+            try:
+                chosen, response = await self._agent_turn(query, timings)
+                return chosen, response, False
+            except SchedulerRejected as e:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    async def run_one(self, item: dict) -> dict:
+        query = item["query"]
+        queued = time.perf_counter()
+        async with self.limiter:
+            await self.rate.acquire()
+            start = time.perf_counter()
+            timings = {"queue": start - queued}
+            record = {"id": item["id"], "query": query, "model": None, "tool": None,
+                      "output": None, "cached": False, "error": None}
+            try:
+                model, response, cached = await self._answer(query, timings)
+                record.update(model=model, tool=response.get("tool"), output=response["output"], cached=cached)
+                # tool commands have side effects (music, browser), so they always run
+                if self.cache is not None and not cached and not response.get("tool"):
+                    self.cache.put(query, model, response["output"], response.get("tool"))
+                if self.fast_path is not None and model != "fast_path" and not cached:
+                    self.fast_path.record_fallback(time.perf_counter() - start)
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+            timings["total"] = time.perf_counter() - start
+        record["timings_ms"] = {name: round(seconds * 1000, 1) for name, seconds in timings.items()}
+        checks = check(item, record)
+        if checks:
+            record["checks"] = checks
+            record["passed"] = record["error"] is None and all(checks.values())
+        return record
+
+    async def run(self, items: list, out, on_result=None) -> list:
+        """Run every item, writing each record to `out` as soon as it finishes."""
+        tasks = [asyncio.create_task(self.run_one(item)) for item in items]
+        records = []
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            records.append(record)
+            if on_result:
+                on_result(record, len(records), len(items))
+        return records
+
+
+def summarize(records: list, elapsed: float) -> str:
+    ok = [r for r in records if r["error"] is None]
+    totals = sorted(r["timings_ms"]["total"] for r in ok if not r["cached"])
+    pct = lambda q: totals[min(len(totals) - 1, int(q * len(totals)))] if totals else 0.0
+    by_model = {}
+    for r in ok:
+        by_model[r["model"]] = by_model.get(r["model"], 0) + 1
+    lines = [
+        f"[Batch] {len(records)} queries in {elapsed:.1f}s ({len(records) / max(elapsed, 1e-9):.2f}/s), "
+        f"{len(records) - len(ok)} errors, {sum(r['cached'] for r in records)} from cache",
+        f"[Batch] by model: {by_model}; latency p50 {pct(0.50):.0f} ms, p95 {pct(0.95):.0f} ms",
+    ]
+    checked = [r for r in records if "passed" in r]
+    if checked:
+        passed = sum(r["passed"] for r in checked)
+        lines.append(f"[Batch] checks: {passed}/{len(checked)} passed")
+    return "\n".join(lines)
+
+
+def build_runner(args) -> BatchRunner:
+    if args.dry_run:
+        from tests.fakes import FakeChatModel, fake_tools
+        from core.scheduler import scheduled
+
+        agents.friday_agent.all_tools = fake_tools(args.tool_latency)
+        # scheduled like the real clients, so limits and priorities still apply
+        flash = scheduled(FakeChatModel(args.fake_latency, "flash"), "gemini-2.5-flash")
+        pro = scheduled(FakeChatModel(args.fake_latency, "pro"), "gemini-2.5-pro")
+    else:
+        from core.llm_engine import get_flash_llm, get_pro_llm
+
+        if not args.allow_side_effects:
+            # a regression file full of "play ..." lines must not drive the real Spotify
+            agents.friday_agent.all_tools = stand_in_tools(agents.friday_agent.all_tools)
+        flash, pro = get_flash_llm(), get_pro_llm()
+
+    memory_manager = None
+    if not args.no_retrieval:
+        memory_manager = MemoryManager()
+    fast_path = FastPath() if FRIDAY_FAST_PATH and not args.no_fast_path else None
+    cache = ResultCache(args.cache, "dry-run" if args.dry_run else "live") if args.cache else None
+    return BatchRunner(flash, pro, memory_manager, fast_path, args.concurrency, args.rate, cache, args.retries)
+
+
+async def run(args) -> list:
+    items = load_queries(args.input)
+    if args.resume:
+        finished = done_ids(args.output)
+        items = [item for item in items if str(item["id"]) not in finished]
+        print(f"[Batch] Resuming: {len(finished)} already done, {len(items)} to go", file=sys.stderr)
+
+    def progress(record, done, total):
+        status = record["error"] or f"{record['model']} in {record['timings_ms']['total']:.0f} ms"
+        print(f"[Batch] {done}/{total} {record['id']}: {status}", file=sys.stderr)
+
+    runner = build_runner(args)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    start = time.perf_counter()
+    # agent/tool debug output would drown the progress lines
+    quiet = open(os.devnull, "w") if not args.verbose else None
+    try:
+        with open(args.output, "a" if args.resume else "w", encoding="utf-8") as out, \
+                contextlib.redirect_stdout(quiet or sys.stdout), priority("background"):
+            records = await runner.run(items, out, progress)
+    finally:
+        if quiet:
+            quiet.close()
+        if runner.cache:
+            runner.cache.close()
+    print(summarize(records, time.perf_counter() - start), file=sys.stderr)
+    if runner.fast_path:
+        print(runner.fast_path.report(), file=sys.stderr)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL file with one {\"id\", \"query\"} object per line")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="JSONL file for the results")
+    parser.add_argument("--concurrency", type=int, default=4, help="queries in flight at once")
+    parser.add_argument("--rate", type=float, default=0.0, help="max queries started per second (0 = no limit)")
+    parser.add_argument("--retries", type=int, default=2, help="retries when the scheduler rejects a call")
+    parser.add_argument("--cache", help="JSONL answer cache; repeated queries are served from it")
+    parser.add_argument("--resume", action="store_true",
+                        help="append to --output, skipping ids already answered without an error")
+    parser.add_argument("--dry-run", action="store_true", help="use the fake model and stand-in tools")
+    parser.add_argument("--allow-side-effects", action="store_true",
+                        help="let live runs open apps and websites and control Spotify")
+    parser.add_argument("--fake-latency", type=float, default=0.5, help="seconds per fake LLM call (--dry-run)")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="seconds per stand-in tool call (--dry-run)")
+    parser.add_argument("--no-retrieval", action="store_true", help="send queries without long-term memory context")
+    parser.add_argument("--no-fast-path", action="store_true", help="send every query through the agent")
+    parser.add_argument("--verbose", action="store_true", help="keep the agent's debug output")
+    args = parser.parse_args()
+
+    records = asyncio.run(run(args))
+    if any(r.get("passed") is False for r in records):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Friday AI — offline benchmarks and load tests (run with `python -m benchmarks.<name>`)
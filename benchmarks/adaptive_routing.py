@@ -0,0 +1,125 @@
+"""Benchmark: static vs latency-SLO-aware routing while Pro degrades and recovers.
+
+Usage:  python -m benchmarks.adaptive_routing --phase-seconds 600 --interval 3 --slo 15
+
+A simulated model pool runs on a virtual clock (no API calls, no sleeping).
+Each request is a query (tool, chat or deep) the LLM router sends to Pro with
+probability ``--pro-share``; the turn's latency is drawn around a per-model,
+per-class base that changes by phase:
+
+* normal    — Flash ~2 s, Pro ~6 s
+* slow      — Pro ~4x slower (an overloaded region)
+* failing   — Pro back to normal speed but ``--error-rate`` of its turns fail
+* recovered — Pro healthy again
+
+Both policies see the same requests:
+
+* static   — always use the model the LLM router asked for
+* adaptive — AdaptiveRouter (core/adaptive_router.py) with the given SLO,
+             fed the outcome of every turn it routed
+
+Per phase it reports the share of Pro requests actually served by Pro, the
+share of turns that failed or missed the SLO, and latency percentiles.
+"""
+
+import argparse
+import random
+
+from benchmarks.common import percentile
+from core.adaptive_router import AdaptiveRouter, query_class
+
+QUERIES = {
+    "tool": ["play some jazz", "open notepad", "what's the weather in Pune"],
+    "chat": ["tell me a joke", "who wrote Dune", "what should I cook tonight"],
+    "deep": ["explain how transformers work in detail", "compare Rust and Go for a web backend",
+             "analyze the pros and cons of remote work"],
+}
+BASE = {"standard": 2.0, "powerful": 6.0}
+CLASS_FACTOR = {"tool": 0.6, "chat": 1.0, "deep": 1.4}
+PHASES = ("normal", "slow", "failing", "recovered")
+
+
+class SimulatedPool:
+    """Latency and failures of each model as a function of the phase."""
+
+    def __init__(self, rng: random.Random, slowdown: float, error_rate: float):
+        self.rng = rng
+        self.slowdown = slowdown
+        self.error_rate = error_rate
+
+    def turn(self, phase: str, model: str, qclass: str) -> tuple:
+        seconds = BASE[model] * CLASS_FACTOR[qclass] * self.rng.lognormvariate(0, 0.25)
+        if model == "powerful" and phase == "slow":
+            seconds *= self.slowdown
+        if model == "powerful" and phase == "failing" and self.rng.random() < self.error_rate:
+            # a failed call usually burns time before the error comes back
+            return seconds * 1.5, False
+        return seconds, True
+
+
+def workload(args) -> list:
+    """(time, phase, query, requested) for every request, identical for both policies."""
+    rng = random.Random(args.seed)
+    requests, now = [], 0.0
+    for phase in PHASES:
+        end = now + args.phase_seconds
+        while now < end:
+            qclass = rng.choice(list(QUERIES))
+            requested = "powerful" if rng.random() < args.pro_share else "standard"
+            requests.append((now, phase, rng.choice(QUERIES[qclass]), requested))
+            now += rng.expovariate(1 / args.interval)
+        now = end
+    return requests
+
+
+def simulate(args, adaptive: bool) -> dict:
+    clock = [0.0]
+    router = AdaptiveRouter(args.slo, args.max_error_rate, args.window, args.min_samples, args.probe_every,
+                            queue_wait=lambda model: 0.0, clock=lambda: clock[0])
+    pool = SimulatedPool(random.Random(args.seed + 1), args.slowdown, args.error_rate)
+    results = {phase: {"latencies": [], "misses": 0, "pro_asked": 0, "pro_served": 0} for phase in PHASES}
+
+    for at, phase, query, requested in workload(args):
+        clock[0] = at
+        model = router.decide(query, requested).model if adaptive else requested
+        seconds, ok = pool.turn(phase, model, query_class(query))
+        # the turn's outcome is known once it finishes
+        clock[0] = at + seconds
+        router.observe(model, query, seconds, ok)
+
+        r = results[phase]
+        r["latencies"].append(seconds)
+        r["misses"] += (not ok) or seconds > args.slo
+        if requested == "powerful":
+            r["pro_asked"] += 1
+            r["pro_served"] += model == "powerful"
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--phase-seconds", type=float, default=600, help="virtual length of each phase")
+    parser.add_argument("--interval", type=float, default=3.0, help="mean seconds between requests")
+    parser.add_argument("--pro-share", type=float, default=0.4, help="share of requests routed to Pro")
+    parser.add_argument("--slo", type=float, default=15.0)
+    parser.add_argument("--slowdown", type=float, default=4.0, help="Pro latency factor in the slow phase")
+    parser.add_argument("--error-rate", type=float, default=0.5, help="Pro failure rate in the failing phase")
+    parser.add_argument("--max-error-rate", type=float, default=0.25)
+    parser.add_argument("--window", type=float, default=120.0, help="telemetry window (seconds)")
+    parser.add_argument("--min-samples", type=int, default=5)
+    parser.add_argument("--probe-every", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'policy':>9} {'phase':>10} {'turns':>6} {'pro served':>11} {'SLO miss':>9} "
+          f"{'p50 s':>7} {'p95 s':>7}")
+    for name in ("static", "adaptive"):
+        for phase, r in simulate(args, name == "adaptive").items():
+            served = r["pro_served"] / r["pro_asked"] if r["pro_asked"] else 0.0
+            turns = len(r["latencies"])
+            print(f"{name:>9} {phase:>10} {turns:>6} {served:>10.0%} {r['misses'] / turns:>8.1%} "
+                  f"{percentile(r['latencies'], 0.5):>7.2f} {percentile(r['latencies'], 0.95):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""How many concurrent turns one process sustains on the async agent path.
+
+Usage:  python -m benchmarks.async_concurrency --latency 1.0 --turns 10 100 1000
+
+Each turn runs routing, retrieval and the agent against FakeChatModel with a
+fixed per-call latency (two model calls per turn). The async path
+(``aroute_query`` → ``abuild_agent_input`` → ``agent.ainvoke``) is compared
+with the blocking path driven by a thread pool of ``--threads`` workers.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from agents.friday_agent import create_friday_agent
+from memory.memory_manager import SimpleConversationalMemory
+from tests.fakes import FakeChatModel
+from ui.context import abuild_agent_input, build_agent_input
+from ui.router import aroute_query, route_query
+
+QUERIES = [
+    "tell me a joke",
+    "what's the weather in mumbai",
+    "explain in detail how transformers work",
+    "what can you do",
+]
+
+
+class BenchMemory:
+    """Minimal MemoryManager stand-in backed by an in-memory vector store."""
+
+    def __init__(self):
+        self.vector_store = InMemoryVectorStore(DeterministicFakeEmbedding(size=384))
+        self.vector_store.add_texts([f"User asked: question {i}\nFriday responded: answer {i}" for i in range(200)])
+        self.conversational_memory = SimpleConversationalMemory()
+
+    def get_vector_retriever(self):
+        return self.vector_store.as_retriever(search_kwargs={"k": 3})
+
+
+def build(latency: float):
+    flash = FakeChatModel(latency, "flash")
+    pro = FakeChatModel(latency, "pro")
+    memory = BenchMemory()
+    agents = {
+        "standard": create_friday_agent(flash, memory.conversational_memory),
+        "powerful": create_friday_agent(pro, memory.conversational_memory),
+    }
+    return flash, memory, agents
+
+
+async def run_async(turns: int, flash, memory, agents) -> float:
+    async def turn(i):
+        query = QUERIES[i % len(QUERIES)]
+        chosen = await aroute_query(query, flash)
+        agent_input = await abuild_agent_input(query, memory)
+        await agents[chosen].ainvoke({"input": agent_input})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(turn(i) for i in range(turns)))
+    return time.perf_counter() - start
+
+
+def run_threaded(turns: int, threads: int, flash, memory, agents) -> float:
+    def turn(i):
+        query = QUERIES[i % len(QUERIES)]
+        chosen = route_query(query, flash)
+        agent_input = build_agent_input(query, memory)
+        agents[chosen].invoke({"input": agent_input})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(turn, range(turns)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=1.0, help="fake model latency per call")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--threads", type=int, default=8, help="worker threads for the blocking path")
+    args = parser.parse_args()
+
+    flash, memory, agents = build(args.latency)
+    rows = []
+    # silence the agent's debug output
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):
+        for turns in args.turns:
+            async_elapsed = asyncio.run(run_async(turns, flash, memory, agents))
+            threaded_elapsed = run_threaded(turns, args.threads, flash, memory, agents)
+            rows.append((turns, async_elapsed, threaded_elapsed))
+
+    print(f"model latency {args.latency}s, 2 model calls per turn, {args.threads} threads for blocking path")
+    print(f"{'turns':>6} {'async s':>9} {'async turns/s':>14} {'threads s':>10} {'threads turns/s':>16}")
+    for turns, a, t in rows:
+        print(f"{turns:>6} {a:>9.2f} {turns / a:>14.1f} {t:>10.2f} {turns / t:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark: how fast barge-in stops a spoken answer and hands over the user's speech.
+
+Usage:  python -m benchmarks.barge_in --answer 8 --onsets 1.5 2 2.5 3 3.5
+
+Each trial plays an ``--answer``-second "answer" in a child process (a
+sleeping Python process stands in for mpg123, so only process control is
+measured) while a synthesized microphone stream is fed at real-time pace in
+30 ms chunks: background noise plus speaker echo, then the user starting to
+talk at the given onset (after the detector's first-second calibration). It reports:
+
+* stop latency    — speech onset until the player process is gone, i.e.
+                    until the user is being listened to
+* pre-roll        — how much audio before the onset is handed to the
+                    recognizer (positive: the first syllable is kept)
+* w/o barge-in    — the wait for the answer to finish, as before
+
+A final run with echo but no user speech checks for false barge-ins.
+"""
+
+import argparse
+import math
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+from benchmarks.common import percentile
+from voice import SAMPLE_RATE, EnergyVAD, play_with_barge_in, wav_chunks
+
+CHUNK_MS = 30
+# sleeps for the "file" argument's number of seconds, like a player would play it
+PLAYER = (sys.executable, "-c", "import sys, time; time.sleep(float(sys.argv[1]))")
+
+
+def write_mic(path: str, seconds: float, onset: float = None, echo: float = 600.0,
+              voice: float = 5000.0):
+    """Noise + speaker echo for `seconds`, with the user speaking from `onset`."""
+    rng = random.Random(0)
+    samples = []
+    for i in range(int(seconds * SAMPLE_RATE)):
+        t = i / SAMPLE_RATE
+        value = rng.gauss(0, 150) + echo * math.sin(2 * math.pi * 180 * t) * (0.5 + 0.5 * math.sin(7 * t))
+        if onset is not None and t >= onset:
+            value += voice * math.sin(2 * math.pi * 140 * t) * (0.6 + 0.4 * math.sin(2 * math.pi * 4 * t))
+        samples.append(max(-32768, min(32767, int(value))))
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answer", type=float, default=8.0, help="seconds of spoken answer")
+    parser.add_argument("--onsets", type=float, nargs="+", default=[1.5, 2.0, 2.5, 3.0, 3.5],
+                        help="when the user starts talking (seconds into the answer)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="friday-bargein-")
+    try:
+        print(f"{'onset s':>8} {'stop ms':>8} {'pre-roll ms':>12} {'w/o barge-in ms':>16}")
+        stops, waits = [], []
+        for onset in args.onsets:
+            mic = os.path.join(workdir, f"mic{onset}.wav")
+            write_mic(mic, onset + 2.0, onset)
+            start = time.perf_counter()
+            captured = play_with_barge_in(str(args.answer), wav_chunks(mic, CHUNK_MS), EnergyVAD(),
+                                          command=PLAYER)
+            stopped = time.perf_counter() - start
+            if captured is None:
+                print(f"{onset:>8.1f}  missed: playback was not interrupted")
+                continue
+            captured.close()
+            # the captured audio starts with the pre-roll: 10 chunks up to detection
+            preroll_start = stopped - 10 * CHUNK_MS / 1000
+            stops.append(stopped - onset)
+            waits.append(args.answer - onset)
+            print(f"{onset:>8.1f} {stops[-1] * 1000:>8.0f} {(onset - preroll_start) * 1000:>12.0f} "
+                  f"{waits[-1] * 1000:>16.0f}")
+
+        mic = os.path.join(workdir, "echo.wav")
+        write_mic(mic, 4.0)
+        false = play_with_barge_in("3.0", wav_chunks(mic, CHUNK_MS), EnergyVAD(), command=PLAYER)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if stops:
+        print(f"Stop latency p50 {percentile(stops, 0.5) * 1000:.0f} ms, max {max(stops) * 1000:.0f} ms; "
+              f"user heard after {percentile(stops, 0.5) * 1000:.0f} ms instead of "
+              f"{percentile(waits, 0.5) * 1000:.0f} ms (p50)")
+    print(f"False barge-in on echo only: {'yes' if false is not None else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
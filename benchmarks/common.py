@@ -0,0 +1,44 @@
+"""Shared helpers for the benchmarks: percentiles, offline embeddings and tools."""
+
+import hashlib
+import math
+import re
+
+from langchain_core.embeddings import Embeddings
+
+from tests.fakes import fake_tools  # noqa: F401  (re-exported for the benchmarks)
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of `values` (q in 0..1); 0.0 when empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HashingEmbedding(Embeddings):
+    """Offline bag-of-words embedding (hashed, L2-normalised).
+
+    Texts that share words get similar vectors, which is enough to measure
+    relevance without downloading a sentence-transformer model.
+    """
+
+    def __init__(self, size: int = 384):
+        self.size = size
+
+    def _embed(self, text: str) -> list:
+        vector = [0.0] * self.size
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.size
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
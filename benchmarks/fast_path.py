@@ -0,0 +1,115 @@
+"""Benchmark: deterministic fast path vs. router + agent for typical voice traffic.
+
+Usage:  python -m benchmarks.fast_path --latency 0.5 --tool-latency 0.2
+
+Replays a labelled mix of voice commands (mostly tool commands, plus chat and
+deliberately ambiguous ones) twice against FakeChatModel and stand-in tools:
+
+* agent only  — route_query, memory retrieval and the agent, for every turn
+* fast path   — FastPath first, the agent path only when it declines
+
+Reports the hit rate, wrong fast-path answers (a tool call the label does
+not expect, or the wrong argument — must be zero), and latency per turn.
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+
+import agents.friday_agent
+from agents.fast_path import FastPath
+from benchmarks.common import HashingEmbedding, fake_tools, percentile
+from memory.memory_manager import MemoryManager
+from tests.fakes import FakeChatModel
+from ui.context import build_agent_input
+from ui.router import route_query
+
+# (command, expected fast-path match or None)
+TRAFFIC = [
+    ("pause the music", ("SpotifyPauser", "")),
+    ("play bohemian rhapsody", ("SpotifyPlayer", "bohemian rhapsody")),
+    ("what's the weather in mumbai", ("Weather", "mumbai")),
+    ("friday open github dot com", ("WebsiteOpener", "github.com")),
+    ("stop the music", ("SpotifyPauser", "")),
+    ("play shape of you on spotify", ("SpotifyPlayer", "shape of you")),
+    ("weather in new delhi today", ("Weather", "new delhi")),
+    ("open stackoverflow.com please", ("WebsiteOpener", "stackoverflow.com")),
+    ("pause", ("SpotifyPauser", "")),
+    ("how's the weather", ("Weather", "auto")),
+    ("play blinding lights", ("SpotifyPlayer", "blinding lights")),
+    ("can you open youtube.com", ("WebsiteOpener", "youtube.com")),
+    ("what is the weather like in pune", ("Weather", "pune")),
+    ("play kesariya", ("SpotifyPlayer", "kesariya")),
+    ("tell me a joke", None),
+    ("play some music", None),
+    ("what's the weather in mumbai tomorrow", None),
+    ("pause the music and open github.com", None),
+    ("explain in detail how transformers work", None),
+    ("open notepad", None),
+    ("play it again", None),
+    ("remind me what we talked about", None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per fake LLM call")
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="seconds per fake tool call")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="friday-fastpath-")
+    try:
+        agents.friday_agent.all_tools = fake_tools(args.tool_latency)
+        flash, pro = FakeChatModel(args.latency, "flash"), FakeChatModel(args.latency, "pro")
+        memory_manager = MemoryManager(embedding_function=HashingEmbedding(), backend="mmap",
+                                       path=os.path.join(workdir, "memory"))
+        agent_for = {
+            "standard": agents.friday_agent.create_friday_agent(flash, memory_manager.conversational_memory),
+            "powerful": agents.friday_agent.create_friday_agent(pro, memory_manager.conversational_memory),
+        }
+        fast_path = FastPath()
+
+        def agent_turn(query):
+            chosen = route_query(query, flash)
+            return agent_for[chosen].invoke({"input": build_agent_input(query, memory_manager)})
+
+        baseline, fast, wrong = [], [], []
+        with open(os.devnull, "w") as quiet:
+            for query, expected in TRAFFIC:
+                with contextlib.redirect_stdout(quiet):
+                    start = time.perf_counter()
+                    agent_turn(query)
+                    baseline.append(time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    response = fast_path.handle(query)
+                    if response is None:
+                        agent_turn(query)
+                        fast_path.record_fallback(time.perf_counter() - start)
+                    fast.append(time.perf_counter() - start)
+                if response is not None and (expected is None or response["output"] !=
+                                             f"{expected[0]}: {expected[0]} done ({expected[1]})"):
+                    wrong.append((query, response["output"]))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    stats = fast_path.stats()
+    expected_hits = sum(expected is not None for _, expected in TRAFFIC)
+    print(f"{len(TRAFFIC)} turns, {expected_hits} unambiguous tool commands")
+    print(f"Fast path hits: {stats['hits']} ({stats['hit_rate']:.0%}), by tool: {stats['by_tool']}")
+    print(f"Wrong fast-path answers: {len(wrong)}")
+    for query, output in wrong:
+        print(f"  {query!r} -> {output!r}")
+    print(f"{'':<12} {'p50 ms':>8} {'p95 ms':>8} {'total s':>8}")
+    for name, values in (("agent only", baseline), ("fast path", fast)):
+        print(f"{name:<12} {percentile(values, 0.5) * 1000:>8.0f} {percentile(values, 0.95) * 1000:>8.0f} "
+              f"{sum(values):>8.1f}")
+    print(f"Saved {sum(baseline) - sum(fast):.1f}s measured; FastPath's own estimate: "
+          f"{stats['saved_seconds_estimate']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Load test for the Gemini key pool against a local quota-enforcing stub.
+
+Usage:  python -m benchmarks.key_pool_load --keys 1 4 --workers 16 --requests 400
+
+The stub plays the role of the Gemini API: every key may make ``--quota``
+calls per ``--window`` seconds and gets a 429 beyond that. The same workload
+is run once per key count so the effect of pooling is visible side by side.
+"""
+
+import argparse
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+
+from core.key_pool import KeyPool, KeyPoolExhausted, PooledChatModel
+
+
+class StubRateLimitError(Exception):
+    """Mimics the 429 RESOURCE_EXHAUSTED error raised by the Gemini client."""
+
+    code = 429
+
+
+class QuotaStub:
+    """Fake Gemini backend enforcing a sliding-window quota per API key."""
+
+    def __init__(self, quota: int, window: float, latency: float):
+        self.quota = quota
+        self.window = window
+        self.latency = latency
+        self._calls = defaultdict(deque)
+        self._lock = threading.Lock()
+        self.served = defaultdict(int)
+        self.rejected = defaultdict(int)
+
+    def call(self, key: str, prompt) -> AIMessage:
+        with self._lock:
+            now = time.monotonic()
+            calls = self._calls[key]
+            while calls and now - calls[0] > self.window:
+                calls.popleft()
+            if len(calls) >= self.quota:
+                self.rejected[key] += 1
+                retry = self.window - (now - calls[0])
+                raise StubRateLimitError(f"429 RESOURCE_EXHAUSTED: quota exceeded, please retry in {retry:.2f}s")
+            calls.append(now)
+            self.served[key] += 1
+        time.sleep(self.latency)
+        return AIMessage(content=f"ok from {key}")
+
+
+class StubChatModel(Runnable):
+    """Per-key client talking to the shared QuotaStub."""
+
+    def __init__(self, key: str, backend: QuotaStub):
+        self.key = key
+        self.backend = backend
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.backend.call(self.key, input)
+
+
+def run(num_keys: int, args) -> dict:
+    backend = QuotaStub(args.quota, args.window, args.latency)
+    pool = KeyPool([(f"stub-key-{i}", 1) for i in range(num_keys)], cooldown_seconds=args.window)
+    llm = PooledChatModel(lambda key: StubChatModel(key, backend), pool, max_wait=args.max_wait)
+
+    failures = 0
+    latencies = []
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal failures
+        start = time.perf_counter()
+        try:
+            llm.invoke(f"request {i}")
+        except (KeyPoolExhausted, StubRateLimitError):
+            with lock:
+                failures += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+    return {
+        "keys": num_keys,
+        "ok": len(latencies),
+        "failed": failures,
+        "429s": sum(backend.rejected.values()),
+        "throughput": len(latencies) / elapsed,
+        "p50": p(0.50),
+        "p95": p(0.95),
+        "per_key": pool.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--quota", type=int, default=20, help="calls per key per window")
+    parser.add_argument("--window", type=float, default=1.0, help="quota window in seconds")
+    parser.add_argument("--latency", type=float, default=0.02, help="stub response time")
+    parser.add_argument("--max-wait", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'keys':>4} {'ok':>6} {'failed':>6} {'429s':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for n in args.keys:
+        r = run(n, args)
+        print(f"{r['keys']:>4} {r['ok']:>6} {r['failed']:>6} {r['429s']:>6} "
+              f"{r['throughput']:>8.1f} {r['p50'] * 1000:>8.1f} {r['p95'] * 1000:>8.1f}")
+        for s in r["per_key"]:
+            print(f"       {s['key']}: requests={s['requests']} rate_limited={s['rate_limited']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Latency and relevance of recency-weighted, pre-filtered memory retrieval.
+
+Usage:  python -m benchmarks.memory_recency --history 50000 --facts 200 --versions 5
+
+Builds a synthetic two-year history: filler chit-chat plus ``--facts`` facts
+("my favourite X is Y") that were each restated ``--versions`` times with a
+new value, the latest within the last 60 days. Every query asks for a fact;
+a hit means the *latest* version ranks first. Three retrieval settings are
+compared on the same store:
+
+* similarity only   — recency weight 0, whole history scanned
+* recency blend     — default recency weight, whole history scanned
+* blend + window    — default weight, only the last ``--window-days`` scanned
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import HashingEmbedding, percentile
+from config import FRIDAY_MEMORY_RECENCY_WEIGHT
+from memory.memory_manager import MemoryManager
+
+DAY = 86400
+TOPICS = ["colour", "song", "movie", "food", "book", "city", "game", "sport", "drink", "band"]
+VALUES = ["blue", "green", "jazz", "pizza", "tokyo", "chess", "cricket", "coffee", "tea", "red",
+          "paris", "sushi", "dune", "halo", "tennis", "rock", "pasta", "lisbon", "mango", "violet"]
+
+
+def nonce_word(i: int) -> str:
+    """Distinct pronounceable word per fact, so facts differ by topic, not digits."""
+    syllables = ["ka", "lo", "mi", "ren", "su", "ta", "vo", "zen", "pa", "dri"]
+    return "".join(syllables[int(d)] for d in str(i + 100))
+
+
+def fact_text(topic: str, value: str) -> str:
+    return (f"User asked: my favourite {topic} is {value}\n"
+            f"Friday responded: noted, {topic} is {value}")
+
+
+def build(memory: MemoryManager, args, rng: random.Random) -> list:
+    now = time.time()
+    texts, metadatas, expected = [], [], []
+    for f in range(args.facts):
+        topic = f"{nonce_word(f)} {TOPICS[f % len(TOPICS)]}"
+        stamps = sorted(now - rng.uniform(61, 730) * DAY for _ in range(args.versions - 1))
+        stamps.append(now - rng.uniform(0, 60) * DAY)
+        values = rng.sample(VALUES, args.versions)
+        for ts, value in zip(stamps, values):
+            texts.append(fact_text(topic, value))
+            metadatas.append({"timestamp": ts})
+        expected.append((f"what is my favourite {topic}", fact_text(topic, values[-1])))
+
+    for i in range(args.history - len(texts)):
+        texts.append(f"User asked: tell me something fun number {i}\nFriday responded: here is fun fact {i}")
+        metadatas.append({"timestamp": now - rng.uniform(0, 730) * DAY})
+
+    # memories are written as they happen, i.e. in time order
+    order = sorted(range(len(texts)), key=lambda i: metadatas[i]["timestamp"])
+    for start in range(0, len(order), 2000):
+        batch = order[start:start + 2000]
+        memory.backend.add_texts([texts[i] for i in batch], [metadatas[i] for i in batch], persist=False)
+    return expected
+
+
+def evaluate(memory: MemoryManager, expected: list, weight: float, window_days: float) -> dict:
+    memory.recency_weight = weight
+    memory.window_days = window_days
+    hits, latencies = 0, []
+    for query, answer in expected:
+        start = time.perf_counter()
+        docs = memory.search(query, k=3)
+        latencies.append(time.perf_counter() - start)
+        hits += bool(docs) and docs[0].page_content == answer
+    return {"hit@1": hits / len(expected), "p50": percentile(latencies, 0.5), "p95": percentile(latencies, 0.95)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default="faiss")
+    parser.add_argument("--history", type=int, default=50000)
+    parser.add_argument("--facts", type=int, default=200)
+    parser.add_argument("--versions", type=int, default=5)
+    parser.add_argument("--window-days", type=float, default=90)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp(prefix="friday-recency-")
+    try:
+        memory = MemoryManager(embedding_function=HashingEmbedding(), backend=args.backend, path=path)
+        expected = build(memory, args, random.Random(args.seed))
+
+        settings = [
+            ("similarity only", 0.0, 0),
+            ("recency blend", FRIDAY_MEMORY_RECENCY_WEIGHT, 0),
+            ("blend + window", FRIDAY_MEMORY_RECENCY_WEIGHT, args.window_days),
+        ]
+        print(f"{memory.backend.count()} memories, {len(expected)} fact queries, backend={args.backend}")
+        print(f"{'setting':>16} {'hit@1':>7} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, weight, window in settings:
+            r = evaluate(memory, expected, weight, window)
+            print(f"{name:>16} {r['hit@1']:>7.2%} {r['p50'] * 1000:>8.2f} {r['p95'] * 1000:>8.2f}")
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
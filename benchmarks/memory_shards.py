@@ -0,0 +1,129 @@
+"""Startup time and query latency of one FAISS store vs monthly shards as history grows.
+
+Usage:  python -m benchmarks.memory_shards --months 6 24 60 --per-month 2000
+
+For each history length the same memories (``--per-month`` per month, ending
+now) are written to a single FAISS store and to a sharded store with FAISS
+shards (memory/sharded_store.py). Each store is opened in a fresh child
+process, which reports:
+
+* open       — time to load the store (sharded: only the hot months)
+* rss        — resident memory added by opening it
+* recent p50  — k=12 search limited to the last 60 days (sharded: hot shards only)
+* default p50 — k=12 search without a window (sharded: the newest
+  ``--search-months`` months first, widened to the older ones when fewer than
+  k hits are within FRIDAY_MEMORY_WIDEN_DISTANCE — the hashing embedding's
+  distances are large, so this measures the widened case)
+* full p50    — k=12 search over the whole history (sharded: fans out to every
+  month, loading cold ones on demand; at most ``--cold`` stay loaded)
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import HashingEmbedding, percentile
+from memory.sharded_store import ShardedBackend
+from memory.vector_backends import create_backend
+
+DAY = 86400
+QUERIES = [f"what did I ask about topic {i}" for i in range(0, 97, 5)]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def probe(name: str, path: str, hot: int, cold: int, search_months: int):
+    """Child process: open one store, time searches and print the results as JSON."""
+    embedding = HashingEmbedding()
+    embedding.embed_query("warm up")
+    before = rss_mb()
+    start = time.perf_counter()
+    if name == "sharded":
+        backend = ShardedBackend(embedding, path, hot_shards=hot, cold_shards=cold, search_months=search_months)
+    else:
+        backend = create_backend(embedding, name, path)
+    opened = time.perf_counter() - start
+    after = rss_mb()
+
+    since = time.time() - 60 * DAY
+    timings = {"recent": [], "default": [], "full": []}
+    for query in QUERIES:
+        for kind, window in (("recent", since), ("default", None), ("full", 0.0)):
+            start = time.perf_counter()
+            backend.search(query, k=12, since=window)
+            timings[kind].append(time.perf_counter() - start)
+    print(json.dumps({"open": opened, "rss": after - before,
+                      **{kind: percentile(values, 0.5) for kind, values in timings.items()}}))
+
+
+def measure(name: str, path: str, hot: int, cold: int, search_months: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.memory_shards", "--probe", name, path, str(hot), str(cold),
+         str(search_months)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def build(root: str, months: int, per_month: int, embedding):
+    now = time.time()
+    total = months * per_month
+    single = create_backend(embedding, "faiss", f"{root}/faiss")
+    sharded = ShardedBackend(embedding, f"{root}/sharded", shard_format="faiss")
+    for start in range(0, total, 5000):
+        rows = range(start, min(total, start + 5000))
+        texts = [f"User asked: question {i} about topic {i % 97}\nFriday responded: answer {i}" for i in rows]
+        # oldest first, spread evenly over the history
+        metadatas = [{"timestamp": now - (total - i) * months * 30 * DAY / total} for i in rows]
+        vectors = np.asarray(embedding.embed_documents(texts), dtype=np.float32)
+        single.add_embeddings(texts, vectors, metadatas, persist=False)
+        sharded.add_embeddings(texts, vectors, metadatas, persist=False)
+    single.persist()
+    sharded.persist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--months", type=int, nargs="+", default=[6, 24, 60])
+    parser.add_argument("--per-month", type=int, default=2000)
+    parser.add_argument("--hot", type=int, default=3, help="months kept loaded")
+    parser.add_argument("--cold", type=int, default=6, help="older months kept loaded after a search")
+    parser.add_argument("--search-months", type=int, default=6, help="months a search without a window tries first")
+    parser.add_argument("--probe", nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        name, path, hot, cold, search_months = args.probe
+        probe(name, path, int(hot), int(cold), int(search_months))
+        return
+
+    embedding = HashingEmbedding()
+    print(f"{'store':>8} {'months':>7} {'memories':>9} {'open ms':>9} {'rss MB':>8} "
+          f"{'recent p50 ms':>14} {'default p50 ms':>15} {'full p50 ms':>12}")
+    for months in args.months:
+        root = tempfile.mkdtemp(prefix="friday-shards-")
+        try:
+            build(root, months, args.per_month, embedding)
+            for name in ("faiss", "sharded"):
+                r = measure(name, f"{root}/{name}", args.hot, args.cold, args.search_months)
+                print(f"{name:>8} {months:>7} {months * args.per_month:>9} {r['open'] * 1000:>9.1f} "
+                      f"{r['rss']:>8.1f} {r['recent'] * 1000:>14.2f} {r['default'] * 1000:>15.2f} "
+                      f"{r['full'] * 1000:>12.2f}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
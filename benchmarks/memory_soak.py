@@ -0,0 +1,111 @@
+"""Soak test: replay thousands of scripted turns and check memory stays bounded.
+
+Usage:  python -m benchmarks.memory_soak --turns 10000 --sample-every 500
+
+Runs the terminal-mode turn (route → retrieve → agent → save to vector
+memory, chat history and the session store) against FakeChatModel, stand-in
+tools, offline embeddings and temporary stores. Every ``--sample-every``
+turns a MemWatch sample (RSS, tracemalloc by subsystem, gauges) is taken and
+optionally written to ``--out`` as JSONL.
+
+The run passes if MemWatch never flags sustained growth and RSS grows by
+less than ``--max-growth-mb`` over the second half of the run; otherwise it
+exits with status 1. Long-term memory grows with every turn by design, so
+the allowance covers its vectors and documents.
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import agents.friday_agent
+from benchmarks.common import HashingEmbedding, fake_tools
+from core.memwatch import MemWatch
+from memory.memory_manager import MemoryManager
+from memory.session_store import SessionStore
+from tests.fakes import FakeChatModel
+from ui.context import build_agent_input, save_interaction
+from ui.router import route_query
+
+SCRIPT = [
+    "tell me a joke",
+    "what's the weather in mumbai",
+    "explain in detail how transformers work",
+    "play bohemian rhapsody",
+    "what can you do",
+    "pause the music",
+    "open github.com",
+    "remind me what we talked about",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=10000)
+    parser.add_argument("--sample-every", type=int, default=500)
+    parser.add_argument("--backend", default="mmap", help="memory backend")
+    parser.add_argument("--max-growth-mb", type=float, default=50.0)
+    parser.add_argument("--out", help="write MemWatch samples here as JSONL")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="friday-soak-")
+    if args.out and os.path.exists(args.out):
+        os.remove(args.out)
+    try:
+        agents.friday_agent.all_tools = fake_tools()
+        flash, pro = FakeChatModel(0.0, "flash"), FakeChatModel(0.0, "pro")
+        memory_manager = MemoryManager(embedding_function=HashingEmbedding(), backend=args.backend,
+                                       path=os.path.join(workdir, "memory"))
+        store = SessionStore(os.path.join(workdir, "sessions.db"))
+        session_id = store.create_session()
+        agent_for = {
+            "standard": agents.friday_agent.create_friday_agent(flash, memory_manager.conversational_memory),
+            "powerful": agents.friday_agent.create_friday_agent(pro, memory_manager.conversational_memory),
+        }
+
+        watch = MemWatch(args.out, window=10)
+        watch.gauge("chat_history_messages", lambda: len(memory_manager.conversational_memory.messages))
+        watch.gauge("vector_memories", memory_manager.backend.count)
+
+        samples = [watch.sample()]
+        print(f"{'turn':>6} {'rss MB':>7} {'traced MB':>10} {'history':>8} {'memories':>9}  largest subsystem")
+        start = time.perf_counter()
+        with open(os.devnull, "w") as quiet:
+            for turn in range(1, args.turns + 1):
+                query = f"{SCRIPT[turn % len(SCRIPT)]} (turn {turn})"
+                with contextlib.redirect_stdout(quiet):
+                    chosen = route_query(query, flash)
+                    agent_input = build_agent_input(query, memory_manager)
+                    response = agent_for[chosen].invoke({"input": agent_input})
+                    save_interaction(query, response["output"], memory_manager,
+                                     session_id=session_id, tool=response.get("tool"), model=chosen)
+                    store.append(session_id, "user", query)
+                    store.append(session_id, "assistant", response["output"], {"model": chosen})
+                if turn % args.sample_every == 0 or turn == args.turns:
+                    s = watch.sample()
+                    samples.append(s)
+                    largest = next(iter(s["subsystems"].items()), ("?", 0))
+                    print(f"{turn:>6} {s['rss_mb']:>7.1f} {s['traced_mb']:>10.2f} "
+                          f"{s['gauges']['chat_history_messages']:>8} {s['gauges']['vector_memories']:>9}  "
+                          f"{largest[0]} ({largest[1]} MB)")
+        elapsed = time.perf_counter() - start
+        store.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    half = samples[len(samples) // 2]
+    growth = samples[-1]["rss_mb"] - half["rss_mb"]
+    flagged = any(s["growing"] for s in samples)
+    bounded = not flagged and growth < args.max_growth_mb
+    print(f"{args.turns} turns in {elapsed:.1f}s; RSS {samples[0]['rss_mb']} -> {samples[-1]['rss_mb']} MB, "
+          f"+{growth:.1f} MB over the second half; growth flagged: {flagged}")
+    print("PASS: memory stays bounded" if bounded else "FAIL: memory keeps growing")
+    sys.exit(0 if bounded else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Startup time and memory footprint of the FAISS store vs the mmap format.
+
+Usage:  python -m benchmarks.memory_startup --sizes 10000 100000
+
+For each size a FAISS store is built, then migrated to the mmap format
+(memory/migrate.py). Each store is opened in a fresh child process, which
+reports:
+
+* open      — time to load the store from disk
+* rss       — resident memory added by opening it
+* 1st query — latency of the first k=3 search after opening
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import HashingEmbedding
+from memory.migrate import migrate
+from memory.vector_backends import create_backend
+
+
+def interaction(i: int) -> str:
+    return f"User asked: question number {i} about topic {i % 97}\nFriday responded: answer {i} on topic {i % 97}"
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def probe(name: str, path: str):
+    """Child process: open one store and print its measurements as JSON."""
+    embedding = HashingEmbedding()
+    embedding.embed_query("warm up")
+    before = rss_mb()
+    start = time.perf_counter()
+    backend = create_backend(embedding, name, path)
+    opened = time.perf_counter() - start
+    after = rss_mb()
+    start = time.perf_counter()
+    backend.search("question about topic 42", k=3)
+    query = time.perf_counter() - start
+    print(json.dumps({"open": opened, "rss": after - before, "query": query}))
+
+
+def measure(name: str, path: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.memory_startup", "--probe", name, path],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--probe", nargs=2, metavar=("BACKEND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe(*args.probe)
+        return
+
+    embedding = HashingEmbedding()
+    print(f"{'backend':>8} {'size':>7} {'open ms':>9} {'rss MB':>8} {'1st query ms':>13}")
+    for size in args.sizes:
+        root = tempfile.mkdtemp(prefix="friday-startup-")
+        try:
+            backend = create_backend(embedding, "faiss", f"{root}/faiss")
+            for start in range(0, size, 5000):
+                backend.add_texts([interaction(i) for i in range(start, min(size, start + 5000))], persist=False)
+            backend.persist()
+            del backend
+            migrate(f"{root}/faiss", f"{root}/mmap")
+
+            for name in ("faiss", "mmap"):
+                r = measure(name, f"{root}/{name}")
+                print(f"{name:>8} {size:>7} {r['open'] * 1000:>9.1f} {r['rss']:>8.1f} {r['query'] * 1000:>13.2f}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
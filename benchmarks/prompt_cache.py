@@ -0,0 +1,94 @@
+"""Benchmark: agent LLM calls with and without prompt-prefix caching, on a local stand-in.
+
+Usage:  python -m benchmarks.prompt_cache --turns 40 --prefill-ms-per-1k 100
+
+Flash and Pro are FakeChatModels whose latency grows with the prompt
+(``--prefill-ms-per-1k`` per 1,000 prompt tokens on top of ``--latency``);
+cached contents live in FakeCacheBackend. Each turn sends one query through
+the agent's real chain (system prompt + all tools, agents/friday_agent.py),
+alternating between the two models, ``--gap`` virtual seconds apart, so the
+``--ttl`` and ``--renew`` settings are exercised without waiting:
+
+* uncached     — plain clients, as before
+* cached       — PrefixCachedChatModel (core/prompt_cache.py)
+* unavailable  — PrefixCachedChatModel whose backend rejects every cache;
+                 calls must fall back to the uncached request transparently
+* too small    — ``--min-tokens`` applied (default: Gemini 2.5 Flash's 1,024);
+                 the prefix is skipped locally without any create call
+
+Reported: prompt and cache-read tokens, simulated prefill time, measured call
+latency, and cache hits / registrations / renewals.
+"""
+
+import argparse
+import time
+
+from agents.friday_agent import build_chain, build_system_prompt
+from benchmarks.common import fake_tools, percentile
+from core.prompt_cache import PrefixCachedChatModel, PromptCache, estimate_tokens
+from tests.fakes import FakeCacheBackend, FakeChatModel
+
+QUERIES = ["tell me a joke", "what's the weather in Pune", "play believer", "how was your day",
+           "explain recursion simply", "pause the music", "open github.com", "motivate me"]
+MODELS = ("gemini-2.5-flash", "gemini-2.5-pro")
+
+
+def run(args, scenario: str) -> dict:
+    clock = [0.0]
+    backend = FakeCacheBackend(clock=lambda: clock[0], fail=scenario == "unavailable")
+    min_tokens = {"*": args.min_tokens} if scenario == "too small" else {}
+    cache = PromptCache(args.ttl, args.renew, args.ttl, min_tokens, clock=lambda: clock[0], background=False)
+    tools = fake_tools()
+    chains = {}
+    for model in MODELS:
+        llm = FakeChatModel(args.latency, model, prefill_per_1k=args.prefill_ms_per_1k / 1000, caches=backend)
+        if scenario != "uncached":
+            llm = PrefixCachedChatModel(llm, model, cache, backend)
+        chains[model] = build_chain(llm, tools)
+
+    result = {"prompt": 0, "cached": 0, "prefill": 0.0, "latencies": [], "answers": []}
+    for turn in range(args.turns):
+        clock[0] = turn * args.gap
+        query = QUERIES[turn % len(QUERIES)]
+        start = time.perf_counter()
+        response = chains[MODELS[turn % 2]].invoke({"input": query, "chat_history": []})
+        result["latencies"].append(time.perf_counter() - start)
+        usage = response.usage_metadata
+        cached = usage["input_token_details"]["cache_read"]
+        result["prompt"] += usage["input_tokens"]
+        result["cached"] += cached
+        result["prefill"] += (usage["input_tokens"] - cached) / 1000 * args.prefill_ms_per_1k / 1000
+        result["answers"].append((response.content, [c["name"] for c in response.tool_calls]))
+    result["stats"] = cache.stats()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.02, help="fixed seconds per call")
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=100.0)
+    parser.add_argument("--gap", type=float, default=60.0, help="virtual seconds between turns")
+    parser.add_argument("--ttl", type=float, default=900.0)
+    parser.add_argument("--renew", type=float, default=180.0)
+    parser.add_argument("--min-tokens", type=int, default=1024)
+    args = parser.parse_args()
+
+    tools = fake_tools()
+    prefix = estimate_tokens(build_system_prompt([t.name for t in tools]), tools)
+    print(f"static prefix (system prompt + 6 tool schemas): ~{prefix} tokens\n")
+    print(f"{'scenario':>12} {'prompt tok':>11} {'cached tok':>11} {'prefill ms':>11} {'p50 ms':>7} "
+          f"{'hits':>5} {'created':>8} {'renewed':>8} {'failed':>7} {'skipped':>8} {'same answers':>13}")
+    baseline = None
+    for scenario in ("uncached", "cached", "unavailable", "too small"):
+        r = run(args, scenario)
+        baseline = baseline or r["answers"]
+        s = r["stats"]
+        print(f"{scenario:>12} {r['prompt']:>11} {r['cached']:>11} {r['prefill'] * 1000:>11.0f} "
+              f"{percentile(r['latencies'], 0.5) * 1000:>7.1f} {s.get('hit', 0):>5} {s.get('created', 0):>8} "
+              f"{s.get('renewed', 0):>8} {s.get('create_failed', 0):>7} {s.get('too_small', 0):>8} "
+              f"{str(r['answers'] == baseline):>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark: a burst of voice and background LLM calls with and without the scheduler.
+
+Usage:  python -m benchmarks.scheduler_load --voice 20 --background 60 --quota 4
+
+A stand-in model (FakeChatModel with ``--latency``) fails with a 429, like
+Gemini, whenever more than ``--quota`` calls are in flight at once. Over
+``--burst`` seconds, ``--background`` calls (memory/summary work) and
+``--voice`` turns arrive evenly interleaved, all concurrently on one event loop:
+
+* unscheduled — every call goes straight to the model
+* scheduled   — calls go through TurnScheduler with a per-model limit of
+                ``--quota``, voice ahead of background, default deadlines
+
+For each class it reports completed calls, quota errors, scheduler
+rejections and latency percentiles, plus the peak queue depth.
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import percentile
+from core.scheduler import ScheduledChatModel, SchedulerRejected, TurnScheduler, priority
+from tests.fakes import FakeChatModel
+
+
+class QuotaModel(FakeChatModel):
+    """FakeChatModel that answers 429 while more than `quota` calls are in flight."""
+
+    def __init__(self, latency: float, quota: int):
+        super().__init__(latency, "quota")
+        self.quota = quota
+        self.in_flight = 0
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.in_flight += 1
+        try:
+            if self.in_flight > self.quota:
+                await asyncio.sleep(0.05)
+                raise RuntimeError("429 RESOURCE_EXHAUSTED: quota exceeded")
+            return await super().ainvoke(input, config, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+async def run(args, use_scheduler: bool) -> dict:
+    model = QuotaModel(args.latency, args.quota)
+    scheduler = TurnScheduler({"quota": args.quota}) if use_scheduler else None
+    llm = ScheduledChatModel(model, "quota", scheduler) if scheduler else model
+    results = {p: {"latencies": [], "errors": 0, "rejected": 0} for p in ("voice", "background")}
+    peak = 0
+
+    async def call(prio: str, delay: float):
+        await asyncio.sleep(delay)
+        with priority(prio):
+            start = time.perf_counter()
+            try:
+                await llm.ainvoke("tell me a joke")
+                results[prio]["latencies"].append(time.perf_counter() - start)
+            except SchedulerRejected:
+                results[prio]["rejected"] += 1
+            except RuntimeError:
+                results[prio]["errors"] += 1
+
+    async def watch():
+        nonlocal peak
+        while True:
+            if scheduler:
+                peak = max(peak, sum(s["queued"] for s in scheduler.stats().values()))
+            await asyncio.sleep(0.02)
+
+    total = args.voice + args.background
+    voice_slots = set(range(0, total, max(1, total // max(1, args.voice)))[:args.voice])
+    kinds = ["voice" if i in voice_slots else "background" for i in range(total)]
+    watcher = asyncio.create_task(watch())
+    await asyncio.gather(*(call(kind, args.burst * i / total) for i, kind in enumerate(kinds)))
+    watcher.cancel()
+    return {"results": results, "peak_queue": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--voice", type=int, default=20)
+    parser.add_argument("--background", type=int, default=60)
+    parser.add_argument("--quota", type=int, default=4, help="concurrent calls before the model answers 429")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per model call")
+    parser.add_argument("--burst", type=float, default=2.0, help="seconds over which calls arrive")
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'class':<11} {'done':>5} {'429s':>5} {'rejected':>9} {'p50 s':>6} {'p95 s':>6}")
+    for use_scheduler in (False, True):
+        r = asyncio.run(run(args, use_scheduler))
+        mode = "scheduled" if use_scheduler else "unscheduled"
+        for prio in ("voice", "background"):
+            c = r["results"][prio]
+            print(f"{mode:<12} {prio:<11} {len(c['latencies']):>5} {c['errors']:>5} {c['rejected']:>9} "
+                  f"{percentile(c['latencies'], 0.5):>6.2f} {percentile(c['latencies'], 0.95):>6.2f}")
+        if use_scheduler:
+            print(f"Peak scheduler queue depth: {r['peak_queue']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark: speculative routing on partial transcripts vs. waiting for the final one.
+
+Usage:  python -m benchmarks.streaming_stt --route-latency 0.6 --pause 0.8
+
+Each scripted utterance is written as a 16 kHz WAV clip (a tone while
+"speaking", ``--pause`` seconds of silence after it, like the pause a
+recognizer waits out before ending the utterance) plus a sidecar transcript,
+and streamed in 100 ms chunks at real-time pace through ScriptedRecognizer
+(a stand-in for Vosk; no speech model or recorded speech is needed).
+
+For every clip the time from the end of speech until the route decision and
+the retrieved memories are ready is measured twice:
+
+* sequential  — recognize, then route (FakeChatModel with ``--route-latency``)
+                and retrieve, as voice mode did before
+* speculative — SpeculativeTurn starts both on stable partials; ``resolve``
+                reuses or redoes that work once the final transcript arrives
+
+Memory is a temporary store with ``--memories`` offline-embedded entries.
+"""
+
+import argparse
+import math
+import os
+import shutil
+import struct
+import tempfile
+import time
+import wave
+
+from benchmarks.common import HashingEmbedding, percentile
+from memory.memory_manager import MemoryManager
+from tests.fakes import FakeChatModel
+from ui.router import route_query
+from voice import ScriptedRecognizer, SpeculativeTurn, transcribe_stream, wav_chunks
+from voice.streaming import SAMPLE_RATE
+
+UTTERANCES = [
+    "what's the weather in mumbai today",
+    "play bohemian rhapsody by queen",
+    "remind me what we talked about yesterday",
+    "explain how transformers work in detail",
+    "open github dot com for me please",
+    "tell me a joke about programmers",
+    "what did i say about my sister's birthday",
+    "pause the music",
+]
+
+
+def write_clip(path: str, transcript: str, words_per_second: float, pause: float):
+    """Tone for the spoken part, silence for the trailing pause, plus `path`.txt."""
+    speech = int(len(transcript.split()) / words_per_second * SAMPLE_RATE)
+    silence = int(pause * SAMPLE_RATE)
+    tone = [int(8000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)) for i in range(speech)]
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(struct.pack(f"<{speech}h", *tone) + b"\0\0" * silence)
+    with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+        f.write(transcript)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--route-latency", type=float, default=0.6, help="seconds per router LLM call")
+    parser.add_argument("--pause", type=float, default=0.8, help="trailing silence before the endpoint")
+    parser.add_argument("--words-per-second", type=float, default=2.5)
+    parser.add_argument("--memories", type=int, default=2000)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (1 = real time)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="friday-stt-")
+    try:
+        router = FakeChatModel(args.route_latency, "flash")
+        memory_manager = MemoryManager(embedding_function=HashingEmbedding(), backend="mmap",
+                                       path=os.path.join(workdir, "memory"))
+        memory_manager.backend.add_texts(
+            [f"User asked: {UTTERANCES[i % len(UTTERANCES)]} (note {i})\nFriday responded: ok"
+             for i in range(args.memories)],
+            [{"timestamp": time.time() - i} for i in range(args.memories)])
+        retrieve = memory_manager.get_vector_retriever().invoke
+        route = lambda query: route_query(query, router)
+
+        clips = []
+        for i, text in enumerate(UTTERANCES):
+            path = os.path.join(workdir, f"clip{i}.wav")
+            write_clip(path, text, args.words_per_second, args.pause)
+            clips.append((path, text))
+
+        print(f"{'utterance':<44} {'seq ms':>7} {'spec ms':>8} {'specs':>6}  reused")
+        sequential, speculative, agree = [], [], 0
+        for path, text in clips:
+            pause = args.pause / args.speed
+
+            final = transcribe_stream(wav_chunks(path, speed=args.speed), ScriptedRecognizer.for_wav(path))
+            start = time.perf_counter()
+            seq_route, seq_docs = route(final), retrieve(final)
+            sequential.append(pause + time.perf_counter() - start)
+
+            turn = SpeculativeTurn(route, retrieve)
+            final = transcribe_stream(wav_chunks(path, speed=args.speed), ScriptedRecognizer.for_wav(path),
+                                      on_partial=turn.on_partial)
+            start = time.perf_counter()
+            spec_route, spec_docs = turn.resolve(final)
+            speculative.append(pause + time.perf_counter() - start)
+
+            agree += spec_route == seq_route and [d.page_content for d in spec_docs] == \
+                [d.page_content for d in seq_docs]
+            reused = [name for name in ("route", "retrieval") if turn.stats[f"{name}_reused"]]
+            print(f"{text[:44]:<44} {sequential[-1] * 1000:>7.0f} {speculative[-1] * 1000:>8.0f} "
+                  f"{turn.stats['speculations']:>6}  {', '.join(reused) or '-'}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"End of speech -> route + memories ready (incl. {args.pause:.1f}s endpoint pause): "
+          f"sequential p50 {percentile(sequential, 0.5) * 1000:.0f} ms, "
+          f"speculative p50 {percentile(speculative, 0.5) * 1000:.0f} ms")
+    print(f"Same route and memories as the sequential path: {agree}/{len(clips)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Load test: many concurrent Streamlit users against offline backends.
+
+Usage:  python -m benchmarks.streamlit_load --users 1 10 20 40 --turns 10 --latency 0.5
+
+Starts a real ``streamlit run`` server on the app (through
+benchmarks/streamlit_load_app.py), then opens one WebSocket session per
+simulated user and submits scripted chat turns over Streamlit's own
+protocol, the same messages a browser sends. As in production, every
+session shares the cached LLMs, agents and MemoryManager. The LLMs are
+FakeChatModel with a fixed per-call latency, the tools are stand-ins with
+``--tool-latency``, memory uses offline embeddings in a temporary store,
+and chat sessions go to a temporary SQLite file, so nothing touches the
+network.
+
+For each user count it reports turn throughput, per-turn latency
+percentiles (submit to script finished) and the error rate. The server's
+RSS is sampled every ``--rss-every`` seconds and can be written to
+``--rss-out`` as JSONL.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import percentile
+
+SCRIPT = [
+    "tell me a joke",
+    "what's the weather in mumbai",
+    "explain in detail how transformers work",
+    "play bohemian rhapsody",
+    "what can you do",
+    "pause the music",
+    "open github.com",
+    "remind me what we talked about",
+]
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+# ── server side ────────────────────────────────────
+def install_backends():
+    """Swap the app's cached resources for offline stand-ins (once per server).
+
+    Called by streamlit_load_app.py inside the Streamlit server; settings come
+    from the FRIDAY_LOAD_* environment variables set by the harness.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        import agents.friday_agent
+        import memory.session_store
+        import ui.loader
+
+        from benchmarks.common import HashingEmbedding, fake_tools
+        from tests.fakes import FakeChatModel
+        from memory.memory_manager import MemoryManager
+        from memory.session_store import SessionStore
+
+        latency = float(os.environ["FRIDAY_LOAD_LATENCY"])
+        tool_latency = float(os.environ["FRIDAY_LOAD_TOOL_LATENCY"])
+        workdir = os.environ["FRIDAY_LOAD_DIR"]
+
+        agents.friday_agent.all_tools = fake_tools(tool_latency)
+        flash, pro = FakeChatModel(latency, "flash"), FakeChatModel(latency, "pro")
+        memory_manager = MemoryManager(embedding_function=HashingEmbedding(),
+                                       backend=os.environ["FRIDAY_LOAD_BACKEND"],
+                                       path=os.path.join(workdir, "memory"))
+        flash_agent = agents.friday_agent.create_friday_agent(flash, memory_manager.conversational_memory)
+        pro_agent = agents.friday_agent.create_friday_agent(pro, memory_manager.conversational_memory)
+
+        ui.loader.load_llms = lambda: (flash, pro)
+        ui.loader.load_memory_manager = lambda: memory_manager
+        ui.loader.load_agents = lambda *a: (flash_agent, pro_agent)
+        memory.session_store._store = SessionStore(os.path.join(workdir, "sessions.db"))
+        _installed = True
+
+
+# ── harness side ───────────────────────────────────
+def rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, workdir: str, port: int) -> subprocess.Popen:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root, FRIDAY_LOAD_DIR=workdir,
+               FRIDAY_LOAD_LATENCY=str(args.latency), FRIDAY_LOAD_TOOL_LATENCY=str(args.tool_latency),
+               FRIDAY_LOAD_BACKEND=args.backend)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(root, "benchmarks", "streamlit_load_app.py"),
+         "--server.headless", "true", "--server.port", str(port), "--server.address", "127.0.0.1",
+         "--server.fileWatcherType", "none", "--server.enableXsrfProtection", "false",
+         "--browser.gatherUsageStats", "false"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=workdir,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("streamlit server exited during startup")
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("streamlit server did not start")
+
+
+class StreamlitUser:
+    """One browser-like session speaking Streamlit's WebSocket protocol."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.ws = None
+        self.chat_input_id = None
+        self.fragment_id = ""
+        self.texts = []
+        self.failed = False
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        await self._run()
+
+    async def _run(self, widget_states=None, fragment_id: str = ""):
+        """Send one rerun request and read messages until the script settles."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.fragment_id = fragment_id
+        for state in widget_states or []:
+            msg.rerun_script.widget_states.widgets.append(state)
+        await self.ws.send(msg.SerializeToString())
+
+        self.texts, self.failed = [], False
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(await self.ws.recv())
+            kind = reply.WhichOneof("type")
+            if kind == "delta" and reply.delta.WhichOneof("type") == "new_element":
+                element = reply.delta.new_element
+                which = element.WhichOneof("type")
+                if which == "chat_input":
+                    self.chat_input_id = element.chat_input.id
+                    self.fragment_id = reply.delta.fragment_id
+                elif which == "markdown":
+                    self.texts.append(element.markdown.body)
+                elif which == "exception":
+                    self.failed = True
+            elif kind == "script_finished":
+                if reply.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    self.failed = True
+                if reply.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return
+
+    async def say(self, text: str) -> bool:
+        """Submit one chat turn; returns True if it completed without an error."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState(id=self.chat_input_id)
+        state.chat_input_value.data = text
+        await self._run([state], self.fragment_id)
+        return not self.failed and not any("Sorry, something went wrong" in t for t in self.texts)
+
+    async def close(self):
+        await self.ws.close()
+
+
+async def simulate_user(url: str, user: int, turns: int, think: float, latencies: list, errors: list):
+    client = StreamlitUser(url)
+    await client.connect()
+    try:
+        for turn in range(turns):
+            start = time.perf_counter()
+            try:
+                ok = await client.say(SCRIPT[(user + turn) % len(SCRIPT)])
+            except Exception as e:
+                print(f"[Load] user {user} turn {turn}: {e}")
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors.append((user, turn))
+            if think:
+                await asyncio.sleep(think)
+    finally:
+        await client.close()
+
+
+async def run_level(url: str, users: int, args, pid: int) -> dict:
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(simulate_user(url, u, args.turns, args.think, latencies, errors)
+                           for u in range(users)))
+    elapsed = time.perf_counter() - start
+    total = users * args.turns
+    return {
+        "users": users, "turns": total, "throughput": total / elapsed,
+        "p50": percentile(latencies, 0.50), "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99), "error_rate": len(errors) / total,
+        "rss_mb": rss_mb(pid),
+    }
+
+
+async def sample_rss(pid: int, every: float, samples: list):
+    start = time.perf_counter()
+    while True:
+        samples.append({"t": round(time.perf_counter() - start, 2), "rss_mb": round(rss_mb(pid), 1)})
+        await asyncio.sleep(every)
+
+
+async def run(args, url: str, pid: int, samples: list):
+    sampler = asyncio.create_task(sample_rss(pid, args.rss_every, samples))
+    print(f"{'users':>6} {'turns':>6} {'turns/s':>8} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} "
+          f"{'errors':>7} {'rss MB':>7}")
+    try:
+        for users in args.users:
+            r = await run_level(url, users, args, pid)
+            print(f"{r['users']:>6} {r['turns']:>6} {r['throughput']:>8.2f} {r['p50']:>7.2f} {r['p95']:>7.2f} "
+                  f"{r['p99']:>7.2f} {r['error_rate']:>7.1%} {r['rss_mb']:>7.1f}")
+    finally:
+        sampler.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 20, 40])
+    parser.add_argument("--turns", type=int, default=10, help="turns per user")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per fake LLM call")
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="seconds per fake tool call")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds between a user's turns")
+    parser.add_argument("--backend", default="faiss", help="memory backend")
+    parser.add_argument("--rss-every", type=float, default=1.0)
+    parser.add_argument("--rss-out", help="write RSS samples here as JSONL")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="friday-load-")
+    port = free_port()
+    server = start_server(args, workdir, port)
+    samples = []
+    try:
+        asyncio.run(run(args, f"ws://127.0.0.1:{port}/_stcore/stream", server.pid, samples))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    peak = max(s["rss_mb"] for s in samples)
+    print(f"Server RSS: start {samples[0]['rss_mb']} MB, peak {peak} MB, end {samples[-1]['rss_mb']} MB")
+    if args.rss_out:
+        with open(args.rss_out, "w") as f:
+            for sample in samples:
+                f.write(json.dumps(sample) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Streamlit entry point used by benchmarks.streamlit_load.
+
+Runs the real ``streamlit_app.py`` with its cached resources swapped for
+offline stand-ins (see ``install_backends``). Not meant to be run by hand.
+"""
+
+import os
+import runpy
+
+from benchmarks.streamlit_load import install_backends
+
+install_backends()
+runpy.run_path(os.path.join(os.path.dirname(__file__), "..", "streamlit_app.py"), run_name="__main__")
@@ -0,0 +1,77 @@
+"""Streamlit script rerun time versus chat history length.
+
+Usage:  python -m benchmarks.streamlit_rerun --sizes 10 100 1000 --runs 5
+
+Drives ``streamlit_app.py`` headlessly with Streamlit's AppTest, with the
+LLMs, agents and memory swapped for offline stand-ins. For each history
+size it times a full script rerun:
+
+* before — every message rendered on each rerun (history window = all)
+* after  — the paged history window (ui.state.PAGE_SIZE messages)
+
+A turn submitted through the chat fragment costs less still, since only the
+fragment reruns; the "after" column is the worst case (a full rerun).
+"""
+
+import argparse
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+import ui.loader
+from tests.fakes import FakeChatModel
+from ui.state import PAGE_SIZE
+
+
+class _StubMemory:
+    conversational_memory = None
+
+
+def _patch_loaders():
+    flash, pro = FakeChatModel(0.0, "flash"), FakeChatModel(0.0, "pro")
+    ui.loader.load_llms = lambda: (flash, pro)
+    ui.loader.load_memory_manager = lambda: _StubMemory()
+    ui.loader.load_agents = lambda *a: (None, None)
+    ui.loader.load_warmup = lambda *a: None  # no background work in the timed reruns
+
+
+def _history(n: int) -> list:
+    messages = []
+    for i in range(n):
+        role = "user" if i % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": f"Message {i}: **markdown** with `code` and a bit of text " * 3})
+    return messages
+
+
+def time_rerun(size: int, window: int, runs: int) -> float:
+    at = AppTest.from_file("../streamlit_app.py", default_timeout=60)
+    at.session_state["messages"] = _history(size)
+    at.session_state["history_window"] = window
+    at.run()  # warm-up run
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+    if at.exception:
+        raise RuntimeError(at.exception)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    _patch_loaders()
+    print(f"{'messages':>9} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    for size in args.sizes:
+        before = time_rerun(size, max(size, 1), args.runs)
+        after = time_rerun(size, PAGE_SIZE, args.runs)
+        print(f"{size:>9} {before * 1000:>10.1f} {after * 1000:>9.1f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Benchmark: word error rate and real-time factor of the speech-to-text backends.
+
+Usage:
+    python -m benchmarks.stt_accuracy --backends whisper               # bundled command clips
+    python -m benchmarks.stt_accuracy --record-clips ./stt_clips       # or your own voice
+    python -m benchmarks.stt_accuracy --clips ./stt_clips --backends whisper google \\
+        --google-cassette ./cassettes/stt_google.jsonl
+
+A clip set is a directory of 16-bit mono WAV files, each with a sidecar
+``.txt`` holding the reference transcript. benchmarks/stt_clips/ ships one:
+the voice commands in benchmarks/stt_prompts.txt, synthesized in two voices
+(see its SOURCE.txt), so results are comparable between machines and need no
+download. ``--record-clips`` builds one by reading the same commands aloud,
+and ``--fetch-librispeech`` one from the first ``--count`` utterances of
+LibriSpeech test-clean (read English speech, CC BY 4.0; only the start of the
+archive is downloaded).
+
+The Google path needs the network, so it is measured through a recorded
+stand-in: run once with ``--record-google`` to capture its transcripts and
+latencies into ``--google-cassette``, then every later run replays them
+offline with the recorded latency. Whisper runs in-process; its one-off model
+load is reported separately from per-clip decoding.
+
+Reported per backend: WER (word edits / reference words, after lowercasing
+and dropping punctuation), RTF (processing time / audio duration; < 1 is
+faster than real time), p50/p95 per-clip latency, and for whisper the
+throughput with ``--workers`` concurrent decoders.
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+import wave
+
+from benchmarks.common import percentile
+from core.cassette import Cassette
+from voice.streaming import SAMPLE_RATE
+
+PROMPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stt_prompts.txt")
+CLIPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stt_clips")
+LIBRISPEECH_URL = "https://www.openslr.org/resources/12/test-clean.tar.gz"
+LIBRISPEECH_CREDIT = ("Clips from LibriSpeech test-clean (https://www.openslr.org/12), CC BY 4.0.\n"
+                      "V. Panayotov, G. Chen, D. Povey, S. Khudanpur, \"LibriSpeech: an ASR corpus\n"
+                      "based on public domain audio books\", ICASSP 2015.\n")
+
+
+def normalize(text: str) -> list:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_errors(reference: str, hypothesis: str) -> int:
+    """Word-level edit distance (substitutions + insertions + deletions)."""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, other in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (word != other))
+    return row[-1]
+
+
+def load_clips(directory: str) -> list:
+    """[(name, pcm, sample_rate, seconds, reference)] for every WAV with a transcript."""
+    clips = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        transcript = os.path.splitext(path)[0] + ".txt"
+        if not os.path.exists(transcript):
+            continue
+        with wave.open(path, "rb") as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                raise ValueError(f"{path}: expected 16-bit mono audio")
+            rate = wav.getframerate()
+            pcm = wav.readframes(wav.getnframes())
+        with open(transcript, encoding="utf-8") as f:
+            clips.append((os.path.basename(path), pcm, rate, len(pcm) / 2 / rate, f.read().strip()))
+    return clips
+
+
+def write_clip(directory: str, name: str, pcm: bytes, transcript: str):
+    """Save 16-bit mono PCM at SAMPLE_RATE as `name`.wav with its `name`.txt transcript."""
+    path = os.path.join(directory, f"{name}.wav")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+        f.write(transcript)
+
+
+def record_clips(directory: str):
+    """Prompt for each line of stt_prompts.txt and record it from the microphone."""
+    from voice import EnergyVAD, microphone_chunks, until_silence
+
+    os.makedirs(directory, exist_ok=True)
+    with open(PROMPTS, encoding="utf-8") as f:
+        prompts = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    for i, prompt in enumerate(prompts):
+        input(f"[{i + 1}/{len(prompts)}] Press Enter, then say: \"{prompt}\"")
+        pcm = until_silence(microphone_chunks(chunk_ms=30), EnergyVAD(ratio=0.0, calibration_chunks=0))
+        write_clip(directory, f"clip{i:03d}", pcm, prompt)
+    print(f"Recorded {len(prompts)} clips to {directory}")
+
+
+def fetch_librispeech(directory: str, count: int = 40, url: str = LIBRISPEECH_URL):
+    """Stream the LibriSpeech archive and keep its first `count` utterances as a clip set.
+
+    The archive is read as a stream and the download stops as soon as enough
+    utterances (FLAC, decoded with SpeechRecognition's bundled flac) and their
+    chapter transcripts have been seen.
+    """
+    import io
+    import tarfile
+    import urllib.request
+
+    import speech_recognition as sr
+
+    os.makedirs(directory, exist_ok=True)
+    audio, transcripts, written = {}, {}, 0
+    with urllib.request.urlopen(url) as response, tarfile.open(fileobj=response, mode="r|gz") as tar:
+        for member in tar:
+            name = os.path.basename(member.name)
+            if name.endswith(".flac"):
+                audio[name[:-len(".flac")]] = tar.extractfile(member).read()
+            elif name.endswith(".trans.txt"):
+                for line in tar.extractfile(member).read().decode("utf-8").splitlines():
+                    utterance, _, text = line.partition(" ")
+                    transcripts[utterance] = text.lower()
+            else:
+                continue
+            # chapters list their transcript before or after the audio: save pairs as they complete
+            for utterance in sorted(audio.keys() & transcripts.keys()):
+                with sr.AudioFile(io.BytesIO(audio.pop(utterance))) as source:
+                    data = sr.Recognizer().record(source)
+                pcm = data.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+                write_clip(directory, utterance, pcm, transcripts.pop(utterance))
+                written += 1
+                if written >= count:
+                    break
+            if written >= count:
+                break
+    with open(os.path.join(directory, "SOURCE.txt"), "w", encoding="utf-8") as f:
+        f.write(LIBRISPEECH_CREDIT)
+    print(f"Saved {written} LibriSpeech clips to {directory}")
+
+
+def make_backend(name: str, args):
+    from voice.stt import GoogleSTT, WhisperSTT
+
+    if name == "google":
+        mode = "record" if args.record_google else "replay"
+        return GoogleSTT(cassette=Cassette(args.google_cassette, mode))
+    return WhisperSTT(args.whisper_model, threads=args.threads, batch_size=args.batch_size,
+                      workers=args.workers)
+
+
+def evaluate(stt, clips: list) -> dict:
+    errors = words = 0
+    latencies, audio = [], 0.0
+    for name, pcm, rate, seconds, reference in clips:
+        start = time.perf_counter()
+        hypothesis = stt.transcribe(pcm, rate)
+        latencies.append(time.perf_counter() - start)
+        audio += seconds
+        errors += word_errors(reference, hypothesis)
+        words += len(normalize(reference))
+    return {"wer": errors / max(1, words), "rtf": sum(latencies) / max(audio, 1e-9),
+            "p50": percentile(latencies, 0.50), "p95": percentile(latencies, 0.95)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", default=CLIPS,
+                        help="directory of WAV clips with .txt transcripts (default: the bundled command clips)")
+    parser.add_argument("--record-clips", metavar="DIR", help="record a clip set from the microphone")
+    parser.add_argument("--fetch-librispeech", metavar="DIR",
+                        help="build a clip set from LibriSpeech test-clean (CC BY 4.0)")
+    parser.add_argument("--count", type=int, default=40, help="utterances for --fetch-librispeech")
+    parser.add_argument("--backends", nargs="+", default=["whisper", "google"], choices=["whisper", "google"])
+    parser.add_argument("--google-cassette", default="./cassettes/stt_google.jsonl")
+    parser.add_argument("--record-google", action="store_true",
+                        help="call the Google API and record it to --google-cassette")
+    parser.add_argument("--whisper-model", default="base.en")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=2, help="concurrent whisper decoders")
+    args = parser.parse_args()
+
+    if args.record_clips:
+        record_clips(args.record_clips)
+        return
+    if args.fetch_librispeech:
+        fetch_librispeech(args.fetch_librispeech, args.count)
+        return
+    clips = load_clips(args.clips)
+    if not clips:
+        parser.error(f"no WAV clips with .txt transcripts in {args.clips}")
+    print(f"{len(clips)} clips, {sum(c[3] for c in clips):.1f}s of audio")
+
+    print(f"{'backend':<10} {'WER':>6} {'RTF':>6} {'p50 s':>7} {'p95 s':>7}  notes")
+    for name in args.backends:
+        stt = make_backend(name, args)
+        r = evaluate(stt, clips)
+        notes = "recorded stand-in" if name == "google" and not args.record_google else ""
+        if name == "whisper":
+            start = time.perf_counter()
+            stt.transcribe_many([pcm for _, pcm, rate, _, _ in clips], clips[0][2])
+            concurrent = sum(c[3] for c in clips) / (time.perf_counter() - start)
+            notes = (f"load {stt.load_seconds:.1f}s, {args.threads} threads; "
+                     f"{args.workers} workers: {concurrent:.1f}s audio/s")
+        if name == "google" and args.record_google:
+            stt.cassette.close()
+        print(f"{name:<10} {r['wer']:>6.1%} {r['rtf']:>6.2f} {r['p50']:>7.2f} {r['p95']:>7.2f}  {notes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Benchmark: prompt size and latency of the agent call with all tools vs preselected tools.
+
+Usage:  python -m benchmarks.tool_preselect                 # offline, estimated tokens
+        python -m benchmarks.tool_preselect --embeddings default --live   # real Gemini Flash
+
+Runs a fixed set of queries (tool commands and plain chat, each labelled with
+the tool it needs) through ToolSelector (agents/tool_selector.py) and reports:
+
+* selection — how often the needed tool was kept, how often chat got no tools,
+  the average number of tools bound and the time selection adds per query
+* follow-ups — how often the tool a follow-up ("and in Delhi?") continues is
+  kept, selecting on the query alone and with the previous user turn
+* prompt tokens — system prompt plus bound tool schemas, per query, for the
+  full tool set and for the preselected subset. Offline this is estimated
+  (~4 characters per token over the prompt and the JSON tool schemas); with
+  ``--live`` it is Gemini's own ``input_tokens`` count, next to the measured
+  call latency of both variants.
+
+``--embeddings hashing`` (the default) needs no model download; ``default``
+uses the sentence-transformers model memory is configured with.
+"""
+
+import argparse
+import json
+import time
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from agents.friday_agent import build_chain, build_system_prompt
+from agents.tool_selector import ToolSelector
+from benchmarks.common import HashingEmbedding, fake_tools, percentile
+
+# (query, tool it needs or None)
+QUERIES = [
+    ("what's the weather in Chennai today", "Weather"),
+    ("is it cold outside right now", "Weather"),
+    ("how hot is it in Jaipur", "Weather"),
+    ("play tum hi ho by arijit singh", "SpotifyPlayer"),
+    ("put on some lofi beats", "SpotifyPlayer"),
+    ("play the song believer", "SpotifyPlayer"),
+    ("pause the music please", "SpotifyPauser"),
+    ("stop the song for a minute", "SpotifyPauser"),
+    ("open youtube.com", "WebsiteOpener"),
+    ("go to the github website", "WebsiteOpener"),
+    ("open notepad", "AppOpener"),
+    ("launch the calculator app", "AppOpener"),
+    ("where is chrome installed on my pc", "AppFinder"),
+    ("tell me a joke about programmers", None),
+    ("how are you doing today friday", None),
+    ("explain how a hash map works", None),
+    ("what did I tell you about my exam yesterday", None),
+    ("write a short poem about rain", None),
+    ("what's the difference between a list and a tuple in python", None),
+    ("thank you, that was helpful", None),
+    ("who was the first person on the moon", None),
+    ("give me a motivational quote", None),
+    ("help me plan my study schedule for the week", None),
+    ("can you summarize what recursion is", None),
+]
+# (previous user turn, follow-up, tool the follow-up needs or None)
+FOLLOW_UPS = [
+    ("what's the weather in Mumbai", "and in Delhi?", "Weather"),
+    ("how hot is it in Jaipur", "what about tomorrow", "Weather"),
+    ("play believer by imagine dragons", "play it again", "SpotifyPlayer"),
+    ("play shape of you", "now something by arijit singh", "SpotifyPlayer"),
+    ("open youtube.com", "and github too", "WebsiteOpener"),
+    ("open notepad", "the calculator as well", "AppOpener"),
+    ("what's the weather in Chennai", "thanks, that's all", None),
+    ("play some lofi beats", "you're the best friday", None),
+]
+
+
+def estimated_tokens(tools: list) -> int:
+    text = build_system_prompt([t.name for t in tools])
+    text += "".join(json.dumps(convert_to_openai_tool(t)) for t in tools)
+    return len(text) // 4
+
+
+def live_call(llm, tools: list, query: str) -> tuple:
+    """(input tokens, seconds) of one real agent LLM call."""
+    chain = build_chain(llm, tools)
+    start = time.perf_counter()
+    response = chain.invoke({"input": query, "chat_history": []})
+    seconds = time.perf_counter() - start
+    return (response.usage_metadata or {}).get("input_tokens", 0), seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--embeddings", choices=["hashing", "default"], default="hashing")
+    parser.add_argument("--top-k", type=int, default=2)
+    parser.add_argument("--margin", type=float, default=0.05)
+    parser.add_argument("--live", action="store_true", help="call Gemini Flash (needs GOOGLE_API_KEY)")
+    args = parser.parse_args()
+
+    if args.embeddings == "default":
+        from memory.memory_manager import default_embeddings
+        embeddings = default_embeddings()
+    else:
+        embeddings = HashingEmbedding()
+    tools = fake_tools()
+    selector = ToolSelector(embeddings, tools, args.top_k, args.margin)
+    llm = None
+    if args.live:
+        from core.llm_engine import get_flash_llm
+        llm = get_flash_llm()
+
+    full_tokens = estimated_tokens(tools)
+    rows = {"full": [], "preselected": []}
+    kept = needed = quiet = chat = bound = 0
+    select_times = []
+    print(f"{'query':<48} {'needs':>14} {'bound':<28}")
+    for query, tool in QUERIES:
+        start = time.perf_counter()
+        subset = selector.select(query)
+        select_times.append(time.perf_counter() - start)
+        names = [t.name for t in subset]
+        bound += len(subset)
+        if tool:
+            needed += 1
+            kept += tool in names
+        else:
+            chat += 1
+            quiet += not subset
+        print(f"{query[:48]:<48} {tool or '-':>14} {','.join(names) or '-':<28}")
+
+        if llm is not None:
+            for name, bound_tools in (("full", tools), ("preselected", subset)):
+                rows[name].append(live_call(llm, bound_tools, query))
+        else:
+            rows["full"].append((full_tokens, None))
+            rows["preselected"].append((estimated_tokens(subset), None))
+
+    print(f"\nneeded tool kept: {kept}/{needed}   chat with no tools: {quiet}/{chat}   "
+          f"avg tools bound: {bound / len(QUERIES):.2f} of {len(tools)}   "
+          f"selection p50: {percentile(select_times, 0.5) * 1000:.2f} ms")
+    print(f"\n{'follow-up':<32} {'needs':>14} {'alone':<24} {'with previous turn':<24}")
+    kept = {"alone": 0, "previous": 0}
+    quiet = {"alone": 0, "previous": 0}
+    for previous, query, tool in FOLLOW_UPS:
+        alone = [t.name for t in selector.select(query)]
+        joined = [t.name for t in selector.select(query, previous)]
+        for variant, names in (("alone", alone), ("previous", joined)):
+            if tool:
+                kept[variant] += tool in names
+            else:
+                quiet[variant] += not names
+        print(f"{query[:32]:<32} {tool or '-':>14} {','.join(alone) or '-':<24} {','.join(joined) or '-':<24}")
+    tool_follow_ups = sum(1 for *_, tool in FOLLOW_UPS if tool)
+    chat_follow_ups = len(FOLLOW_UPS) - tool_follow_ups
+    for variant, label in (("alone", "alone"), ("previous", "with previous turn")):
+        print(f"{label:>18}: needed tool kept {kept[variant]}/{tool_follow_ups}, "
+              f"chat with no tools {quiet[variant]}/{chat_follow_ups}")
+
+    source = "Gemini input_tokens" if llm is not None else "estimated, ~4 chars/token"
+    print(f"\nprompt tokens: {source}")
+    print(f"{'variant':>12} {'avg prompt tokens':>18} {'p50 s':>7} {'p95 s':>7}")
+    for name, results in rows.items():
+        tokens = sum(r[0] for r in results) / len(results)
+        latencies = [r[1] for r in results if r[1] is not None]
+        timing = (f"{percentile(latencies, 0.5):>7.2f} {percentile(latencies, 0.95):>7.2f}"
+                  if latencies else f"{'n/a':>7} {'n/a':>7}")
+        print(f"{name:>12} {tokens:>18.0f} {timing}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compare long-term memory backends: insert throughput, query latency, startup.
+
+Usage:  python -m benchmarks.vector_backends --backends faiss chroma mmap --sizes 1000 10000
+
+For each backend and store size the store is prefilled in bulk, then:
+
+* insert  — ``--inserts`` single-interaction writes through MemoryManager's
+  path (embed + persist), reported as inserts/second
+* query   — p50/p95 of ``--queries`` k=3 similarity searches
+* startup — time to open the persisted store from disk in a fresh backend
+
+Embeddings are offline (HashingEmbedding) so only the backends are measured.
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import HashingEmbedding, percentile
+from memory.vector_backends import create_backend
+
+
+def interaction(i: int) -> str:
+    return f"User asked: question number {i} about topic {i % 97}\nFriday responded: answer {i} on topic {i % 97}"
+
+
+def prefill(backend, size: int, batch: int = 1000):
+    # bulk-load without per-batch persists so prefill cost isn't measured
+    for start in range(0, size, batch):
+        backend.add_texts([interaction(i) for i in range(start, min(size, start + batch))], persist=False)
+    backend.add_texts([interaction(size)])  # one persisted write to flush to disk
+
+
+def bench(name: str, size: int, args, embedding) -> dict:
+    path = tempfile.mkdtemp(prefix=f"friday-{name}-")
+    try:
+        backend = create_backend(embedding, name, path)
+        prefill(backend, size)
+
+        start = time.perf_counter()
+        for i in range(args.inserts):
+            backend.add_texts([interaction(size + 1 + i)])
+        insert_rate = args.inserts / (time.perf_counter() - start)
+
+        latencies = []
+        for i in range(args.queries):
+            start = time.perf_counter()
+            backend.search(f"question about topic {i % 97}", k=3)
+            latencies.append(time.perf_counter() - start)
+        del backend
+
+        start = time.perf_counter()
+        create_backend(embedding, name, path)
+        startup = time.perf_counter() - start
+
+        return {"insert_rate": insert_rate, "p50": percentile(latencies, 0.5),
+                "p95": percentile(latencies, 0.95), "startup": startup}
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["faiss", "chroma", "mmap"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--inserts", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    embedding = HashingEmbedding()
+    print(f"{'backend':>8} {'size':>7} {'inserts/s':>10} {'query p50 ms':>13} {'query p95 ms':>13} {'startup ms':>11}")
+    for size in args.sizes:
+        for name in args.backends:
+            r = bench(name, size, args, embedding)
+            print(f"{name:>8} {size:>7} {r['insert_rate']:>10.1f} {r['p50'] * 1000:>13.2f} "
+                  f"{r['p95'] * 1000:>13.2f} {r['startup'] * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Benchmark: memory, query latency and recall@3 of uncompressed, fp16 and PQ vector storage.
+
+Usage:  python -m benchmarks.vector_compression --size 100000 --rerank 4 10 25 50
+        python -m benchmarks.vector_compression --vectors ./faiss_db      # your own memories
+
+Builds one mmap store (memory/mmap_store.py) per compression setting from the
+same vectors, then runs ``--queries`` k=3 searches against each in a fresh
+process and reports:
+
+* MB per 1M vectors — the data a search scans (vectors.f32, vectors.f16 or
+  codes.u8), which every process searching the store ends up holding in RAM,
+  and the total on disk (the exact vectors are always kept for re-ranking)
+* RSS after queries — the searching process's resident memory growth at the
+  benchmarked size: mapped pages it touched plus temporaries
+* query latency p50/p95 and recall@3 against an exact brute-force search
+
+PQ (FRIDAY_VECTOR_PQ_M bytes per vector) is run once per ``--rerank`` factor
+(a shortlist of k * rerank rows).
+Without ``--vectors``, the vectors are synthetic 384-dimensional unit vectors
+from topic clusters on a low-dimensional subspace, a rough stand-in for
+MiniLM sentence embeddings; ``--vectors`` takes a .npy file or a faiss_db
+directory (only index.faiss is read, no pickle) and holds out the queries.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import percentile
+from config import FRIDAY_VECTOR_PQ_M
+
+DIM = 384
+
+
+def synthetic(n: int, seed: int, topics: int = 500, latent: int = 48) -> np.ndarray:
+    rng = np.random.default_rng(0)  # the same topics and subspace for every sample
+    centers = rng.normal(size=(topics, DIM)).astype(np.float32)
+    basis = rng.normal(size=(latent, DIM)).astype(np.float32) / np.sqrt(latent)
+    rng = np.random.default_rng(seed)
+    vectors = np.empty((n, DIM), dtype=np.float32)
+    for start in range(0, n, 65536):
+        rows = min(n, start + 65536) - start
+        block = centers[rng.integers(0, topics, rows)] * 0.5 + rng.normal(size=(rows, latent)).astype(np.float32) @ basis
+        vectors[start:start + rows] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return vectors
+
+
+def load_vectors(path: str) -> np.ndarray:
+    if os.path.isdir(path):
+        import faiss
+        index = faiss.read_index(os.path.join(path, "index.faiss"))
+        return index.reconstruct_n(0, index.ntotal)
+    return np.load(path, allow_pickle=False).astype(np.float32)
+
+
+def build(path: str, vectors: np.ndarray, compression: str, batch: int = 20000):
+    from memory.mmap_store import MmapBackend
+
+    store = MmapBackend(None, path, dim=vectors.shape[1], seed=False, compression=compression)
+    store.train_rows = min(store.train_rows, len(vectors))
+    for start in range(0, len(vectors), batch):
+        stop = min(len(vectors), start + batch)
+        store.add_embeddings([f"memory {i}" for i in range(start, stop)], vectors[start:stop],
+                             [{"timestamp": float(i)} for i in range(start, stop)], persist=False)
+    store.persist()
+    store.close()
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(args):
+    """Run the queries against one store; prints JSON for the parent."""
+    from memory.mmap_store import MmapBackend
+
+    store = MmapBackend(None, args.child, seed=False)
+    store.rerank = args.child_rerank
+    queries = np.load(args.child_queries)
+    before = rss_mb()
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = store.search_vector(query, args.k)
+        latencies.append(time.perf_counter() - start)
+        results.append([row for row, _ in hits])
+    print(json.dumps({"rss": rss_mb() - before, "latencies": latencies, "results": results}))
+
+
+def exact_top(vectors: np.ndarray, queries: np.ndarray, k: int) -> list:
+    norms = np.einsum("ij,ij->i", vectors, vectors)
+    return [set(np.argpartition(norms - 2.0 * (vectors @ q), k)[:k].tolist()) for q in queries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000, help="synthetic vectors to store")
+    parser.add_argument("--vectors", help=".npy file or faiss_db directory to use instead")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--rerank", type=int, nargs="+", default=[4, 10, 25, 50])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child-queries", help=argparse.SUPPRESS)
+    parser.add_argument("--child-rerank", type=int, default=10, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+
+    if args.vectors:
+        vectors = load_vectors(args.vectors)
+        queries, vectors = vectors[:args.queries], vectors[args.queries:]
+    else:
+        vectors = synthetic(args.size, seed=1)
+        queries = synthetic(args.queries, seed=2)
+    n, dim = vectors.shape
+    truth = exact_top(vectors, queries, args.k)
+
+    workdir = tempfile.mkdtemp(prefix="friday-compression-")
+    try:
+        query_path = os.path.join(workdir, "queries.npy")
+        np.save(query_path, queries)
+        runs = [("none", None), ("fp16", 1)] + [("pq", r) for r in args.rerank]
+        scanned = {"none": dim * 4, "fp16": dim * 2, "pq": FRIDAY_VECTOR_PQ_M}
+        built = {}
+        print(f"{n} vectors of {dim} dimensions, {len(queries)} queries, k={args.k}\n")
+        print(f"{'setting':>12} {'build s':>8} {'scan MB/1M':>11} {'disk MB/1M':>11} {'RSS MB':>7} "
+              f"{'p50 ms':>7} {'p95 ms':>7} {'recall@' + str(args.k):>9}")
+        for compression, rerank in runs:
+            path = os.path.join(workdir, compression)
+            if compression not in built:
+                start = time.perf_counter()
+                build(path, vectors, compression)
+                built[compression] = time.perf_counter() - start
+            command = [sys.executable, "-m", "benchmarks.vector_compression", "--child", path,
+                       "--child-queries", query_path, "--child-rerank", str(rerank or 1), "--k", str(args.k)]
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            out = json.loads(output.splitlines()[-1])
+            recall = np.mean([len(truth[i] & set(found)) / args.k for i, found in enumerate(out["results"])])
+            extra = {"none": 0, "fp16": dim * 2, "pq": FRIDAY_VECTOR_PQ_M}[compression]
+            label = compression if compression != "pq" else f"pq x{rerank}"
+            print(f"{label:>12} {built[compression]:>8.1f} {scanned[compression]:>11.0f} "
+                  f"{dim * 4 + extra:>11.0f} {out['rss']:>7.1f} "
+                  f"{percentile(out['latencies'], 0.5) * 1000:>7.2f} "
+                  f"{percentile(out['latencies'], 0.95) * 1000:>7.2f} {recall:>9.3f}")
+        print(f"\nMB/1M = bytes per vector (float32 {dim * 4}, fp16 {dim * 2}, PQ {FRIDAY_VECTOR_PQ_M}) x 1M / 1e6;"
+              f" documents and metadata columns not included")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Benchmark: first-turn latency after the wake word, with and without speculative warm-up.
+
+Usage:  python -m benchmarks.warmup --repeats 3 --speech-seconds 6 --connect-ms 120
+
+Every repetition starts cold: new Gemini clients, a fresh embedding model and an
+empty Spotify device cache. The wake word is heard, the user speaks for
+``--speech-seconds`` (Friday's "I'm here" plus the command), then the first turn
+runs the way main.py does: embed the query for memory retrieval, route it with
+Flash, call the agent on the chosen model and, for "play ...", start Spotify.
+
+The Gemini clients are the real ChatGoogleGenerativeAI/httpx stack pointed at a
+local stand-in for the API that answers after ``--model-ms`` and charges
+``--connect-ms`` for each new connection (TCP + TLS setup to Google). The
+embedding model's first call costs ``--embed-cold-ms``; Spotify's device
+lookup costs ``--spotify-ms``. Variants:
+
+* no warm-up         — the turn pays every cold cost itself
+* warm-up            — Warmup.trigger at the wake word (core/warmup.py), with
+                       the keep-alive of core/llm_engine.py
+* warm-up, httpx default keep-alive — the same, but idle connections are
+                       dropped after httpx's default 5 s, so a long command
+                       loses the warmed connections again
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+import tools.custom_tools as custom_tools
+from agents.friday_agent import build_chain
+from benchmarks.common import HashingEmbedding, percentile
+from core.llm_engine import _client_args
+from core.warmup import Warmup, warmup_tasks
+
+QUERIES = ["play believer by imagine dragons", "tell me a joke about computers",
+           "explain in detail how vaccines train the immune system"]
+
+
+class GeminiStandIn(BaseHTTPRequestHandler):
+    """Minimal Gemini REST API: model metadata and generateContent."""
+
+    protocol_version = "HTTP/1.1"
+    connect_seconds = 0.0
+    model_seconds = 0.0
+    connections = 0
+
+    def setup(self):
+        # paid once per connection, like the handshakes to the real endpoint
+        type(self).connections += 1
+        time.sleep(self.connect_seconds)
+        super().setup()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        name = self.path.split("?")[0].rsplit("/", 1)[-1]
+        self._reply({"name": f"models/{name}", "displayName": name, "inputTokenLimit": 1048576})
+
+    def do_POST(self):
+        request = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        time.sleep(self.model_seconds)
+        if '"tools"' in request and "play believer" in request:
+            part = {"functionCall": {"name": "SpotifyPlayer", "args": {"__arg1": "believer"}}}
+        elif '"tools"' not in request:
+            part = {"text": "powerful" if "in detail" in request else "standard"}
+        else:
+            part = {"text": "Here you go."}
+        self._reply({"candidates": [{"content": {"role": "model", "parts": [part]}, "finishReason": "STOP"}],
+                     "usageMetadata": {"promptTokenCount": len(request) // 4, "candidatesTokenCount": 3,
+                                       "totalTokenCount": len(request) // 4 + 3}})
+
+
+class ColdEmbedding(HashingEmbedding):
+    """Embeddings whose first call pays a one-off cost (model kernels, daemon connection)."""
+
+    def __init__(self, cold_seconds: float):
+        super().__init__()
+        self.cold_seconds = cold_seconds
+        self._lock = threading.Lock()
+        self._warm = False
+
+    def embed_query(self, text):
+        with self._lock:
+            if not self._warm:
+                time.sleep(self.cold_seconds)
+                self._warm = True
+        return super().embed_query(text)
+
+
+class SpotifyStandIn:
+    """The spotipy calls play_song_spotify makes; the device lookup is an API round trip."""
+
+    def __init__(self, devices_seconds: float):
+        self.devices_seconds = devices_seconds
+
+    def devices(self):
+        time.sleep(self.devices_seconds)
+        return {"devices": [{"id": "laptop", "name": "Laptop", "is_active": True}]}
+
+    def search(self, q, limit, type):
+        return {"tracks": {"items": [{"name": "Believer", "artists": [{"name": "Imagine Dragons"}],
+                                      "uri": "spotify:track:0"}]}}
+
+    def start_playback(self, device_id, uris):
+        pass
+
+
+def gemini(model: str, port: int, client_args: dict):
+    return ChatGoogleGenerativeAI(model=model, google_api_key="benchmark", base_url=f"http://127.0.0.1:{port}",
+                                  max_retries=1, client_args=client_args)
+
+
+def first_turn(query: str, flash, pro, embeddings) -> float:
+    """Seconds from the end of speech to the turn's result."""
+    start = time.perf_counter()
+    embeddings.embed_query(query)  # memory retrieval
+    model = pro if "powerful" in flash.invoke(f'Route this query: "{query}"').content else flash
+    agent_tools = [custom_tools.spotify_play_tool, custom_tools.spotify_pause_tool]
+    response = build_chain(model, agent_tools).invoke({"input": query, "chat_history": []})
+    for call in response.tool_calls:
+        if call["name"] == "SpotifyPlayer":
+            custom_tools.play_song_spotify(call["args"]["__arg1"])
+    return time.perf_counter() - start
+
+
+def run(args, port: int, variant: str, query: str) -> tuple:
+    client_args = {"limits": httpx.Limits()} if variant.startswith("warm-up, httpx") else _client_args()
+    flash = gemini("gemini-2.5-flash", port, client_args)
+    pro = gemini("gemini-2.5-pro", port, client_args)
+    embeddings = ColdEmbedding(args.embed_cold_ms / 1000)
+    custom_tools.sp = SpotifyStandIn(args.spotify_ms / 1000)
+    custom_tools._devices["value"] = None
+    GeminiStandIn.connections = 0
+
+    warmup = None
+    if variant != "no warm-up":
+        warmup = Warmup(warmup_tasks((flash, pro), embeddings), min_interval=0)
+        warmup.trigger("wake word")
+    time.sleep(args.speech_seconds)
+    seconds = first_turn(query, flash, pro, embeddings)
+    if warmup:
+        warmup.wait()
+    return seconds, GeminiStandIn.connections, warmup.stats()["last_ms"] if warmup else {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3, help="turns per query and variant")
+    parser.add_argument("--speech-seconds", type=float, default=6.0,
+                        help="wake word to end of the command")
+    parser.add_argument("--connect-ms", type=float, default=120.0, help="cost of a new Gemini connection")
+    parser.add_argument("--model-ms", type=float, default=300.0, help="Gemini time per call")
+    parser.add_argument("--embed-cold-ms", type=float, default=250.0, help="first embedding call")
+    parser.add_argument("--spotify-ms", type=float, default=250.0, help="Spotify device lookup")
+    args = parser.parse_args()
+
+    GeminiStandIn.connect_seconds = args.connect_ms / 1000
+    GeminiStandIn.model_seconds = args.model_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GeminiStandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    variants = ("no warm-up", "warm-up", "warm-up, httpx default keep-alive")
+    print(f"{'variant':>34} {'turns':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'connections':>12}")
+    warm_tasks = {}
+    for variant in variants:
+        latencies, connections = [], 0
+        for _ in range(args.repeats):
+            for query in QUERIES:
+                seconds, opened, last_ms = run(args, port, variant, query)
+                latencies.append(seconds)
+                connections += opened
+                if variant == "warm-up":
+                    warm_tasks = last_ms
+        print(f"{variant:>34} {len(latencies):>6} {percentile(latencies, 0.5) * 1000:>8.0f} "
+              f"{percentile(latencies, 0.95) * 1000:>8.0f} {max(latencies) * 1000:>8.0f} "
+              f"{connections / len(latencies):>12.1f}")
+    print(f"\nwarm-up task times (ms, off the critical path): {warm_tasks}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,163 @@ from dotenv import load_dotenv
 load_dotenv()
 
 #API keys 
-GOOGLE_API_KEY = os.getenv("GEMINI_API_KEYS")
+# GEMINI_API_KEYS may hold several comma-separated keys, each optionally
+# weighted as "key:weight" — they are pooled by core/key_pool.py
+GEMINI_API_KEYS = os.getenv("GEMINI_API_KEYS", "")
+GOOGLE_API_KEY = GEMINI_API_KEYS.split(",")[0].split(":")[0].strip() or None
 HUGGINGFACE_API_KEYS = os.getenv("HUGGINGFACE_API_KEYS")  
+
+#key pool: base cooldown (seconds) after a key hits a 429, and the longest a
+#request will wait for a key to come off cooldown before failing
+GEMINI_KEY_COOLDOWN_SECONDS = float(os.getenv("GEMINI_KEY_COOLDOWN_SECONDS", "60"))
+GEMINI_KEY_MAX_WAIT_SECONDS = float(os.getenv("GEMINI_KEY_MAX_WAIT_SECONDS", "30"))
+
+#record/replay of LLM + tool HTTP traffic (see core/cassette.py)
+#mode: "off", "record" or "replay"; latency: "original" or "zero"
+FRIDAY_CASSETTE_MODE = os.getenv("FRIDAY_CASSETTE_MODE", "off").lower()
+FRIDAY_CASSETTE_PATH = os.getenv("FRIDAY_CASSETTE_PATH", "./cassettes/session.jsonl.gz")
+FRIDAY_CASSETTE_LATENCY = os.getenv("FRIDAY_CASSETTE_LATENCY", "original").lower()
+
+#headless server (server.py)
+FRIDAY_SERVER_HOST = os.getenv("FRIDAY_SERVER_HOST", "127.0.0.1")
+FRIDAY_SERVER_PORT = int(os.getenv("FRIDAY_SERVER_PORT", "8000"))
+FRIDAY_SERVER_MAX_CONCURRENT = int(os.getenv("FRIDAY_SERVER_MAX_CONCURRENT", "32"))
+FRIDAY_SERVER_QUEUE_TIMEOUT = float(os.getenv("FRIDAY_SERVER_QUEUE_TIMEOUT", "10"))
+FRIDAY_SERVER_MAX_SESSIONS = int(os.getenv("FRIDAY_SERVER_MAX_SESSIONS", "1000"))
+
+#LLM call scheduler (core/scheduler.py): concurrent calls allowed per model, and
+#how long (seconds) each priority class may wait in the queue before rejection
+FRIDAY_SCHEDULER = os.getenv("FRIDAY_SCHEDULER", "1") == "1"
+FRIDAY_SCHEDULER_LIMITS = os.getenv("FRIDAY_SCHEDULER_LIMITS", "gemini-2.5-flash:8,gemini-2.5-pro:2")
+FRIDAY_SCHEDULER_DEFAULT_LIMIT = int(os.getenv("FRIDAY_SCHEDULER_DEFAULT_LIMIT", "4"))
+FRIDAY_SCHEDULER_DEADLINES = os.getenv("FRIDAY_SCHEDULER_DEADLINES", "voice:5,interactive:15,background:120")
+
+#persistent chat sessions (memory/session_store.py)
+#retention of 0 keeps sessions forever
+FRIDAY_SESSION_DB = os.getenv("FRIDAY_SESSION_DB", "./sessions/friday_sessions.db")
+FRIDAY_SESSION_RETENTION_DAYS = float(os.getenv("FRIDAY_SESSION_RETENTION_DAYS", "90"))
+FRIDAY_SESSION_BATCH_SIZE = int(os.getenv("FRIDAY_SESSION_BATCH_SIZE", "20"))
+FRIDAY_SESSION_FLUSH_SECONDS = float(os.getenv("FRIDAY_SESSION_FLUSH_SECONDS", "2"))
+
+#long-term memory vector backend: "faiss", "chroma", "mmap" or "sharded" (memory/vector_backends.py)
+#path defaults to ./faiss_db, ./chroma_db, ./memory_db or ./memory_shards depending on the backend
+FRIDAY_VECTOR_BACKEND = os.getenv("FRIDAY_VECTOR_BACKEND", "faiss").lower()
+FRIDAY_VECTOR_PATH = os.getenv("FRIDAY_VECTOR_PATH", "")
+
+#compressed vectors for new mmap stores and archived shards (memory/compression.py):
+#"none", "fp16" or "pq" (PQ_M one-byte codes per vector, trained once a store has
+#PQ_TRAIN_ROWS vectors); searches shortlist k * RERANK rows from the codes and
+#re-rank them with the exact vectors
+FRIDAY_VECTOR_COMPRESSION = os.getenv("FRIDAY_VECTOR_COMPRESSION", "none").lower()
+FRIDAY_VECTOR_PQ_M = int(os.getenv("FRIDAY_VECTOR_PQ_M", "48"))
+FRIDAY_VECTOR_PQ_TRAIN_ROWS = int(os.getenv("FRIDAY_VECTOR_PQ_TRAIN_ROWS", "10000"))
+FRIDAY_VECTOR_RERANK = int(os.getenv("FRIDAY_VECTOR_RERANK", "25"))
+
+#sharded memory (memory/sharded_store.py): one store per month in SHARD_FORMAT
+#("faiss" or "mmap"); the newest HOT_SHARDS months stay loaded, up to COLD_SHARDS
+#older months are kept loaded after a search needed them; searches fan out over
+#SHARD_WORKERS threads; with SEARCH_MONTHS > 0 a search without a time window
+#first tries the newest SEARCH_MONTHS months and widens to every older month when
+#fewer than k hits are within WIDEN_DISTANCE (squared L2; 0 = every month at once)
+FRIDAY_MEMORY_SHARD_FORMAT = os.getenv("FRIDAY_MEMORY_SHARD_FORMAT", "faiss").lower()
+FRIDAY_MEMORY_HOT_SHARDS = int(os.getenv("FRIDAY_MEMORY_HOT_SHARDS", "3"))
+FRIDAY_MEMORY_COLD_SHARDS = int(os.getenv("FRIDAY_MEMORY_COLD_SHARDS", "6"))
+FRIDAY_MEMORY_SHARD_WORKERS = int(os.getenv("FRIDAY_MEMORY_SHARD_WORKERS", "4"))
+FRIDAY_MEMORY_SEARCH_MONTHS = int(os.getenv("FRIDAY_MEMORY_SEARCH_MONTHS", "0"))
+FRIDAY_MEMORY_WIDEN_DISTANCE = float(os.getenv("FRIDAY_MEMORY_WIDEN_DISTANCE", "0.8"))
+
+#memory retrieval: candidates are re-ranked by (1 - w) * similarity + w * recency,
+#where recency halves every HALF_LIFE_DAYS; WINDOW_DAYS > 0 limits the search
+#to recent memories before scanning
+FRIDAY_MEMORY_RECENCY_WEIGHT = float(os.getenv("FRIDAY_MEMORY_RECENCY_WEIGHT", "0.3"))
+FRIDAY_MEMORY_HALF_LIFE_DAYS = float(os.getenv("FRIDAY_MEMORY_HALF_LIFE_DAYS", "30"))
+FRIDAY_MEMORY_WINDOW_DAYS = float(os.getenv("FRIDAY_MEMORY_WINDOW_DAYS", "0"))
+FRIDAY_MEMORY_FETCH_FACTOR = int(os.getenv("FRIDAY_MEMORY_FETCH_FACTOR", "4"))
+
+#sentence-transformers model used for every memory embedding (chat turns and
+#bulk ingestion via memory/ingest.py must agree)
+FRIDAY_EMBEDDING_MODEL = os.getenv("FRIDAY_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+#optional shared embedding daemon (python -m memory.embedding_service); when set,
+#processes embed through this Unix socket instead of loading their own model
+FRIDAY_EMBEDDING_SOCKET = os.getenv("FRIDAY_EMBEDDING_SOCKET", "")
+
+#short-term chat history kept per conversation (oldest messages are dropped)
+FRIDAY_CONVERSATION_MAX_MESSAGES = int(os.getenv("FRIDAY_CONVERSATION_MAX_MESSAGES", "40"))
+
+#opt-in memory footprint tracking (core/memwatch.py): JSONL time series of RSS
+#and tracemalloc per subsystem; growth is flagged when RSS rises by GROWTH_MB
+#across WINDOW consecutive samples
+FRIDAY_MEMWATCH_PATH = os.getenv("FRIDAY_MEMWATCH_PATH", "")
+FRIDAY_MEMWATCH_INTERVAL = float(os.getenv("FRIDAY_MEMWATCH_INTERVAL", "60"))
+FRIDAY_MEMWATCH_GROWTH_MB = float(os.getenv("FRIDAY_MEMWATCH_GROWTH_MB", "50"))
+FRIDAY_MEMWATCH_WINDOW = int(os.getenv("FRIDAY_MEMWATCH_WINDOW", "10"))
   
+#streaming speech recognition for voice mode (voice/): "vosk" transcribes while
+#the user speaks and starts routing/retrieval on stable partial transcripts;
+#empty keeps the one-shot Google recognizer
+FRIDAY_STT_STREAMING = os.getenv("FRIDAY_STT_STREAMING", "").lower()
+FRIDAY_VOSK_MODEL = os.getenv("FRIDAY_VOSK_MODEL", "./models/vosk-model-small-en-us-0.15")
+
+#speech-to-text for voice commands (voice/stt.py): "google" (network) or "whisper"
+#(faster-whisper on the CPU, offline); the whisper model loads once per process
+FRIDAY_STT_BACKEND = os.getenv("FRIDAY_STT_BACKEND", "google").lower()
+FRIDAY_WHISPER_MODEL = os.getenv("FRIDAY_WHISPER_MODEL", "base.en")
+FRIDAY_STT_THREADS = int(os.getenv("FRIDAY_STT_THREADS", "4"))
+FRIDAY_STT_BATCH_SIZE = int(os.getenv("FRIDAY_STT_BATCH_SIZE", "1"))
+
+#deterministic fast path (agents/fast_path.py): unambiguous tool commands such as
+#"pause the music" call the tool directly instead of the router + agent LLMs
+FRIDAY_FAST_PATH = os.getenv("FRIDAY_FAST_PATH", "1") == "1"
+
+#tool preselection (agents/tool_selector.py): each agent call binds only the tools
+#whose example requests match the query about as well as (within MARGIN) or
+#better than requests needing no tool, at most TOP_K; plain chat binds none
+FRIDAY_TOOL_PRESELECT = os.getenv("FRIDAY_TOOL_PRESELECT", "1") == "1"
+FRIDAY_TOOL_TOP_K = int(os.getenv("FRIDAY_TOOL_TOP_K", "2"))
+FRIDAY_TOOL_MARGIN = float(os.getenv("FRIDAY_TOOL_MARGIN", "0.05"))
+
+#prompt-prefix caching (core/prompt_cache.py): the agents' system prompt and tool
+#declarations are registered once per model and API key as a Gemini cached
+#content and renewed RENEW_SECONDS before their TTL runs out; prefixes below the
+#model's MIN_TOKENS ("model:tokens,...", estimated locally) and failed
+#registrations (retried after RETRY_SECONDS) are simply sent uncached; off by
+#default, since Friday's prefix (~800 tokens) is below both models' minimum
+FRIDAY_PROMPT_CACHE = os.getenv("FRIDAY_PROMPT_CACHE", "0") == "1"
+FRIDAY_PROMPT_CACHE_TTL_SECONDS = float(os.getenv("FRIDAY_PROMPT_CACHE_TTL_SECONDS", "3600"))
+FRIDAY_PROMPT_CACHE_RENEW_SECONDS = float(os.getenv("FRIDAY_PROMPT_CACHE_RENEW_SECONDS", "300"))
+FRIDAY_PROMPT_CACHE_RETRY_SECONDS = float(os.getenv("FRIDAY_PROMPT_CACHE_RETRY_SECONDS", "3600"))
+FRIDAY_PROMPT_CACHE_MIN_TOKENS = os.getenv("FRIDAY_PROMPT_CACHE_MIN_TOKENS", "gemini-2.5-flash:1024,gemini-2.5-pro:4096")
+
+#speculative warm-up (core/warmup.py): the wake word, a Streamlit page run or a
+#WebSocket connecting opens the Gemini connections, runs the embedding model once
+#and refreshes Spotify's device list in the background, at most once per
+#INTERVAL_SECONDS; Gemini clients keep idle connections for HTTP_KEEPALIVE_SECONDS
+#and play commands reuse the device list for SPOTIFY_DEVICES_TTL seconds
+FRIDAY_WARMUP = os.getenv("FRIDAY_WARMUP", "1") == "1"
+FRIDAY_WARMUP_INTERVAL_SECONDS = float(os.getenv("FRIDAY_WARMUP_INTERVAL_SECONDS", "30"))
+FRIDAY_HTTP_KEEPALIVE_SECONDS = float(os.getenv("FRIDAY_HTTP_KEEPALIVE_SECONDS", "120"))
+FRIDAY_SPOTIFY_DEVICES_TTL = float(os.getenv("FRIDAY_SPOTIFY_DEVICES_TTL", "30"))
+
+#adaptive routing (core/adaptive_router.py): a query the router sends to Pro goes
+#to Flash when Pro's recent p95 turn latency plus queue wait would exceed
+#SLO_SECONDS or its error rate is above MAX_ERROR_RATE (stats over the last
+#WINDOW_SECONDS, per query class once MIN_SAMPLES exist); every PROBE_EVERY-th
+#downgrade still tries Pro; decisions are appended to ROUTER_LOG when set
+FRIDAY_ADAPTIVE_ROUTING = os.getenv("FRIDAY_ADAPTIVE_ROUTING", "1") == "1"
+FRIDAY_ROUTER_SLO_SECONDS = float(os.getenv("FRIDAY_ROUTER_SLO_SECONDS", "15"))
+FRIDAY_ROUTER_MAX_ERROR_RATE = float(os.getenv("FRIDAY_ROUTER_MAX_ERROR_RATE", "0.25"))
+FRIDAY_ROUTER_WINDOW_SECONDS = float(os.getenv("FRIDAY_ROUTER_WINDOW_SECONDS", "300"))
+FRIDAY_ROUTER_MIN_SAMPLES = int(os.getenv("FRIDAY_ROUTER_MIN_SAMPLES", "5"))
+FRIDAY_ROUTER_PROBE_EVERY = int(os.getenv("FRIDAY_ROUTER_PROBE_EVERY", "20"))
+FRIDAY_ROUTER_LOG = os.getenv("FRIDAY_ROUTER_LOG", "")
+
+#barge-in for voice mode (voice/bargein.py): speaking over Friday stops playback
+#and the captured audio becomes the next command; opt-in, since without echo
+#cancellation loud speakers can still trigger it (headphones are safe)
+FRIDAY_BARGE_IN = os.getenv("FRIDAY_BARGE_IN", "0") == "1"
+
 #spotify client setup
 SPOTIPY_CLIENT_ID = os.getenv("SPOTIPY_CLIENT_ID")
 SPOTIPY_CLIENT_SECRET = os.getenv("SPOTIPY_CLIENT_SECRET")
-SPOTIPY_REDIRECT_URI = os.getenv("SPOTIPY_REDIRECT_URI")  
\ No newline at end of file
+SPOTIPY_REDIRECT_URI = os.getenv("SPOTIPY_REDIRECT_URI")  
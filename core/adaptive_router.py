@@ -0,0 +1,236 @@
+"""Latency-SLO-aware routing between the Flash and Pro agents.
+
+The LLM router (ui/router.py, ``select_model`` in main.py) decides what a
+query *asks for*; ``AdaptiveRouter.decide`` then checks whether Pro can
+deliver it in time:
+
+* every agent turn reports its latency and outcome with ``observe``, kept in
+  rolling windows per model and per query class (``query_class``: tool,
+  chat or deep), for the last ``FRIDAY_ROUTER_WINDOW_SECONDS``
+* a Pro request is served by Flash instead when Pro's recent error rate is
+  above ``FRIDAY_ROUTER_MAX_ERROR_RATE``, or when its p95 turn latency for
+  that class plus the predicted scheduler queue wait would break
+  ``FRIDAY_ROUTER_SLO_SECONDS``
+* every ``FRIDAY_ROUTER_PROBE_EVERY``-th such downgrade still goes to Pro, so
+  its statistics recover once it is healthy again
+
+Each decision and its reason is kept for ``stats()`` and, when
+``FRIDAY_ROUTER_LOG`` is set, appended to that JSONL file.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+from config import (
+    FRIDAY_ADAPTIVE_ROUTING,
+    FRIDAY_ROUTER_SLO_SECONDS,
+    FRIDAY_ROUTER_MAX_ERROR_RATE,
+    FRIDAY_ROUTER_WINDOW_SECONDS,
+    FRIDAY_ROUTER_MIN_SAMPLES,
+    FRIDAY_ROUTER_PROBE_EVERY,
+    FRIDAY_ROUTER_LOG,
+)
+
+# routing tier -> scheduler lane (core/scheduler.py)
+MODELS = {"standard": "gemini-2.5-flash", "powerful": "gemini-2.5-pro"}
+
+_TOOL = re.compile(r"^(?:play|pause|stop|open|launch|start)\b|\bweather\b")
+_DEEP = re.compile(r"\b(?:explain|in detail|in depth|comprehensive|analy[sz]e|compare|step by step|"
+                   r"break it down|why does|how does)\b")
+
+
+def query_class(query: str) -> str:
+    """Coarse class for latency statistics: "tool", "deep" or "chat"."""
+    text = query.strip().lower()
+    if _TOOL.search(text):
+        return "tool"
+    if _DEEP.search(text) or len(text.split()) > 25:
+        return "deep"
+    return "chat"
+
+
+def scheduler_wait(model: str) -> float:
+    """Predicted queue wait (seconds) for `model` from the scheduler's live stats."""
+    from core.scheduler import get_scheduler
+
+    scheduler = get_scheduler()
+    lane = scheduler.stats().get(MODELS.get(model, model)) if scheduler else None
+    if not lane:
+        return 0.0
+    # calls ahead of a new one, served `limit` at a time
+    return (lane["queued"] + lane["in_flight"]) // lane["limit"] * lane["avg_call_seconds"]
+
+
+class ModelTelemetry:
+    """Rolling (timestamp, seconds, ok) samples per (model, query class)."""
+
+    def __init__(self, window_seconds: float = 300.0, max_samples: int = 500,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window_seconds = window_seconds
+        self.max_samples = max_samples
+        self._clock = clock
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, qclass: str, seconds: float, ok: bool = True):
+        with self._lock:
+            for key in ((model, qclass), (model, "*")):
+                self._samples.setdefault(key, deque(maxlen=self.max_samples)).append((self._clock(), seconds, ok))
+
+    def _recent(self, model: str, qclass: str) -> list:
+        cutoff = self._clock() - self.window_seconds
+        with self._lock:
+            return [s for s in self._samples.get((model, qclass), ()) if s[0] >= cutoff]
+
+    def summary(self, model: str, qclass: str = "*") -> dict:
+        """Samples, error rate and p50/p95 latency of successful turns in the window."""
+        recent = self._recent(model, qclass)
+        latencies = sorted(seconds for _, seconds, ok in recent if ok)
+        pct = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3) if latencies else None
+        return {
+            "samples": len(recent),
+            "error_rate": round(sum(not ok for _, _, ok in recent) / len(recent), 3) if recent else 0.0,
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+        }
+
+    def keys(self) -> list:
+        with self._lock:
+            return sorted(self._samples)
+
+
+@dataclass
+class Decision:
+    model: str
+    requested: str
+    qclass: str
+    reason: str
+    predicted_seconds: Optional[float] = None
+
+
+class AdaptiveRouter:
+    """Downgrades Pro requests to Flash when telemetry says Pro would miss the SLO."""
+
+    def __init__(self, slo_seconds: float = 15.0, max_error_rate: float = 0.25, window_seconds: float = 300.0,
+                 min_samples: int = 5, probe_every: int = 20, log_path: str = "",
+                 queue_wait: Callable[[str], float] = scheduler_wait,
+                 clock: Callable[[], float] = time.monotonic):
+        self.slo_seconds = slo_seconds
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.probe_every = max(0, probe_every)
+        self.telemetry = ModelTelemetry(window_seconds, clock=clock)
+        self.queue_wait = queue_wait
+        self.decisions = deque(maxlen=200)
+        self.outcomes = Counter()
+        self._downgrades = 0
+        self._degraded = False
+        self._log_path = log_path
+        self._lock = threading.Lock()
+
+    def _stats_for(self, model: str, qclass: str) -> dict:
+        """Class-level statistics when there are enough samples, else the model's overall."""
+        stats = self.telemetry.summary(model, qclass)
+        return stats if stats["samples"] >= self.min_samples else self.telemetry.summary(model)
+
+    def decide(self, query: str, requested: str) -> Decision:
+        """Pick the agent for `query`, given what the LLM router asked for."""
+        qclass = query_class(query)
+        if requested != "powerful":
+            return self._log(query, Decision(requested, requested, qclass, "router chose standard"))
+
+        pro = self._stats_for("powerful", qclass)
+        wait = self.queue_wait("powerful")
+        if pro["samples"] < self.min_samples:
+            decision = Decision("powerful", requested, qclass, f"only {pro['samples']} recent pro samples")
+        elif pro["error_rate"] > self.max_error_rate:
+            decision = Decision("standard", requested, qclass,
+                                f"pro error rate {pro['error_rate']:.0%} > {self.max_error_rate:.0%}")
+        elif pro["p95"] is not None and pro["p95"] + wait > self.slo_seconds:
+            predicted = round(pro["p95"] + wait, 2)
+            decision = Decision("standard", requested, qclass,
+                                f"pro p95 {pro['p95']:.1f}s + queue {wait:.1f}s > SLO {self.slo_seconds:.0f}s",
+                                predicted)
+        else:
+            decision = Decision("powerful", requested, qclass, "pro within SLO",
+                                round(pro["p95"] + wait, 2) if pro["p95"] is not None else None)
+
+        if decision.model == "standard":
+            with self._lock:
+                self._downgrades += 1
+                probe = self.probe_every and self._downgrades % self.probe_every == 0
+            if probe:
+                return self._log(query, Decision("powerful", requested, qclass, f"probe ({decision.reason})",
+                                                 decision.predicted_seconds))
+            return self._log(query, decision, healthy=False)
+        return self._log(query, decision, healthy=True if pro["samples"] >= self.min_samples else None)
+
+    def _log(self, query: str, decision: Decision, healthy: Optional[bool] = None) -> Decision:
+        """Record `decision`; `healthy` (None: no verdict) tracks Pro's state for the console."""
+        record = {"ts": round(time.time(), 3), "query": query[:80], **asdict(decision)}
+        changed = False
+        with self._lock:
+            self.decisions.append(record)
+            self.outcomes[f"{decision.requested}->{decision.model}"] += 1
+            if self._log_path:
+                os.makedirs(os.path.dirname(self._log_path) or ".", exist_ok=True)
+                with open(self._log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            # announce only when Pro goes from usable to downgraded or back
+            changed = healthy is not None and self._degraded == healthy
+            if changed:
+                self._degraded = not healthy
+        if changed:
+            state = "downgrading pro to flash" if self._degraded else "pro back in use"
+            print(f"[Router] {state}: {decision.reason}")
+        return decision
+
+    def observe(self, model: str, query: str, seconds: float, ok: bool = True):
+        """Report how an agent turn on `model` ("standard"/"powerful") went."""
+        if model in MODELS:
+            self.telemetry.record(model, query_class(query), seconds, ok)
+
+    def stats(self) -> dict:
+        return {
+            "slo_seconds": self.slo_seconds,
+            "decisions": dict(self.outcomes),
+            "models": {f"{model}/{qclass}": self.telemetry.summary(model, qclass)
+                       for model, qclass in self.telemetry.keys()},
+            "recent": list(self.decisions)[-10:],
+        }
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> Optional[AdaptiveRouter]:
+    """Return the process-wide router, or None when FRIDAY_ADAPTIVE_ROUTING is off."""
+    global _router
+    if not FRIDAY_ADAPTIVE_ROUTING:
+        return None
+    with _router_lock:
+        if _router is None:
+            _router = AdaptiveRouter(FRIDAY_ROUTER_SLO_SECONDS, FRIDAY_ROUTER_MAX_ERROR_RATE,
+                                     FRIDAY_ROUTER_WINDOW_SECONDS, FRIDAY_ROUTER_MIN_SAMPLES,
+                                     FRIDAY_ROUTER_PROBE_EVERY, FRIDAY_ROUTER_LOG)
+        return _router
+
+
+def adapt(query: str, requested: str) -> str:
+    """The model to use for `query` (unchanged when adaptive routing is off)."""
+    router = get_router()
+    return router.decide(query, requested).model if router else requested
+
+
+def observe(model: str, query: str, seconds: float, ok: bool = True):
+    """Report an agent turn to the process-wide router, if there is one."""
+    router = get_router()
+    if router:
+        router.observe(model, query, seconds, ok)
@@ -0,0 +1,297 @@
+"""Record/replay cassettes for LLM and tool HTTP traffic.
+
+Set ``FRIDAY_CASSETTE_MODE=record`` to capture every LLM request/response
+(including ``tool_calls``) and every HTTP call made by the tools into
+``FRIDAY_CASSETTE_PATH`` (JSON lines, gzip-compressed when the path ends in
+``.gz``). ``FRIDAY_CASSETTE_MODE=replay`` serves the recorded responses back
+without touching the network, sleeping for the recorded latency unless
+``FRIDAY_CASSETTE_LATENCY=zero``.
+
+Replay first looks for an exact match of the request; if the request drifted
+(e.g. different retrieved context) it falls back to the next unused recording
+of the same kind, so whole sessions still replay in order.
+"""
+
+import asyncio
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Optional
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    convert_to_messages,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from config import FRIDAY_CASSETTE_MODE, FRIDAY_CASSETTE_PATH, FRIDAY_CASSETTE_LATENCY
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when no recording is left for a request."""
+
+
+def _fingerprint(payload: Any) -> str:
+    blob = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """A single cassette file opened for recording or replay."""
+
+    def __init__(self, path: str, mode: str, latency: str = "original"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.zero_latency = latency == "zero"
+        self._lock = threading.Lock()
+        self._by_key = defaultdict(deque)
+        self._by_kind = defaultdict(deque)
+        self._used = set()
+        self._file = None
+
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = _open(path, "w")
+        else:
+            with _open(path, "r") as f:
+                for seq, line in enumerate(f):
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    entry["seq"] = seq
+                    self._by_key[entry["key"]].append(entry)
+                    self._by_kind[entry["kind"]].append(entry)
+            print(f"[Cassette] Replaying {sum(len(q) for q in self._by_kind.values())} "
+                  f"recorded calls from {path}")
+
+    # ── recording ──────────────────────────────────
+    def record(self, kind: str, key: str, request: dict, response: dict, latency: float):
+        """Append one request/response pair to the cassette."""
+        entry = {"kind": kind, "key": key, "latency": round(latency, 4),
+                 "request": request, "response": response}
+        with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    # ── replay ─────────────────────────────────────
+    def _take(self, queue: deque) -> Optional[dict]:
+        while queue:
+            entry = queue.popleft()
+            if entry["seq"] not in self._used:
+                self._used.add(entry["seq"])
+                return entry
+        return None
+
+    def replay(self, kind: str, key: str) -> dict:
+        """Return the recorded entry for a request, exact match first."""
+        with self._lock:
+            entry = self._take(self._by_key[key])
+            if entry is None:
+                entry = self._take(self._by_kind[kind])
+                if entry is None:
+                    raise CassetteMiss(f"No recorded {kind} response left in {self.path}")
+                print(f"[Cassette] No exact {kind} match, replaying next recording in order")
+            return entry
+
+    def delay(self, entry: dict):
+        if not self.zero_latency:
+            time.sleep(entry["latency"])
+
+    async def adelay(self, entry: dict):
+        if not self.zero_latency:
+            await asyncio.sleep(entry["latency"])
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the process-wide cassette, or None when record/replay is off."""
+    global _cassette
+    if FRIDAY_CASSETTE_MODE not in ("record", "replay"):
+        return None
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(FRIDAY_CASSETTE_PATH, FRIDAY_CASSETTE_MODE, FRIDAY_CASSETTE_LATENCY)
+            atexit.register(_cassette.close)
+        return _cassette
+
+
+# ── LLM traffic ───────────────────────────────────
+def to_messages(input: LanguageModelInput) -> list:
+    """Normalise any chat model input (prompt value, str, message list) to messages."""
+    if isinstance(input, PromptValue):
+        return input.to_messages()
+    if isinstance(input, str):
+        return [HumanMessage(content=input)]
+    return convert_to_messages(input)
+
+
+class CassetteChatModel(Runnable[LanguageModelInput, BaseMessage]):
+    """Chat model wrapper that records to, or replays from, a cassette.
+
+    In replay mode ``llm`` may be None — no client or API key is needed.
+    """
+
+    def __init__(self, llm, model: str, cassette: Cassette, tools: tuple = ()):
+        self.llm = llm
+        self.model = model
+        self.cassette = cassette
+        self.tools = tools
+
+    def bind_tools(self, tools, **kwargs):
+        names = tuple(getattr(t, "name", str(t)) for t in tools)
+        bound = self.llm.bind_tools(tools, **kwargs) if self.llm is not None else None
+        return CassetteChatModel(bound, self.model, self.cassette, self.tools + names)
+
+    def _request(self, input: LanguageModelInput) -> tuple:
+        messages = to_messages(input)
+        request = {"model": self.model, "tools": list(self.tools),
+                   "messages": [message_to_dict(m) for m in messages]}
+        # only a short summary is stored — the key identifies the full request
+        summary = {"model": self.model, "tools": list(self.tools),
+                   "input": str(messages[-1].content)[-200:] if messages else ""}
+        return _fingerprint(request), summary
+
+    def invoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+               **kwargs: Any) -> BaseMessage:
+        key, request = self._request(input)
+        if self.cassette.mode == "replay":
+            entry = self.cassette.replay("llm", key)
+            self.cassette.delay(entry)
+            return messages_from_dict([entry["response"]])[0]
+
+        start = time.perf_counter()
+        response = self.llm.invoke(input, config, **kwargs)
+        self.cassette.record("llm", key, request, message_to_dict(response),
+                             time.perf_counter() - start)
+        return response
+
+    async def ainvoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> BaseMessage:
+        key, request = self._request(input)
+        if self.cassette.mode == "replay":
+            entry = self.cassette.replay("llm", key)
+            await self.cassette.adelay(entry)
+            return messages_from_dict([entry["response"]])[0]
+
+        start = time.perf_counter()
+        response = await self.llm.ainvoke(input, config, **kwargs)
+        self.cassette.record("llm", key, request, message_to_dict(response),
+                             time.perf_counter() - start)
+        return response
+
+
+# ── HTTP traffic (tools) ──────────────────────────
+# credentials are never written to a cassette: OAuth token requests (Spotify's
+# accounts.spotify.com/api/token) carry them in the form body and return them in JSON
+SECRET_FIELDS = {"access_token", "refresh_token", "id_token", "code", "code_verifier",
+                 "client_secret", "password"}
+REDACTED = "REDACTED"
+
+
+def _redact(value):
+    """Replace credential fields in a form body (dict or urlencoded) or JSON value."""
+    from urllib.parse import parse_qsl, urlencode
+
+    if isinstance(value, dict):
+        return {k: REDACTED if k in SECRET_FIELDS else _redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_redact(v) for v in value]
+    if isinstance(value, str) and "=" in value and not value.lstrip().startswith(("{", "[")):
+        pairs = parse_qsl(value, keep_blank_values=True)
+        if any(k in SECRET_FIELDS for k, _ in pairs):
+            return urlencode([(k, REDACTED if k in SECRET_FIELDS else v) for k, v in pairs])
+    return value
+
+
+def _redact_body(body: str) -> str:
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    redacted = _redact(data)
+    return json.dumps(redacted) if redacted != data else body
+
+
+def _http_request_fingerprint(method: str, url: str, kwargs: dict) -> tuple:
+    request = {
+        "method": method.upper(),
+        "url": url,
+        "params": _redact(kwargs.get("params")),
+        "data": _redact(kwargs.get("data")),
+        "json": _redact(kwargs.get("json")),
+    }
+    return _fingerprint(request), request
+
+
+def _build_response(recorded: dict, url: str):
+    import requests
+
+    response = requests.Response()
+    response.status_code = recorded["status"]
+    response.reason = recorded.get("reason", "")
+    response.headers.update(recorded.get("headers", {}))
+    response._content = recorded["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = recorded.get("url", url)
+    return response
+
+
+def install_http_cassette(session) -> None:
+    """Route a ``requests.Session``'s traffic through the active cassette.
+
+    Only the given session is affected, so model downloads and other
+    libraries keep talking to the network normally. Credential fields
+    (SECRET_FIELDS) are redacted in recorded requests and responses; replayed
+    token responses carry the placeholder, which the replayed API calls accept.
+    """
+    cassette = get_cassette()
+    if cassette is None:
+        return
+    send = session.request
+
+    def request(method, url, **kwargs):
+        key, req = _http_request_fingerprint(method, url, kwargs)
+        if cassette.mode == "replay":
+            entry = cassette.replay("http", key)
+            cassette.delay(entry)
+            return _build_response(entry["response"], url)
+
+        start = time.perf_counter()
+        response = send(method, url, **kwargs)
+        recorded = {
+            "status": response.status_code,
+            "reason": response.reason,
+            "url": response.url,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            "body": _redact_body(response.content.decode("utf-8", errors="replace")),
+        }
+        cassette.record("http", key, req, recorded, time.perf_counter() - start)
+        return response
+
+    session.request = request
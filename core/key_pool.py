@@ -0,0 +1,358 @@
+"""Rate-limit-aware pool of Gemini API keys, shared by every LLM client.
+
+Keys come from ``GEMINI_API_KEYS`` as ``key1,key2:3,key3`` (weight defaults
+to 1). Requests are spread over the keys with smooth weighted round robin;
+a key that answers with a 429 is put on cooldown and skipped until it
+recovers, so the remaining keys absorb the traffic.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from typing import Any, Callable, Iterator, AsyncIterator, Optional
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from config import (
+    GEMINI_API_KEYS,
+    GEMINI_KEY_COOLDOWN_SECONDS,
+    GEMINI_KEY_MAX_WAIT_SECONDS,
+)
+
+# cap for the exponential cooldown on keys that keep hitting their quota
+MAX_COOLDOWN_FACTOR = 16
+
+_RETRY_IN = re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE)
+_RETRY_DELAY = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE)
+
+
+class KeyPoolExhausted(RuntimeError):
+    """Raised when every key is cooling down for longer than we may wait."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"All Gemini API keys are rate limited (retry in {retry_after:.1f}s)")
+        self.retry_after = retry_after
+
+
+def parse_keys(raw: str) -> list:
+    """Parse ``"k1,k2:3"`` into ``[("k1", 1), ("k2", 3)]``."""
+    keys = []
+    for item in (raw or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, _, weight = item.partition(":")
+        try:
+            weight = max(1, int(weight)) if weight else 1
+        except ValueError:
+            weight = 1
+        keys.append((key.strip(), weight))
+    return keys
+
+
+def exception_chain(exc: BaseException) -> Iterator[BaseException]:
+    """The exception and its causes, outermost first (LangChain re-raises client errors)."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def error_statuses(exc: BaseException) -> set:
+    """Status codes an API exception carries, as strings ("429", "RESOURCE_EXHAUSTED", ...).
+
+    google.genai ``APIError`` has ``code`` and ``status``, google.api_core
+    exceptions ``code`` and ``grpc_status_code``, HTTP client errors ``status_code``.
+    """
+    statuses = set()
+    for attr in ("code", "status_code", "status", "grpc_status_code"):
+        value = getattr(exc, attr, None)
+        if callable(value):
+            try:
+                value = value()
+            except Exception:
+                value = None
+        if value is not None:
+            statuses.add(str(value).rsplit(".", 1)[-1])
+    return statuses
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True if the exception is a per-key quota (HTTP 429) error.
+
+    Decided by exception type and status code only: error messages that merely
+    mention "429" or "quota" must not put a healthy key on cooldown. The
+    exception chain is followed, since LangChain re-raises the client's
+    ``ClientError`` as its own type.
+    """
+    from langchain_core.exceptions import ModelRateLimitError
+
+    for e in exception_chain(exc):
+        if isinstance(e, ModelRateLimitError) or error_statuses(e) & {"429", "RESOURCE_EXHAUSTED"}:
+            return True
+    return False
+
+
+def parse_retry_after(exc: BaseException) -> Optional[float]:
+    """Extract the server-suggested retry delay from a 429 error, if any."""
+    text = str(exc)
+    for pattern in (_RETRY_IN, _RETRY_DELAY):
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class KeyState:
+    """Bookkeeping for a single API key."""
+
+    def __init__(self, key: str, weight: int = 1):
+        self.key = key
+        self.weight = weight
+        self.current_weight = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.consecutive_429s = 0
+        self.cooldown_until = 0.0
+
+    def as_dict(self, now: float) -> dict:
+        return {
+            "key": f"...{self.key[-4:]}",
+            "weight": self.weight,
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "cooldown_remaining": round(max(0.0, self.cooldown_until - now), 2),
+        }
+
+
+class KeyPool:
+    """Thread-safe weighted round robin over API keys with 429 cooldowns."""
+
+    def __init__(self, keys, cooldown_seconds: float = GEMINI_KEY_COOLDOWN_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self._states = [KeyState(k, w) for k, w in keys]
+        self._by_key = {s.key: s for s in self._states}
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._states)
+
+    def keys(self) -> list:
+        """Every configured key, cooling down or not."""
+        return [s.key for s in self._states]
+
+    def try_acquire(self):
+        """Pick the next key. Returns ``(key, 0)`` or ``(None, seconds_to_wait)``."""
+        with self._lock:
+            now = self._clock()
+            ready = [s for s in self._states if s.cooldown_until <= now]
+            if not ready:
+                return None, min(s.cooldown_until for s in self._states) - now
+
+            # smooth weighted round robin (nginx style) over the ready keys
+            total = sum(s.weight for s in ready)
+            for s in ready:
+                s.current_weight += s.weight
+            chosen = max(ready, key=lambda s: s.current_weight)
+            chosen.current_weight -= total
+            chosen.requests += 1
+            return chosen.key, 0.0
+
+    def available(self) -> int:
+        """How many keys are not cooling down right now."""
+        with self._lock:
+            now = self._clock()
+            return sum(s.cooldown_until <= now for s in self._states)
+
+    def report_success(self, key: str):
+        """Clear the 429 streak of a key after a successful call."""
+        with self._lock:
+            state = self._by_key.get(key)
+            if state:
+                state.consecutive_429s = 0
+
+    def report_rate_limited(self, key: str, retry_after: Optional[float] = None):
+        """Put a key on cooldown after a 429, backing off exponentially."""
+        with self._lock:
+            state = self._by_key.get(key)
+            if not state:
+                return
+            state.rate_limited += 1
+            state.consecutive_429s += 1
+            factor = min(2 ** (state.consecutive_429s - 1), MAX_COOLDOWN_FACTOR)
+            cooldown = retry_after if retry_after is not None else self.cooldown_seconds * factor
+            state.cooldown_until = self._clock() + cooldown
+        print(f"[KeyPool] Key ...{key[-4:]} rate limited, cooling down for {cooldown:.1f}s")
+
+    def stats(self) -> list:
+        """Per-key request, 429 and cooldown counters."""
+        with self._lock:
+            now = self._clock()
+            return [s.as_dict(now) for s in self._states]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_key_pool() -> KeyPool:
+    """Return the process-wide pool shared by the Flash, Pro and router clients."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = KeyPool(parse_keys(GEMINI_API_KEYS))
+        return _pool
+
+
+class PooledChatModel(Runnable[LanguageModelInput, BaseMessage]):
+    """Chat model that sends each call through a key drawn from a KeyPool.
+
+    ``factory(api_key)`` builds the underlying client for one key; clients are
+    created lazily and reused. On a 429 the key is reported to the pool and the
+    call is retried with the next key. ``bind_tools``/``bind`` return a pooled
+    model whose per-key clients carry the same binding.
+    """
+
+    def __init__(self, factory: Callable[[str], Any], pool: KeyPool,
+                 max_wait: float = GEMINI_KEY_MAX_WAIT_SECONDS,
+                 binder: Optional[Callable[[Any], Any]] = None, _clients=None):
+        self.factory = factory
+        self.pool = pool
+        self.max_wait = max_wait
+        self._binder = binder
+        self._clients = _clients if _clients is not None else {}
+        self._bound = {}
+        self._lock = threading.Lock()
+
+    # ── client lookup ───────────────────────────────
+    def _runnable(self, key: str):
+        with self._lock:
+            if key not in self._bound:
+                if key not in self._clients:
+                    self._clients[key] = self.factory(key)
+                client = self._clients[key]
+                self._bound[key] = self._binder(client) if self._binder else client
+            return self._bound[key]
+
+    def clients(self) -> list:
+        """The unbound client of every key in the pool, created if needed."""
+        with self._lock:
+            for key in self.pool.keys():
+                if key not in self._clients:
+                    self._clients[key] = self.factory(key)
+            return list(self._clients.values())
+
+    def _rebind(self, binder):
+        previous = self._binder
+        combined = (lambda c: binder(previous(c))) if previous else binder
+        return PooledChatModel(self.factory, self.pool, self.max_wait, combined, self._clients)
+
+    def bind_tools(self, tools, **kwargs):
+        return self._rebind(lambda client: client.bind_tools(tools, **kwargs))
+
+    def bind(self, **kwargs):
+        return self._rebind(lambda client: client.bind(**kwargs))
+
+    # ── key acquisition ─────────────────────────────
+    def _acquire(self, waited: float):
+        key, wait = self.pool.try_acquire()
+        if key is None and waited + wait > self.max_wait:
+            raise KeyPoolExhausted(wait)
+        return key, wait
+
+    def _on_error(self, key: str, exc: Exception, attempts: int) -> None:
+        if not is_rate_limit_error(exc):
+            raise exc
+        self.pool.report_rate_limited(key, parse_retry_after(exc))
+        if attempts > 2 * len(self.pool):
+            raise exc
+
+    # ── Runnable interface ──────────────────────────
+    def invoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+               **kwargs: Any) -> BaseMessage:
+        waited, attempts = 0.0, 0
+        while True:
+            key, wait = self._acquire(waited)
+            if key is None:
+                time.sleep(wait)
+                waited += wait
+                continue
+            attempts += 1
+            try:
+                result = self._runnable(key).invoke(input, config, **kwargs)
+            except Exception as e:
+                self._on_error(key, e, attempts)
+                continue
+            self.pool.report_success(key)
+            return result
+
+    async def ainvoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> BaseMessage:
+        waited, attempts = 0.0, 0
+        while True:
+            key, wait = self._acquire(waited)
+            if key is None:
+                await asyncio.sleep(wait)
+                waited += wait
+                continue
+            attempts += 1
+            try:
+                result = await self._runnable(key).ainvoke(input, config, **kwargs)
+            except Exception as e:
+                self._on_error(key, e, attempts)
+                continue
+            self.pool.report_success(key)
+            return result
+
+    def stream(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+               **kwargs: Any) -> Iterator[BaseMessage]:
+        waited, attempts = 0.0, 0
+        while True:
+            key, wait = self._acquire(waited)
+            if key is None:
+                time.sleep(wait)
+                waited += wait
+                continue
+            attempts += 1
+            started = False
+            try:
+                for chunk in self._runnable(key).stream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                # once tokens have been emitted we can't transparently retry
+                if started:
+                    raise
+                self._on_error(key, e, attempts)
+                continue
+            self.pool.report_success(key)
+            return
+
+    async def astream(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> AsyncIterator[BaseMessage]:
+        waited, attempts = 0.0, 0
+        while True:
+            key, wait = self._acquire(waited)
+            if key is None:
+                await asyncio.sleep(wait)
+                waited += wait
+                continue
+            attempts += 1
+            started = False
+            try:
+                async for chunk in self._runnable(key).astream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if started:
+                    raise
+                self._on_error(key, e, attempts)
+                continue
+            self.pool.report_success(key)
+            return
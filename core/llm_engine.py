@@ -1,23 +1,63 @@
+import httpx
 from langchain_google_genai import ChatGoogleGenerativeAI
-from config import GOOGLE_API_KEY, HUGGINGFACE_API_KEYS
+from config import GOOGLE_API_KEY, HUGGINGFACE_API_KEYS, FRIDAY_HTTP_KEEPALIVE_SECONDS
 from langchain_huggingface import HuggingFaceEndpoint
+from core.key_pool import get_key_pool, PooledChatModel
+from core.cassette import get_cassette, CassetteChatModel
+from core.scheduler import scheduled
+from core.prompt_cache import prefix_cached
+
+def _gemini_llm(model: str, fallback=None):
+    """Build a Gemini client, wrapped for record/replay when a cassette is active
+    and behind the shared call scheduler (which hands calls it rejects to `fallback`)."""
+    cassette = get_cassette()
+    if cassette is None:
+        return scheduled(_gemini_client(model), model, fallback)
+    if cassette.mode == "replay":
+        # replay needs neither network nor API keys
+        return scheduled(CassetteChatModel(None, model, cassette), model, fallback)
+    return scheduled(CassetteChatModel(_gemini_client(model), model, cassette), model, fallback)
+
+def _client_args() -> dict:
+    """httpx settings for the Gemini clients: keep idle connections (opened by
+    core/warmup.py or the last turn) long enough to be reused by the next command."""
+    return {"limits": httpx.Limits(max_connections=100, max_keepalive_connections=20,
+                                   keepalive_expiry=FRIDAY_HTTP_KEEPALIVE_SECONDS)}
+
+def _gemini_client(model: str):
+    """Build a Gemini client that spreads calls across the shared API key pool."""
+    pool = get_key_pool()
+    if not pool:
+        # no keys configured — let the client fall back to its own env lookup
+        return prefix_cached(ChatGoogleGenerativeAI(
+            model = model,
+            google_api_key = GOOGLE_API_KEY,
+            temperature = 0.75,
+            convert_system_message_to_human=True,
+            client_args = _client_args()
+        ), model)
+    return PooledChatModel(
+        # one prompt-prefix cache per key: cached contents belong to the key's project
+        lambda api_key: prefix_cached(ChatGoogleGenerativeAI(
+            model = model,
+            google_api_key = api_key,
+            temperature = 0.75,
+            convert_system_message_to_human=True,
+            # the pool handles 429s by switching keys, so don't let the
+            # client sit retrying an exhausted key
+            max_retries = 1,
+            client_args = _client_args()
+        ), model),
+        pool
+    )
 
 def get_pro_llm():
-    """Initialize and return the Gemini-2.5-pro LLM (most powerful)."""
-    return ChatGoogleGenerativeAI(
-        model = "gemini-2.5-pro",
-        google_api_key = GOOGLE_API_KEY,
-        temperature = 0.75,
-        convert_system_message_to_human=True 
-        )
+    """Initialize and return the Gemini-2.5-pro LLM (most powerful).
+    Turns the scheduler can't fit into Pro's queue are answered by Flash."""
+    return _gemini_llm("gemini-2.5-pro", fallback=get_flash_llm())
 def get_flash_llm():
     """Initialize and return the Gemini-2.5-flash LLM (fast)."""
-    return ChatGoogleGenerativeAI(
-        model = "gemini-2.5-flash",
-        google_api_key = GOOGLE_API_KEY,
-        temperature = 0.75,
-        convert_system_message_to_human=True     
-    )
+    return _gemini_llm("gemini-2.5-flash")
 
 def get_huggingface_llm(repo_id="mistralai/Mixtral-8x7B-Instruct-v0.1", temp=0.7):
     """Initialize and return a HuggingFace Hub LLM."""
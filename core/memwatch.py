@@ -0,0 +1,151 @@
+"""Opt-in memory footprint tracking for long-running sessions.
+
+With ``FRIDAY_MEMWATCH_PATH`` set, a background thread records one JSON line
+every ``FRIDAY_MEMWATCH_INTERVAL`` seconds:
+
+    {"t": ..., "rss_mb": ..., "traced_mb": ..., "subsystems": {...},
+     "top": [...], "gauges": {...}, "growing": false}
+
+``subsystems`` groups tracemalloc's live allocations by where they were made
+(this repo's packages, or the third-party package name), ``top`` lists the
+biggest allocation sites, and ``gauges`` holds counters registered by the
+app (chat history length, vector count, ...). ``growing`` flags sustained
+RSS growth: more than ``FRIDAY_MEMWATCH_GROWTH_MB`` over the last
+``FRIDAY_MEMWATCH_WINDOW`` samples, rising in most of them.
+"""
+
+import json
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, Optional
+
+from config import (
+    FRIDAY_MEMWATCH_PATH,
+    FRIDAY_MEMWATCH_INTERVAL,
+    FRIDAY_MEMWATCH_GROWTH_MB,
+    FRIDAY_MEMWATCH_WINDOW,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def subsystem(filename: str) -> str:
+    """Name the subsystem that owns an allocation site."""
+    if filename.startswith("<"):
+        return "stdlib"  # <frozen ...>, <string>
+    path = os.path.abspath(filename)
+    if path.startswith(REPO_ROOT + os.sep) and "site-packages" not in path:
+        parts = os.path.relpath(path, REPO_ROOT).split(os.sep)
+        return parts[0] if len(parts) > 1 else os.path.splitext(parts[0])[0]
+    if "site-packages" in path:
+        return path.split("site-packages" + os.sep, 1)[1].split(os.sep)[0].split(".")[0]
+    return "stdlib"
+
+
+class MemWatch:
+    """Samples RSS and tracemalloc, groups allocations by subsystem and
+    flags sustained growth."""
+
+    def __init__(self, path: Optional[str] = None, interval: float = FRIDAY_MEMWATCH_INTERVAL,
+                 growth_mb: float = FRIDAY_MEMWATCH_GROWTH_MB, window: int = FRIDAY_MEMWATCH_WINDOW,
+                 top: int = 5):
+        self.path = path
+        self.interval = interval
+        self.growth_mb = growth_mb
+        self.top = top
+        self.gauges = {}
+        self.history = deque(maxlen=max(2, window))
+        self.started = time.time()
+        self._done = threading.Event()
+        self._thread = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def gauge(self, name: str, fn: Callable[[], float]):
+        """Record `fn()` with every sample (e.g. a history length or file count)."""
+        self.gauges[name] = fn
+
+    def sample(self) -> dict:
+        """Take one sample, append it to the time series and return it."""
+        snapshot = tracemalloc.take_snapshot()
+        by_file = snapshot.statistics("filename")
+        groups = {}
+        for stat in by_file:
+            name = subsystem(stat.traceback[0].filename)
+            groups[name] = groups.get(name, 0) + stat.size
+        top_lines = snapshot.statistics("lineno")[:self.top]
+
+        gauges = {}
+        for name, fn in self.gauges.items():
+            try:
+                gauges[name] = fn()
+            except Exception as e:
+                gauges[name] = f"error: {e}"
+
+        rss = rss_mb()
+        self.history.append(rss)
+        record = {
+            "t": round(time.time() - self.started, 1),
+            "rss_mb": round(rss, 1),
+            "traced_mb": round(sum(groups.values()) / 2**20, 2),
+            "subsystems": {k: round(v / 2**20, 2) for k, v in
+                           sorted(groups.items(), key=lambda kv: kv[1], reverse=True)},
+            "top": [{"site": f"{os.path.relpath(s.traceback[0].filename, REPO_ROOT)}:{s.traceback[0].lineno}",
+                     "kb": round(s.size / 1024, 1)} for s in top_lines],
+            "gauges": gauges,
+            "growing": self.growing(),
+        }
+        if record["growing"]:
+            print(f"[MemWatch] Sustained growth: +{self.history[-1] - self.history[0]:.1f} MB over "
+                  f"{len(self.history)} samples (largest: {next(iter(record['subsystems']), '?')})")
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+    def growing(self) -> bool:
+        """True if RSS rose by more than growth_mb across a full window, in most steps."""
+        if len(self.history) < self.history.maxlen:
+            return False
+        values = list(self.history)
+        rises = sum(b > a for a, b in zip(values, values[1:]))
+        return values[-1] - values[0] > self.growth_mb and rises >= 0.8 * (len(values) - 1)
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self.sample()
+
+    def start(self) -> "MemWatch":
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="friday-memwatch", daemon=True)
+        self._thread.start()
+        print(f"[MemWatch] Recording every {self.interval:g}s to {self.path}")
+        return self
+
+    def stop(self):
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def start_memwatch() -> Optional[MemWatch]:
+    """Start background tracking if FRIDAY_MEMWATCH_PATH is set, else return None."""
+    if not FRIDAY_MEMWATCH_PATH:
+        return None
+    return MemWatch(FRIDAY_MEMWATCH_PATH).start()
@@ -0,0 +1,334 @@
+"""Prompt-prefix caching for the agents' static system prompt and tool schemas.
+
+Every agent call starts with the same prefix — Friday's personality prompt
+plus the declarations of the bound tools — which Gemini would otherwise
+re-process each time. ``PrefixCachedChatModel`` wraps one Gemini client:
+
+* the first call with a given prefix (system prompt + tool set) registers it
+  as a Gemini cached content in the background, with a TTL of
+  ``FRIDAY_PROMPT_CACHE_TTL_SECONDS``; that call, and any made before the
+  cache is ready, go out uncached
+* later calls send only the chat history and query, plus the cache handle
+* a handle within ``FRIDAY_PROMPT_CACHE_RENEW_SECONDS`` of expiring is
+  renewed in the background, so it never lapses mid-conversation
+
+Everything falls back to the ordinary, uncached request: prefixes below the
+model's minimum cacheable size (``FRIDAY_PROMPT_CACHE_MIN_TOKENS``, estimated
+locally, so no API call is wasted on them), failed registrations (not retried
+for ``FRIDAY_PROMPT_CACHE_RETRY_SECONDS``) and handles the API no longer
+knows. Handles are kept per API key, since caches belong to the key's project.
+
+The cache itself is reached through a small backend (create / renew), so the
+layer runs against ``FakeCacheBackend`` (tests/fakes.py) offline.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from config import (
+    FRIDAY_PROMPT_CACHE,
+    FRIDAY_PROMPT_CACHE_TTL_SECONDS,
+    FRIDAY_PROMPT_CACHE_RENEW_SECONDS,
+    FRIDAY_PROMPT_CACHE_RETRY_SECONDS,
+    FRIDAY_PROMPT_CACHE_MIN_TOKENS,
+)
+from core.cassette import to_messages
+from core.key_pool import error_statuses, exception_chain
+from core.scheduler import parse_limits
+
+# statuses of a request whose cached content no longer exists or can't be used
+CACHE_ERROR_STATUSES = {"404", "NOT_FOUND", "FAILED_PRECONDITION"}
+
+
+def tool_schemas(tools) -> list:
+    return [convert_to_openai_tool(t) for t in tools]
+
+
+def estimate_tokens(system: str, tools=()) -> int:
+    """Rough token count (~4 characters per token) of a system prompt and tool schemas."""
+    return (len(system) + sum(len(json.dumps(s)) for s in tool_schemas(tools))) // 4
+
+
+class GeminiCacheBackend:
+    """Gemini cached contents, created with the client's own API key."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        key = getattr(llm, "google_api_key", None)
+        secret = key.get_secret_value() if hasattr(key, "get_secret_value") else str(key)
+        self.account = hashlib.sha1(secret.encode()).hexdigest()[:12]
+
+    def create(self, system: str, tools: tuple, ttl: float) -> str:
+        from langchain_google_genai import create_context_cache
+
+        return create_context_cache(self.llm, [SystemMessage(content=system)], ttl=f"{int(ttl)}s",
+                                    tools=list(tools) or None)
+
+    def renew(self, name: str, ttl: float):
+        from google.genai import types
+
+        self.llm.client.caches.update(name=name, config=types.UpdateCachedContentConfig(ttl=f"{int(ttl)}s"))
+
+
+def is_cache_error(exc: Exception) -> bool:
+    """True for errors meaning the cached content is gone or unusable.
+
+    Only called for requests made with ``cached_content``, where the API answers
+    a missing or expired handle with 404 NOT_FOUND and an unusable one with 400
+    FAILED_PRECONDITION. Decided by status code, not message text, following
+    the exception chain like ``key_pool.is_rate_limit_error``.
+    """
+    return any(error_statuses(e) & CACHE_ERROR_STATUSES for e in exception_chain(exc))
+
+
+class _Entry:
+    __slots__ = ("name", "expires", "tokens", "pending", "failed_until")
+
+    def __init__(self, tokens: int):
+        self.name = None
+        self.expires = 0.0
+        self.tokens = tokens
+        self.pending = False
+        self.failed_until = 0.0
+
+
+class PromptCache:
+    """Cache handles per (account, model, prefix), registered and renewed in the background."""
+
+    def __init__(self, ttl_seconds: float = 3600.0, renew_seconds: float = 300.0,
+                 retry_seconds: float = 3600.0, min_tokens: Optional[dict] = None,
+                 clock: Callable[[], float] = time.monotonic, background: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.renew_seconds = min(renew_seconds, ttl_seconds / 2)
+        self.retry_seconds = retry_seconds
+        self.min_tokens = min_tokens or {}
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="friday-prompt-cache") \
+            if background else None
+        self.counts = Counter()
+        self.tokens_reused = 0
+
+    def _submit(self, fn, *args):
+        if self._pool is None:
+            fn(*args)
+        else:
+            self._pool.submit(fn, *args)
+
+    def _create(self, entry: _Entry, backend, system: str, tools: tuple, model: str):
+        start = self._clock()
+        try:
+            name = backend.create(system, tools, self.ttl_seconds)
+        except Exception as e:
+            with self._lock:
+                entry.pending = False
+                entry.failed_until = self._clock() + self.retry_seconds
+                self.counts["create_failed"] += 1
+            print(f"[PromptCache] Could not cache the {model} prompt prefix, sending it uncached: {e}")
+            return
+        with self._lock:
+            entry.name, entry.expires, entry.pending = name, start + self.ttl_seconds, False
+            self.counts["created"] += 1
+
+    def _renew(self, entry: _Entry, backend, name: str):
+        start = self._clock()
+        try:
+            backend.renew(name, self.ttl_seconds)
+        except Exception as e:
+            # leave it to expire; the next call after that registers a new one
+            with self._lock:
+                entry.pending = False
+                self.counts["renew_failed"] += 1
+            print(f"[PromptCache] Could not renew {name}: {e}")
+            return
+        with self._lock:
+            entry.expires, entry.pending = start + self.ttl_seconds, False
+            self.counts["renewed"] += 1
+
+    def lookup(self, backend, model: str, system: str, tools: tuple) -> Optional[str]:
+        """The cache handle for this prefix, or None (send it uncached) when there is none yet."""
+        # tools are fixed objects for the process: name + description identify them
+        prefix = [system, [(getattr(t, "name", str(t)), getattr(t, "description", "")) for t in tools]]
+        key = (backend.account, model, hashlib.sha1(json.dumps(prefix).encode()).hexdigest())
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(estimate_tokens(system, tools))
+            if entry.tokens < self.min_tokens.get(model, self.min_tokens.get("*", 0)):
+                self.counts["too_small"] += 1
+                return None
+            name = entry.name if now < entry.expires else None
+            if name is not None:
+                self.counts["hit"] += 1
+                self.tokens_reused += entry.tokens
+                renew = now >= entry.expires - self.renew_seconds and not entry.pending
+            else:
+                entry.name = None
+                self.counts["miss"] += 1
+                if entry.pending or now < entry.failed_until:
+                    return None
+                renew = False
+            if name is None or renew:
+                entry.pending = True
+        if name is None:
+            self._submit(self._create, entry, backend, system, tools, model)
+        elif renew:
+            self._submit(self._renew, entry, backend, name)
+        return name
+
+    def invalidate(self, name: str):
+        """Forget a handle the API rejected; the next call registers the prefix again."""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.name == name:
+                    entry.name = None
+                    self.counts["invalidated"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self.counts["hit"] + self.counts["miss"] + self.counts["too_small"]
+            return {
+                "prefixes": len(self._entries),
+                "hit_rate": round(self.counts["hit"] / calls, 3) if calls else 0.0,
+                "tokens_reused": self.tokens_reused,
+                **dict(self.counts),
+            }
+
+
+class PrefixCachedChatModel(Runnable[LanguageModelInput, BaseMessage]):
+    """Chat model that sends its system prompt and bound tools as a cached prefix when it can."""
+
+    def __init__(self, llm, model: str, cache: PromptCache, backend=None, tools: tuple = (),
+                 tool_kwargs: Optional[dict] = None):
+        self.llm = llm
+        self.model = model
+        self.cache = cache
+        self.backend = backend if backend is not None else GeminiCacheBackend(llm)
+        self.tools = tools
+        self.tool_kwargs = tool_kwargs or {}
+        self._uncached = None
+
+    def bind_tools(self, tools, **kwargs):
+        # the tools become part of the cached prefix; they are only bound on the client
+        # for uncached calls
+        return PrefixCachedChatModel(self.llm, self.model, self.cache, self.backend,
+                                     self.tools + tuple(tools), {**self.tool_kwargs, **kwargs})
+
+    def bind(self, **kwargs):
+        return self._plain().bind(**kwargs)
+
+    def _plain(self):
+        """The ordinary client, tools bound, for uncached calls."""
+        if self._uncached is None:
+            self._uncached = self.llm.bind_tools(list(self.tools), **self.tool_kwargs) if self.tools else self.llm
+        return self._uncached
+
+    def _split(self, input: LanguageModelInput) -> tuple:
+        """(cache handle or None, messages to send with it)."""
+        messages = to_messages(input)
+        head = 0
+        while head < len(messages) and isinstance(messages[head], SystemMessage):
+            head += 1
+        # a cached call must not carry tool_choice or other tool settings
+        if not head or self.tool_kwargs:
+            return None, messages
+        system = "\n\n".join(str(m.content) for m in messages[:head])
+        return self.cache.lookup(self.backend, self.model, system, self.tools), messages[head:]
+
+    def invoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+               **kwargs: Any) -> BaseMessage:
+        name, rest = self._split(input)
+        if name is not None:
+            try:
+                return self.llm.invoke(rest, config, cached_content=name, **kwargs)
+            except Exception as e:
+                if not is_cache_error(e):
+                    raise
+                self.cache.invalidate(name)
+        return self._plain().invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> BaseMessage:
+        name, rest = self._split(input)
+        if name is not None:
+            try:
+                return await self.llm.ainvoke(rest, config, cached_content=name, **kwargs)
+            except Exception as e:
+                if not is_cache_error(e):
+                    raise
+                self.cache.invalidate(name)
+        return await self._plain().ainvoke(input, config, **kwargs)
+
+    def stream(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+               **kwargs: Any) -> Iterator[BaseMessage]:
+        name, rest = self._split(input)
+        if name is not None:
+            try:
+                stream = self.llm.stream(rest, config, cached_content=name, **kwargs)
+                first = next(stream, None)
+            except Exception as e:
+                if not is_cache_error(e):
+                    raise
+                self.cache.invalidate(name)
+            else:
+                if first is not None:
+                    yield first
+                yield from stream
+                return
+        yield from self._plain().stream(input, config, **kwargs)
+
+    async def astream(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> AsyncIterator[BaseMessage]:
+        name, rest = self._split(input)
+        if name is not None:
+            stream = self.llm.astream(rest, config, cached_content=name, **kwargs)
+            try:
+                # a rejected handle fails on the first chunk, before anything is yielded
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                if not is_cache_error(e):
+                    raise
+                self.cache.invalidate(name)
+            else:
+                yield first
+                async for chunk in stream:
+                    yield chunk
+                return
+        async for chunk in self._plain().astream(input, config, **kwargs):
+            yield chunk
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prompt_cache() -> Optional[PromptCache]:
+    """Return the process-wide prompt cache, or None when FRIDAY_PROMPT_CACHE is off."""
+    global _cache
+    if not FRIDAY_PROMPT_CACHE:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = PromptCache(FRIDAY_PROMPT_CACHE_TTL_SECONDS, FRIDAY_PROMPT_CACHE_RENEW_SECONDS,
+                                 FRIDAY_PROMPT_CACHE_RETRY_SECONDS, parse_limits(FRIDAY_PROMPT_CACHE_MIN_TOKENS))
+        return _cache
+
+
+def prefix_cached(llm, model: str):
+    """Wrap a Gemini client so its static prompt prefix is cached (unchanged when off)."""
+    cache = get_prompt_cache()
+    return PrefixCachedChatModel(llm, model, cache) if cache is not None else llm
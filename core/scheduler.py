@@ -0,0 +1,355 @@
+"""Admission control and priority scheduling for LLM calls.
+
+Every Gemini client is wrapped in a ``ScheduledChatModel``; each call first
+takes a slot from the ``TurnScheduler``:
+
+* concurrency is bounded per model (``FRIDAY_SCHEDULER_LIMITS``, e.g.
+  ``gemini-2.5-flash:8,gemini-2.5-pro:2``), so bursts queue up here instead
+  of piling onto the API and into quota errors
+* queued calls are served by priority class — ``voice`` before
+  ``interactive`` (typed chat, the default) before ``background`` (batch,
+  memory and summary work) — then first come, first served
+* each class has a queue-time deadline (``FRIDAY_SCHEDULER_DEADLINES``). A
+  call whose predicted wait already exceeds it is rejected at once, and one
+  still queued at its deadline is rejected then, with ``SchedulerRejected``
+* a model can have a fallback (Pro falls back to Flash): a voice or
+  interactive call it rejects runs on the fallback instead of failing, so a
+  busy Pro lane degrades the answer rather than the turn; background calls
+  still fail, so batch work retries on the model it asked for
+
+Callers pick the class for a block of work with ``with priority("voice"):``
+(or ``set_priority`` for a whole session); the class follows the context
+into asyncio tasks. ``stats()`` exposes queue
+depth, in-flight calls, admissions, rejections and wait-time percentiles.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from config import (
+    FRIDAY_SCHEDULER,
+    FRIDAY_SCHEDULER_LIMITS,
+    FRIDAY_SCHEDULER_DEFAULT_LIMIT,
+    FRIDAY_SCHEDULER_DEADLINES,
+)
+
+PRIORITIES = ("voice", "interactive", "background")
+_current = contextvars.ContextVar("friday_priority", default="interactive")
+
+
+class SchedulerRejected(RuntimeError):
+    """Raised when a call cannot be admitted before its queue-time deadline."""
+
+    def __init__(self, model: str, priority: str, reason: str, retry_after: float):
+        super().__init__(f"{model} is busy ({reason}) for {priority} work, retry in {retry_after:.1f}s")
+        self.model = model
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+def parse_limits(raw: str, cast=int) -> dict:
+    """Parse ``"name:value,name:value"`` into a dict."""
+    limits = {}
+    for item in (raw or "").split(","):
+        name, _, value = item.strip().rpartition(":")
+        if name:
+            limits[name.strip()] = cast(value)
+    return limits
+
+
+@contextmanager
+def priority(name: str):
+    """Run the enclosed calls (and asyncio tasks created inside) in class `name`."""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{name}' (choose from {', '.join(PRIORITIES)})")
+    token = _current.set(name)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def set_priority(name: str):
+    """Set the class for everything that follows in this context (e.g. a whole voice session)."""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{name}' (choose from {', '.join(PRIORITIES)})")
+    _current.set(name)
+
+
+def current_priority() -> str:
+    return _current.get()
+
+
+class _Waiter:
+    __slots__ = ("priority", "enqueued", "wake", "granted", "cancelled")
+
+    def __init__(self, priority: str, wake: Callable[[], None], now: float):
+        self.priority = priority
+        self.enqueued = now
+        self.wake = wake
+        self.granted = False
+        self.cancelled = False
+
+
+class _Lane:
+    """Concurrency limit, priority queue and counters for one model."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.heap = []
+        self.queued = Counter()
+        self.admitted = Counter()
+        self.rejected = Counter()
+        self.waits = {p: deque(maxlen=1000) for p in PRIORITIES}
+        self.service = 1.0  # moving average of seconds per call, for wait prediction
+
+
+class TurnScheduler:
+    """Per-model bounded concurrency with priority classes and queue deadlines."""
+
+    def __init__(self, limits: Optional[dict] = None, default_limit: int = 4,
+                 deadlines: Optional[dict] = None, clock: Callable[[], float] = time.monotonic):
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self.deadlines = {"voice": 5.0, "interactive": 15.0, "background": 120.0, **(deadlines or {})}
+        self._clock = clock
+        self._lanes = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _lane(self, model: str) -> _Lane:
+        if model not in self._lanes:
+            self._lanes[model] = _Lane(max(1, self.limits.get(model, self.default_limit)))
+        return self._lanes[model]
+
+    # ── admission ──────────────────────────────────
+    def _enqueue(self, model: str, prio: str, wake: Callable[[], None]) -> Optional[_Waiter]:
+        """Admit at once (returns None) or queue a waiter; raises if hopeless."""
+        rank = PRIORITIES.index(prio)
+        with self._lock:
+            lane = self._lane(model)
+            if lane.in_flight < lane.limit and not sum(lane.queued.values()):
+                lane.in_flight += 1
+                lane.admitted[prio] += 1
+                lane.waits[prio].append(0.0)
+                return None
+            ahead = sum(n for p, n in lane.queued.items() if PRIORITIES.index(p) <= rank)
+            predicted = (ahead // lane.limit + 1) * lane.service
+            if predicted > self.deadlines[prio]:
+                lane.rejected[prio] += 1
+                raise SchedulerRejected(model, prio, f"{ahead} queued ahead", predicted)
+            waiter = _Waiter(prio, wake, self._clock())
+            heapq.heappush(lane.heap, (rank, next(self._seq), waiter))
+            lane.queued[prio] += 1
+            return waiter
+
+    def _timed_out(self, model: str, waiter: _Waiter) -> bool:
+        """Called when a waiter's deadline passed: True if it got the slot after all."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.cancelled = True
+            lane = self._lane(model)
+            lane.queued[waiter.priority] -= 1
+            lane.rejected[waiter.priority] += 1
+        return False
+
+    def _release(self, model: str, seconds: Optional[float]):
+        wake = None
+        with self._lock:
+            lane = self._lane(model)
+            lane.in_flight -= 1
+            if seconds is not None:
+                lane.service += 0.2 * (seconds - lane.service)
+            while lane.heap and lane.in_flight < lane.limit:
+                _, _, waiter = heapq.heappop(lane.heap)
+                if waiter.cancelled:
+                    continue
+                waiter.granted = True
+                lane.in_flight += 1
+                lane.queued[waiter.priority] -= 1
+                lane.admitted[waiter.priority] += 1
+                lane.waits[waiter.priority].append(self._clock() - waiter.enqueued)
+                wake = waiter.wake
+                break
+        if wake is not None:
+            wake()
+
+    # ── slots ──────────────────────────────────────
+    @contextmanager
+    def slot(self, model: str, prio: Optional[str] = None):
+        """Hold one of `model`'s slots for the duration of a (blocking) call."""
+        prio = prio or current_priority()
+        event = threading.Event()
+        waiter = self._enqueue(model, prio, event.set)
+        if waiter is not None and not event.wait(self.deadlines[prio]) and not self._timed_out(model, waiter):
+            raise SchedulerRejected(model, prio, "queue deadline passed", self._lane(model).service)
+        start = self._clock()
+        try:
+            yield
+        except BaseException:
+            self._release(model, None)
+            raise
+        self._release(model, self._clock() - start)
+
+    @asynccontextmanager
+    async def aslot(self, model: str, prio: Optional[str] = None):
+        """Async variant of slot: waiting never blocks the event loop."""
+        prio = prio or current_priority()
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+        wake = lambda: loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(True))
+        waiter = self._enqueue(model, prio, wake)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(granted), self.deadlines[prio])
+            except asyncio.TimeoutError:
+                if not self._timed_out(model, waiter):
+                    raise SchedulerRejected(model, prio, "queue deadline passed", self._lane(model).service)
+            except asyncio.CancelledError:
+                if self._timed_out(model, waiter):
+                    self._release(model, None)
+                raise
+        start = self._clock()
+        try:
+            yield
+        except BaseException:
+            self._release(model, None)
+            raise
+        self._release(model, self._clock() - start)
+
+    # ── metrics ────────────────────────────────────
+    def stats(self) -> dict:
+        """Per model: limit, in flight, queue depth and per-class admissions,
+        rejections and queue-wait percentiles (seconds)."""
+        def pct(values, q):
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3) if ordered else None
+
+        with self._lock:
+            return {
+                model: {
+                    "limit": lane.limit,
+                    "in_flight": lane.in_flight,
+                    "queued": sum(lane.queued.values()),
+                    "avg_call_seconds": round(lane.service, 3),
+                    "by_priority": {
+                        p: {"queued": lane.queued[p], "admitted": lane.admitted[p], "rejected": lane.rejected[p],
+                            "wait_p50": pct(lane.waits[p], 0.50), "wait_p95": pct(lane.waits[p], 0.95)}
+                        for p in PRIORITIES
+                    },
+                }
+                for model, lane in self._lanes.items()
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Optional[TurnScheduler]:
+    """Return the process-wide scheduler, or None when FRIDAY_SCHEDULER is off."""
+    global _scheduler
+    if not FRIDAY_SCHEDULER:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TurnScheduler(parse_limits(FRIDAY_SCHEDULER_LIMITS), FRIDAY_SCHEDULER_DEFAULT_LIMIT,
+                                       parse_limits(FRIDAY_SCHEDULER_DEADLINES, float))
+        return _scheduler
+
+
+class ScheduledChatModel(Runnable[LanguageModelInput, BaseMessage]):
+    """Chat model whose every call holds a TurnScheduler slot for `model`.
+
+    Voice and interactive calls the scheduler rejects run on `fallback` (another
+    scheduled model) when there is one.
+    """
+
+    def __init__(self, llm, model: str, scheduler: TurnScheduler, fallback=None):
+        self.llm = llm
+        self.model = model
+        self.scheduler = scheduler
+        self.fallback = fallback
+        self.fallbacks = 0
+
+    def bind_tools(self, tools, **kwargs):
+        fallback = self.fallback.bind_tools(tools, **kwargs) if self.fallback is not None else None
+        return ScheduledChatModel(self.llm.bind_tools(tools, **kwargs), self.model, self.scheduler, fallback)
+
+    def bind(self, **kwargs):
+        fallback = self.fallback.bind(**kwargs) if self.fallback is not None else None
+        return ScheduledChatModel(self.llm.bind(**kwargs), self.model, self.scheduler, fallback)
+
+    def _falls_back(self, e: SchedulerRejected) -> bool:
+        if self.fallback is None or e.priority == "background":
+            return False
+        self.fallbacks += 1
+        print(f"[Scheduler] {e}; answering with {self.fallback.model} instead")
+        return True
+
+    def invoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+               **kwargs: Any) -> BaseMessage:
+        try:
+            with self.scheduler.slot(self.model):
+                return self.llm.invoke(input, config, **kwargs)
+        except SchedulerRejected as e:
+            if not self._falls_back(e):
+                raise
+        return self.fallback.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> BaseMessage:
+        try:
+            async with self.scheduler.aslot(self.model):
+                return await self.llm.ainvoke(input, config, **kwargs)
+        except SchedulerRejected as e:
+            if not self._falls_back(e):
+                raise
+        return await self.fallback.ainvoke(input, config, **kwargs)
+
+    def stream(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+               **kwargs: Any) -> Iterator[BaseMessage]:
+        # a rejection comes from taking the slot, before anything is yielded
+        try:
+            with self.scheduler.slot(self.model):
+                yield from self.llm.stream(input, config, **kwargs)
+                return
+        except SchedulerRejected as e:
+            if not self._falls_back(e):
+                raise
+        yield from self.fallback.stream(input, config, **kwargs)
+
+    async def astream(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> AsyncIterator[BaseMessage]:
+        try:
+            async with self.scheduler.aslot(self.model):
+                async for chunk in self.llm.astream(input, config, **kwargs):
+                    yield chunk
+                return
+        except SchedulerRejected as e:
+            if not self._falls_back(e):
+                raise
+        async for chunk in self.fallback.astream(input, config, **kwargs):
+            yield chunk
+
+
+def scheduled(llm, model: str, fallback=None):
+    """Wrap `llm` in the process-wide scheduler (unchanged when it is off).
+
+    `fallback`, a scheduled model, answers voice and interactive calls rejected for `model`.
+    """
+    scheduler = get_scheduler()
+    return ScheduledChatModel(llm, model, scheduler, fallback) if scheduler is not None else llm
@@ -0,0 +1,141 @@
+"""Speculative warm-up of connections, models and tool state on user intent.
+
+The first command after a quiet spell pays one-off costs: a TCP + TLS handshake
+per Gemini client (one client per model and API key), the embedding model's
+first run (or the embedding daemon's connection), and Spotify's device lookup.
+``Warmup.trigger`` pays them in the background the moment the user shows
+intent — the wake word in voice mode, a page run in Streamlit, a WebSocket
+connecting to the server — so they overlap the user still speaking or typing:
+
+* gemini     — a model metadata request (``models.get``, no tokens) per client,
+               which leaves an open connection in the client's pool; idle
+               connections are kept for FRIDAY_HTTP_KEEPALIVE_SECONDS
+               (core/llm_engine.py) so they survive until the command
+* embeddings — embeds a short text
+* spotify    — refreshes the cached device list (tools/custom_tools.py)
+
+Tasks run in parallel and their failures are only counted: a warm-up never
+stands in the way of the turn. A trigger within FRIDAY_WARMUP_INTERVAL_SECONDS
+of the last one, or while one is running, is skipped.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from config import FRIDAY_WARMUP, FRIDAY_WARMUP_INTERVAL_SECONDS
+
+
+def gemini_clients(llm) -> list:
+    """The ChatGoogleGenerativeAI clients behind Friday's wrappers (scheduler,
+    cassette, prompt cache and one per key of a key pool)."""
+    from core.key_pool import PooledChatModel
+
+    if isinstance(llm, PooledChatModel):
+        return [client for pooled in llm.clients() for client in gemini_clients(pooled)]
+    if getattr(llm, "llm", None) is not None:
+        return gemini_clients(llm.llm)
+    client = getattr(llm, "client", None)
+    return [llm] if hasattr(client, "models") else []
+
+
+def warmup_tasks(llms=(), embeddings=None) -> list:
+    """(name, callable) pairs warming the given LLMs, the embeddings and tool state."""
+    tasks, seen = [], set()
+    for llm in llms:
+        for client in gemini_clients(llm):
+            if id(client) not in seen:
+                seen.add(id(client))
+                tasks.append((f"gemini:{client.model}",
+                              lambda c=client: c.client.models.get(model=c.model)))
+    if embeddings is not None:
+        tasks.append(("embeddings", lambda: embeddings.embed_query("warm up")))
+    from tools.custom_tools import refresh_spotify_devices
+    tasks.append(("spotify", refresh_spotify_devices))
+    return tasks
+
+
+class Warmup:
+    """Runs a set of warm-up tasks in parallel, in the background, on demand."""
+
+    def __init__(self, tasks: list, min_interval: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.tasks = list(tasks)
+        self.min_interval = min_interval
+        self._clock = clock
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.tasks)), thread_name_prefix="warmup")
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._done.set()
+        self._last = None
+        self.runs = 0
+        self.skipped = 0
+        self.failed = 0
+        self.last_reason = ""
+        self.last_ms = {}
+
+    def trigger(self, reason: str = "") -> bool:
+        """Start a warm-up without blocking; False when one is running or was just done."""
+        with self._lock:
+            now = self._clock()
+            if not self._done.is_set() or (self._last is not None and now - self._last < self.min_interval):
+                self.skipped += 1
+                return False
+            self._last = now
+            self._done.clear()
+            self.runs += 1
+            self.last_reason = reason
+        threading.Thread(target=self._run, name="warmup", daemon=True).start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the current warm-up (if any) has finished."""
+        return self._done.wait(timeout)
+
+    def _timed(self, fn) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    def _run(self):
+        try:
+            futures = [(name, self._pool.submit(self._timed, fn)) for name, fn in self.tasks]
+            timings = {name: future.result() for name, future in futures}
+            with self._lock:
+                self.failed += sum(ms is None for ms in timings.values())
+                self.last_ms = {name: round(ms, 1) if ms is not None else "failed"
+                                for name, ms in timings.items()}
+        finally:
+            self._done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "skipped": self.skipped,
+                "failed_tasks": self.failed,
+                "last_reason": self.last_reason,
+                "last_ms": dict(self.last_ms),
+            }
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup(llms=(), embeddings=None) -> Optional[Warmup]:
+    """Return the process-wide warm-up, or None when FRIDAY_WARMUP is off.
+
+    The first call decides what gets warmed; later calls return the same object.
+    """
+    global _warmup
+    if not FRIDAY_WARMUP:
+        return None
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = Warmup(warmup_tasks(llms, embeddings), FRIDAY_WARMUP_INTERVAL_SECONDS)
+        return _warmup
@@ -1,4 +1,5 @@
 import speech_recognition as sr
+import argparse
 import os
 import tempfile
 import time
@@ -10,9 +11,19 @@ TIMEOUT_SECONDS = 60  # Wake word not required if active within last 60 seconds
 
 # --- Initialize Speech Engine ---
 from agents.friday_agent import create_friday_agent
+from agents.tool_selector import get_tool_selector
 from memory.memory_manager import MemoryManager
 from core.llm_engine import get_flash_llm, get_pro_llm 
+from memory.session_store import get_session_store
+from core.memwatch import start_memwatch
+from core.scheduler import set_priority
+from core.adaptive_router import adapt, observe
+from core.warmup import get_warmup
+from config import FRIDAY_STT_STREAMING, FRIDAY_VOSK_MODEL, FRIDAY_BARGE_IN, FRIDAY_FAST_PATH
+from agents.fast_path import FastPath
+from voice.stt import get_stt
 from langchain_core.prompts import PromptTemplate
+from langchain_core.messages import HumanMessage, AIMessage
 
 # --- Wake Word and Other Constants ---
 WAKE_WORD = "friday"
@@ -20,8 +31,37 @@ WAKE_WORD = "friday"
 # Global mode tracker
 voice_mode = False
 
+# One recognizer and microphone for the whole session instead of a new pair
+# on every loop iteration (the microphone is opened lazily: text mode has none)
+recognizer = sr.Recognizer()
+recognizer.pause_threshold = 1
+_microphone = None
+TTS_PREFIX = "friday-tts-"
+
+def microphone() -> sr.Microphone:
+    global _microphone
+    if _microphone is None:
+        _microphone = sr.Microphone()
+    return _microphone
+
+def play_interruptible(path: str):
+    """Play `path`, stopping as soon as the user starts talking over it.
+
+    Returns (captured_audio, vad) when interrupted, for listen_command(),
+    or None when playback finished.
+    """
+    from voice import EnergyVAD, microphone_chunks, play_with_barge_in
+
+    vad = EnergyVAD()
+    captured = play_with_barge_in(path, microphone_chunks(chunk_ms=30, max_seconds=600), vad)
+    return (captured, vad) if captured is not None else None
+
 def speak(text: str):
-    """Converts text to speech using Google TTS with natural female voice."""
+    """Converts text to speech using Google TTS with natural female voice.
+
+    Returns the user's speech if they interrupted playback (see
+    play_interruptible), else None.
+    """
     # Always print the full text with emojis and formatting
     print(f"Friday: {text}")
     
@@ -58,35 +98,72 @@ def speak(text: str):
             tts = gTTS(text=clean_text, lang='en', tld='co.uk', slow=False)
             
             # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
+            with tempfile.NamedTemporaryFile(delete=False, prefix=TTS_PREFIX, suffix='.mp3') as fp:
                 temp_file = fp.name
+            try:
                 tts.save(temp_file)
-            
-            # Play using mpg123 (already installed on your system)
-            os.system(f"mpg123 -q '{temp_file}' 2>/dev/null")
-            
-            # Clean up
-            os.remove(temp_file)
+                
+                # Play using mpg123 (already installed on your system)
+                if FRIDAY_BARGE_IN:
+                    return play_interruptible(temp_file)
+                os.system(f"mpg123 -q '{temp_file}' 2>/dev/null")
+            finally:
+                # Clean up, even if synthesis or playback failed
+                os.remove(temp_file)
     except Exception as e:
         print(f"[TTS Error] {e}")
 
-def listen() -> str:
-    """Listens for a user's command *after* the wake word is detected."""
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        print("\nListening for your command...")
-        r.pause_threshold = 1
-        r.adjust_for_ambient_noise(source)
-        audio = r.listen(source)
+def listen(barge_in=None) -> str:
+    """Listens for a user's command *after* the wake word is detected
+    (or finishes one the user started over Friday's playback)."""
+    if barge_in is not None:
+        from voice import SAMPLE_RATE, until_silence
+
+        chunks, vad = barge_in
+        audio = sr.AudioData(until_silence(chunks, vad), SAMPLE_RATE, 2)
+    else:
+        with microphone() as source:
+            print("\nListening for your command...")
+            recognizer.adjust_for_ambient_noise(source)
+            audio = recognizer.listen(source)
 
     try:
         print("Recognizing command...")
-        query = r.recognize_google(audio, language='en-in')
+        query = get_stt().transcribe(audio.get_raw_data(convert_rate=16000, convert_width=2))
         print(f"You: {query}")
         return query.lower()
     except Exception:
         return ""
 
+def listen_command(flash_llm, memory_manager, barge_in=None):
+    """Listen for a command; returns (text, speculation).
+
+    With FRIDAY_STT_STREAMING=vosk the command is transcribed while the user
+    speaks and routing/retrieval start on stable partials (`speculation`
+    holds that work); otherwise this is `listen()` and speculation is None.
+    `barge_in` is audio captured by speak() when the user interrupted it.
+    """
+    if FRIDAY_STT_STREAMING != "vosk":
+        return listen(barge_in), None
+
+    from voice import SpeculativeTurn, VoskRecognizer, microphone_chunks, transcribe_stream
+
+    speculation = SpeculativeTurn(
+        route_fn=lambda query: select_model(query, flash_llm),
+        retrieve_fn=memory_manager.get_vector_retriever().invoke,
+    )
+    print("\nListening for your command...")
+    try:
+        chunks = barge_in[0] if barge_in is not None else microphone_chunks()
+        query = transcribe_stream(chunks, VoskRecognizer(FRIDAY_VOSK_MODEL),
+                                  on_partial=speculation.on_partial)
+    except Exception as e:
+        print(f"[Voice] Streaming recognition failed: {e}")
+        speculation.cancel()
+        return "", None
+    print(f"You: {query}")
+    return query.lower(), speculation
+
 def select_model(user_input: str, llm) -> str:
     """Uses a fast LLM to decide if a query requires a powerful model."""
     prompt_template = """
@@ -115,21 +192,54 @@ def select_model(user_input: str, llm) -> str:
         
     decision = decision_text.strip().lower()
     
-    if "powerful" in decision:
-        return "powerful"
-    return "standard"
+    # the router's choice only: adapt() is applied once per turn, not to speculative partials
+    return "powerful" if "powerful" in decision else "standard"
+
+def resume_session(store, which, conversational_memory, limit: int = 20):
+    """Pick the session to continue ('latest', an id, or None for a new one)
+    and reload its newest messages into short-term memory."""
+    session_id = store.latest_session() if which == "latest" else which
+    if not session_id or not store.exists(session_id):
+        if which:
+            print("[Sessions] No session to resume, starting a new one.")
+        return store.create_session()
+
+    for msg in store.load_page(session_id, limit=limit):
+        message_cls = HumanMessage if msg["role"] == "user" else AIMessage
+        conversational_memory.messages.append(message_cls(content=msg["content"]))
+    print(f"[Sessions] Resumed session {session_id} ({store.message_count(session_id)} messages).")
+    return session_id
 
 # --- Main Interaction Loop ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Friday AI — terminal/voice mode")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="SESSION_ID",
+                        help="continue the latest session, or the given session id")
+    args = parser.parse_args()
+
     memory_manager = MemoryManager()
+    session_store = get_session_store()
+    session_id = resume_session(session_store, args.resume, memory_manager.conversational_memory)
     
     print("Initializing LLM models...")
     flash_llm = get_flash_llm()
     pro_llm = get_pro_llm()
 
     print("Creating agent instances...")
-    flash_agent = create_friday_agent(flash_llm, memory_manager.conversational_memory)
-    pro_agent = create_friday_agent(pro_llm, memory_manager.conversational_memory)
+    tool_selector = get_tool_selector(memory_manager.embedding_function)
+    flash_agent = create_friday_agent(flash_llm, memory_manager.conversational_memory, tool_selector)
+    pro_agent = create_friday_agent(pro_llm, memory_manager.conversational_memory, tool_selector)
+    fast_path = FastPath() if FRIDAY_FAST_PATH else None
+    # opens connections and runs the embedding model while the user is still talking
+    warmup = get_warmup((flash_llm, pro_llm), memory_manager.embedding_function)
+
+    # opt-in memory tracking (FRIDAY_MEMWATCH_PATH)
+    memwatch = start_memwatch()
+    if memwatch:
+        memwatch.gauge("chat_history_messages", lambda: len(memory_manager.conversational_memory.messages))
+        memwatch.gauge("vector_memories", memory_manager.backend.count)
+        memwatch.gauge("tts_temp_files", lambda: sum(
+            name.startswith(TTS_PREFIX) for name in os.listdir(tempfile.gettempdir())))
 
     speak("Initializing Friday AI. Say my name to activate.")
     
@@ -137,76 +247,122 @@ if __name__ == "__main__":
     
     # Set voice_mode variable (already global at module level)
     voice_mode = (mode == 'v')
+    if voice_mode:
+        get_stt()  # load a local speech model now, not on the first command
+        set_priority("voice")  # spoken turns go ahead of other queued LLM work
     
     # Track last interaction time for timeout-based wake word
     last_interaction_time = 0  # Start with 0 to require initial wake word
+    barge_in = None  # audio the user spoke over the last answer
 
     while True:
         user_input = ""
+        speculation = None
         
         if mode == 'v':
             current_time = time.time()
             time_since_last_interaction = current_time - last_interaction_time
             
             # Check if wake word is needed (first time or after timeout)
-            if time_since_last_interaction > TIMEOUT_SECONDS:
+            if barge_in is not None:
+                # the user interrupted the last answer: that speech is the next command
+                user_input, speculation = listen_command(flash_llm, memory_manager, barge_in)
+                barge_in = None
+            elif time_since_last_interaction > TIMEOUT_SECONDS:
                 # Need wake word
-                r = sr.Recognizer()
-                with sr.Microphone() as source:
+                with microphone() as source:
                     print(f"\n🔴 Listening for wake word '{WAKE_WORD}'...")
-                    r.pause_threshold = 1
-                    r.adjust_for_ambient_noise(source)
+                    recognizer.adjust_for_ambient_noise(source)
                     try:
-                        audio = r.listen(source, phrase_time_limit=2)
-                        heard_phrase = r.recognize_google(audio).lower()
-
-                        if WAKE_WORD in heard_phrase:
-                            speak("I'm here. I'll stay active for the next minute.")
-                            last_interaction_time = time.time()
-                            user_input = listen()
-                        else:
-                            continue
+                        audio = recognizer.listen(source, phrase_time_limit=2)
+                        heard_phrase = get_stt().transcribe(
+                            audio.get_raw_data(convert_rate=16000, convert_width=2)).lower()
                     except sr.UnknownValueError:
                         continue
                     except Exception as e:
                         print(f"Error during wake word detection: {e}")
                         continue
+                if WAKE_WORD not in heard_phrase:
+                    continue
+
+                # the wake-word microphone is closed again: listen_command opens its own
+                if warmup:
+                    warmup.trigger("wake word")
+                greeting_barge_in = speak("I'm here. I'll stay active for the next minute.")
+                last_interaction_time = time.time()
+                user_input, speculation = listen_command(flash_llm, memory_manager, greeting_barge_in)
             else:
                 # Within timeout window - skip wake word
                 remaining_time = int(TIMEOUT_SECONDS - time_since_last_interaction)
                 print(f"\n🟢 Friday is active (timeout in {remaining_time}s). Speak your command:")
-                user_input = listen()
+                if warmup:
+                    warmup.trigger("listening")
+                user_input, speculation = listen_command(flash_llm, memory_manager)
         else:
+            if warmup:
+                warmup.trigger("prompt")
             user_input = input("You: ").strip().lower()
 
         if "exit" in user_input or "quit" in user_input:
+            if fast_path:
+                print(fast_path.report())
             speak("Goodbye! Shutting down.")
             break
             
         if user_input:
-            chosen_model = select_model(user_input, flash_llm)
-
-            if chosen_model == "powerful":
-                print("[System] 🧠 Using gemini-2.5-pro (Powerful model)")
-                speak("Okay, this requires a more detailed answer.")
-                active_agent = pro_agent
+            # unambiguous tool commands ("pause the music") skip both LLM calls
+            response = fast_path.handle(user_input) if fast_path else None
+            if response is not None:
+                chosen_model = "fast_path"
+                if speculation is not None:
+                    speculation.cancel()
             else:
-                #print("[System] ⚡ Using gemini-2.5-flash (Fast model)")
-                active_agent = flash_agent
+                turn_start = time.perf_counter()
+                if speculation is not None:
+                    # routing/retrieval may already be done from the partial transcript
+                    requested_model, retrieved_docs = speculation.resolve(user_input)
+                else:
+                    requested_model = select_model(user_input, flash_llm)
+                    retrieved_docs = memory_manager.get_vector_retriever().invoke(user_input)
+                # Pro may be handed to Flash while it is too slow or failing (core/adaptive_router.py)
+                chosen_model = adapt(user_input, requested_model)
+
+                if chosen_model == "powerful":
+                    print("[System] 🧠 Using gemini-2.5-pro (Powerful model)")
+                    barge_in = speak("Okay, this requires a more detailed answer.")
+                    if barge_in is not None:
+                        # the user talked over the notice: their speech is the next command
+                        print("[System] Interrupted, skipping the detailed answer.")
+                        continue
+                    active_agent = pro_agent
+                else:
+                    #print("[System] ⚡ Using gemini-2.5-flash (Fast model)")
+                    active_agent = flash_agent
 
-            retriever = memory_manager.get_vector_retriever()
-            retrieved_docs = retriever.invoke(user_input)
-            retrieved_context = "\n".join([doc.page_content for doc in retrieved_docs])
+                retrieved_context = "\n".join([doc.page_content for doc in retrieved_docs])
             
-            agent_input = (
-                f"Relevant context from past conversations:\n"
-                f"{retrieved_context}\n\n"
-                f"User's current query: {user_input}"
-            )
+                agent_input = (
+                    f"Relevant context from past conversations:\n"
+                    f"{retrieved_context}\n\n"
+                    f"User's current query: {user_input}"
+                )
             
-            response = active_agent.invoke({"input": agent_input})
-            speak(response['output'])
-            memory_manager.save_interaction(user_input, response['output'])
+                agent_start = time.perf_counter()
+                try:
+                    response = active_agent.invoke({"input": agent_input})
+                except Exception:
+                    observe(chosen_model, user_input, time.perf_counter() - agent_start, ok=False)
+                    raise
+                observe(chosen_model, user_input, time.perf_counter() - agent_start)
+                if fast_path:
+                    fast_path.record_fallback(time.perf_counter() - turn_start)
+            barge_in = speak(response['output'])
+            memory_manager.save_interaction(user_input, response['output'], session_id=session_id,
+                                            tool=response.get('tool'), model=chosen_model)
+            session_store.append(session_id, "user", user_input)
+            session_store.append(session_id, "assistant", response['output'], {"model": chosen_model})
+            # short-term memory: the next turn's history, and its previous request for tool preselection
+            memory_manager.conversational_memory.save_context({"input": user_input}, {"output": response['output']})
             
             # Update last interaction time to reset timeout window
             last_interaction_time = time.time()
\ No newline at end of file
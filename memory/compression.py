@@ -0,0 +1,165 @@
+"""Compressed vector codes for the mmap memory format (``FRIDAY_VECTOR_COMPRESSION``).
+
+A search scans a compact copy of the vectors, keeps a shortlist of
+``k * FRIDAY_VECTOR_RERANK`` rows and re-ranks it with the exact float32
+vectors, which stay on disk and are only read for the shortlisted rows:
+
+* ``fp16`` — float16 copies, half the size of float32 to scan (the store on
+  disk grows by half); no training needed. Scored with faiss's fp16 scalar
+  quantizer, which widens and compares in SIMD without float32 temporaries
+* ``pq``   — product quantization: each vector is split into ``m`` sub-vectors
+  and each sub-vector stored as the index (one byte) of its nearest of 256
+  centroids learned from the data, so a 384-dimensional vector takes ``m``
+  bytes. Distances are summed from a per-query lookup table (asymmetric
+  distance computation). The codebooks are trained (with faiss) once a store
+  has FRIDAY_VECTOR_PQ_TRAIN_ROWS vectors; until then searches are exact.
+
+Codes are scanned block by block through the codec's ``nearest``: the best k
+rows of a block and their distances. PQ codebooks are saved with ``np.save``
+(no pickle).
+"""
+
+import os
+from typing import Callable, Optional
+
+import numpy as np
+
+CENTROIDS = 256
+
+
+def exact_distance(query: np.ndarray) -> Callable[[np.ndarray], np.ndarray]:
+    """Squared L2 distance from `query` to each row of a float block."""
+    query = np.asarray(query, dtype=np.float32)
+    query_norm = float(query @ query)
+
+    def distance(block):
+        block = np.asarray(block, dtype=np.float32)
+        return np.einsum("ij,ij->i", block, block) - 2.0 * (block @ query) + query_norm
+    return distance
+
+
+def nearest(distance: Callable[[np.ndarray], np.ndarray]) -> Callable[[np.ndarray, int], tuple]:
+    """best(block, k) -> (positions in the block, distances) from a block distance function."""
+    def best(block, k):
+        distances = distance(block).astype(np.float32)
+        if len(distances) <= k:
+            return np.arange(len(distances)), distances
+        keep = np.argpartition(distances, k)[:k]
+        return keep, distances[keep]
+    return best
+
+
+class Float16Codec:
+    """float16 copies of the vectors."""
+
+    name = "fp16"
+    filename = "vectors.f16"
+    dtype = np.float16
+    trained = True
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.width = dim
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float16)
+
+    def nearest(self, query: np.ndarray) -> Callable[[np.ndarray, int], tuple]:
+        import faiss
+
+        # a QT_fp16 index stores exactly these codes: each block is copied in and searched
+        index = faiss.IndexScalarQuantizer(self.dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+        query = np.asarray(query, dtype=np.float32).reshape(1, self.dim)
+
+        def best(block, k):
+            codes = np.ascontiguousarray(block, dtype=np.float16).view(np.uint8)
+            faiss.copy_array_to_vector(codes.ravel(), index.codes)
+            index.ntotal = len(codes)
+            distances, positions = index.search(query, min(k, len(codes)))
+            return positions[0], distances[0]
+        return best
+
+
+class PQCodec:
+    """Product quantization with ``m`` one-byte sub-vector codes."""
+
+    name = "pq"
+    filename = "codes.u8"
+    codebook_file = "pq_codebooks.npy"
+    dtype = np.uint8
+
+    def __init__(self, dim: int, m: int = 48, codebooks: Optional[np.ndarray] = None):
+        if dim % m:
+            raise ValueError(f"PQ needs a sub-quantizer count that divides the dimension ({dim} % {m} != 0)")
+        self.dim = dim
+        self.m = m
+        self.width = m
+        self.sub = dim // m
+        self.codebooks = codebooks
+
+    @property
+    def trained(self) -> bool:
+        return self.codebooks is not None
+
+    def _quantizer(self):
+        # faiss (already needed by the faiss backend) trains and encodes; search is numpy only
+        import faiss
+
+        quantizer = faiss.ProductQuantizer(self.dim, self.m, 8)
+        if self.codebooks is not None:
+            faiss.copy_array_to_vector(self.codebooks.ravel(), quantizer.centroids)
+        return faiss, quantizer
+
+    def train(self, vectors: np.ndarray):
+        """Learn 256 centroids per sub-space from a sample of the stored vectors."""
+        faiss, quantizer = self._quantizer()
+        quantizer.train(np.ascontiguousarray(vectors, dtype=np.float32))
+        self.codebooks = faiss.vector_to_array(quantizer.centroids).reshape(self.m, CENTROIDS, self.sub)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        _, quantizer = self._quantizer()
+        return quantizer.compute_codes(np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def distance(self, query: np.ndarray) -> Callable[[np.ndarray], np.ndarray]:
+        # table[i, c]: squared distance from the query's i-th sub-vector to centroid c
+        parts = np.asarray(query, dtype=np.float32).reshape(self.m, 1, self.sub)
+        table = ((self.codebooks - parts) ** 2).sum(axis=2)
+
+        def distance(codes):
+            codes = np.asarray(codes)
+            total = np.zeros(len(codes), dtype=np.float32)
+            for i in range(self.m):
+                total += table[i].take(codes[:, i])
+            return total
+        return distance
+
+    def nearest(self, query: np.ndarray) -> Callable[[np.ndarray, int], tuple]:
+        return nearest(self.distance(query))
+
+    def save(self, path: str):
+        tmp = os.path.join(path, self.codebook_file + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, self.codebooks.astype(np.float32), allow_pickle=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(path, self.codebook_file))
+
+    @classmethod
+    def load(cls, path: str, dim: int, m: int) -> "PQCodec":
+        codebook_path = os.path.join(path, cls.codebook_file)
+        codebooks = np.load(codebook_path, allow_pickle=False) if os.path.exists(codebook_path) else None
+        return cls(dim, m, codebooks)
+
+
+COMPRESSIONS = ("none", Float16Codec.name, PQCodec.name)
+
+
+def load_codec(compression: str, path: str, dim: int, pq_m: int):
+    """The codec of a store (None for uncompressed)."""
+    if compression == "none":
+        return None
+    if compression == Float16Codec.name:
+        return Float16Codec(dim)
+    if compression == PQCodec.name:
+        return PQCodec.load(path, dim, pq_m)
+    raise ValueError(f"Unknown vector compression '{compression}'. Choose one of: {', '.join(COMPRESSIONS)}")
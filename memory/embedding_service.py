@@ -0,0 +1,262 @@
+"""Shared local embedding daemon over a Unix socket (opt-in).
+
+Start one daemon per machine:
+
+    python -m memory.embedding_service --socket /tmp/friday-embeddings.sock
+
+and set ``FRIDAY_EMBEDDING_SOCKET`` to the same path. Every MemoryManager
+(Streamlit workers, main.py, server.py, ingestion) then embeds through
+``EmbeddingClient`` instead of loading its own copy of the model. The daemon
+merges requests that arrive together into one micro-batch. If the daemon
+can't be reached, the client loads the model in-process and keeps working.
+
+Wire format, both directions: a 4-byte big-endian length, then a JSON
+header. Requests are ``{"op": "embed", "kind": "documents"|"query",
+"texts": [...]}`` or ``{"op": "stats"}``. Embedding replies are followed by
+``n * dim`` little-endian float32 values.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+HEADER = struct.Struct(">I")
+
+
+# ── framing ────────────────────────────────────────
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    data = bytearray()
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("embedding daemon closed the connection")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _frame(header: dict) -> bytes:
+    body = json.dumps(header).encode("utf-8")
+    return HEADER.pack(len(body)) + body
+
+
+# ── client ─────────────────────────────────────────
+class EmbeddingClient(Embeddings):
+    """Embeddings served by the daemon, with an in-process fallback.
+
+    Each thread keeps its own connection. After a failure the client embeds
+    locally and retries the daemon every `retry_seconds`.
+    """
+
+    def __init__(self, socket_path: str, fallback: Optional[Callable[[], Embeddings]] = None,
+                 timeout: float = 30.0, retry_seconds: float = 30.0):
+        self.socket_path = socket_path
+        self.fallback_factory = fallback
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self._local = threading.local()
+        self._fallback = None
+        self._fallback_lock = threading.Lock()
+        self._down_until = 0.0
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _drop_connection(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def _request(self, header: dict) -> tuple:
+        sock = self._connection()
+        try:
+            sock.sendall(_frame(header))
+            reply = json.loads(_recv_exact(sock, HEADER.unpack(_recv_exact(sock, HEADER.size))[0]))
+            if "error" in reply:
+                raise RuntimeError(f"embedding daemon error: {reply['error']}")
+            payload = None
+            if "shape" in reply:
+                n, dim = reply["shape"]
+                payload = np.frombuffer(_recv_exact(sock, n * dim * 4), dtype="<f4").reshape(n, dim)
+            return reply, payload
+        except (OSError, ConnectionError):
+            self._drop_connection()
+            raise
+
+    def _local_embeddings(self) -> Embeddings:
+        with self._fallback_lock:
+            if self._fallback is None:
+                if self.fallback_factory is None:
+                    raise RuntimeError(f"Embedding daemon at {self.socket_path} is unavailable")
+                print(f"[Embeddings] Daemon at {self.socket_path} unavailable, embedding in-process.")
+                self._fallback = self.fallback_factory()
+            return self._fallback
+
+    def _embed(self, texts: list, kind: str) -> list:
+        if time.monotonic() >= self._down_until:
+            try:
+                _, vectors = self._request({"op": "embed", "kind": kind, "texts": texts})
+                return vectors.tolist()
+            except (OSError, ConnectionError):
+                self._down_until = time.monotonic() + self.retry_seconds
+        local = self._local_embeddings()
+        if kind == "query":
+            return [local.embed_query(texts[0])]
+        return local.embed_documents(texts)
+
+    def embed_documents(self, texts: list) -> list:
+        if not texts:
+            return []
+        return self._embed(list(texts), "documents")
+
+    def embed_query(self, text: str) -> list:
+        return self._embed([text], "query")[0]
+
+    def stats(self) -> dict:
+        """The daemon's request / batch counters."""
+        return self._request({"op": "stats"})[0]
+
+
+# ── daemon ─────────────────────────────────────────
+class EmbeddingServer:
+    """Accepts embed requests and runs them through the model in micro-batches.
+
+    The batcher takes the first waiting request, then keeps collecting
+    requests of the same kind for up to `max_wait` seconds or `max_batch`
+    texts, and embeds them all in one model call.
+    """
+
+    def __init__(self, embeddings: Embeddings, socket_path: str,
+                 max_batch: int = 256, max_wait: float = 0.005):
+        self.embeddings = embeddings
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.counters = {"requests": 0, "texts": 0, "batches": 0, "connections": 0}
+        self._queue = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.counters["connections"] += 1
+        try:
+            while True:
+                size = HEADER.unpack(await reader.readexactly(HEADER.size))[0]
+                request = json.loads(await reader.readexactly(size))
+                if request.get("op") == "stats":
+                    writer.write(_frame({**self.counters, "mean_batch": round(
+                        self.counters["texts"] / max(1, self.counters["batches"]), 2)}))
+                else:
+                    future = asyncio.get_running_loop().create_future()
+                    await self._queue.put((request.get("kind", "documents"), request["texts"], future))
+                    try:
+                        vectors = await future
+                    except Exception as e:
+                        writer.write(_frame({"error": str(e)}))
+                    else:
+                        writer.write(_frame({"shape": list(vectors.shape)}) + vectors.astype("<f4").tobytes())
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _run_batch(self, kind: str, texts: list) -> np.ndarray:
+        # one model call for the whole micro-batch, queries included: the sentence-transformers
+        # models behind default_embeddings encode a query exactly like a document
+        if kind == "query" and getattr(self.embeddings, "query_encode_kwargs", None):
+            return np.asarray([self.embeddings.embed_query(t) for t in texts], dtype=np.float32)
+        return np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        carry = None
+        while True:
+            first = carry or await self._queue.get()
+            carry = None
+            kind, batch = first[0], [first]
+            count = len(first[1])
+            deadline = loop.time() + self.max_wait
+            while count < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item[0] != kind:
+                    carry = item
+                    break
+                batch.append(item)
+                count += len(item[1])
+
+            texts = [text for _, item_texts, _ in batch for text in item_texts]
+            self.counters["requests"] += len(batch)
+            self.counters["texts"] += len(texts)
+            self.counters["batches"] += 1
+            try:
+                vectors = await asyncio.to_thread(self._run_batch, kind, texts)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for _, item_texts, future in batch:
+                future.set_result(vectors[start:start + len(item_texts)])
+                start += len(item_texts)
+
+    async def serve(self):
+        self._queue = asyncio.Queue()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        batcher = asyncio.create_task(self._batcher())
+        print(f"[Embeddings] Serving on {self.socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def main():
+    from config import FRIDAY_EMBEDDING_SOCKET
+    from memory.memory_manager import default_embeddings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", default=FRIDAY_EMBEDDING_SOCKET or "/tmp/friday-embeddings.sock")
+    parser.add_argument("--max-batch", type=int, default=256, help="texts per model call")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0,
+                        help="how long to wait for more requests to join a batch")
+    args = parser.parse_args()
+
+    print("[Embeddings] Loading model...")
+    server = EmbeddingServer(default_embeddings(), args.socket, args.max_batch, args.max_wait_ms / 1000)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Bulk ingestion of notes / markdown / text files into long-term memory.
+
+Usage:  python -m memory.ingest ~/notes [--workers 4] [--batch-size 256]
+
+Files are streamed line by line into overlapping chunks, chunks are embedded
+in large batches across a process pool (each worker loads the embedding
+model once), and the vectors are appended to the configured MemoryManager
+backend in file order. Progress is checkpointed next to the vector
+store: re-running the same command after an interruption skips what was
+already stored. Every chunk has a deterministic id (file, mtime and chunk
+number); chunks that write-through backends (mmap, sharded mmap) stored after
+the last checkpoint are found by id and skipped, and Chroma overwrites them
+in place. Chunks per second are reported as it goes.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from memory.memory_manager import MemoryManager, default_embeddings
+
+EXTENSIONS = (".md", ".markdown", ".txt", ".rst", ".org")
+CHECKPOINT_NAME = "ingest_checkpoint.json"
+
+
+# ── reading + chunking ─────────────────────────────
+def iter_files(root: str, extensions=EXTENSIONS) -> Iterator[str]:
+    """Every matching file under `root`, in a stable (sorted) order."""
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                yield os.path.join(directory, name)
+
+
+def chunk_file(path: str, size: int = 1000, overlap: int = 150) -> Iterator[str]:
+    """Stream a file into chunks of about `size` characters, breaking on line
+    boundaries where possible and repeating the last `overlap` characters."""
+    buffer = ""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            buffer += line
+            while len(buffer) >= size:
+                cut = buffer.rfind("\n", size // 2, size)
+                cut = size if cut == -1 else cut + 1
+                chunk = buffer[:cut].strip()
+                if chunk:
+                    yield chunk
+                tail = buffer[max(0, cut - overlap):cut]
+                # restart the overlap on a word boundary
+                space = tail.find(" ")
+                buffer = (tail[space + 1:] if 0 <= space < len(tail) - 1 else "") + buffer[cut:]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+# ── checkpoint ─────────────────────────────────────
+def chunk_id(source: str, mtime: float, chunk: int) -> str:
+    """Stable id of one chunk of one version of a file."""
+    return hashlib.sha1(f"{source}\0{mtime!r}\0{chunk}".encode("utf-8")).hexdigest()
+
+
+class Checkpoint:
+    """Files fully stored (path -> mtime), how many chunks of the current
+    file are stored, and the backend's write position at that point."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = {}
+        self.partial = {"file": None, "mtime": None, "chunks": 0}
+        self.position = None
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.done = state.get("done", {})
+            self.partial = state.get("partial", self.partial)
+            self.position = state.get("position")
+
+    def skip(self, path: str, mtime: float) -> int:
+        """Chunks of `path` already stored: -1 if the whole file is."""
+        if self.done.get(path) == mtime:
+            return -1
+        if self.partial["file"] == path and self.partial["mtime"] == mtime:
+            return self.partial["chunks"]
+        return 0
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"done": self.done, "partial": self.partial, "position": self.position}, f)
+        os.replace(tmp, self.path)
+
+
+# ── embedding workers ──────────────────────────────
+_worker_embeddings = None
+
+
+def _init_worker(factory):
+    global _worker_embeddings
+    _worker_embeddings = factory()
+
+
+def _embed(texts: list) -> list:
+    return _worker_embeddings.embed_documents(texts)
+
+
+def iter_batches(root, checkpoint: Checkpoint, batch_size, chunk_size, overlap, extensions,
+                 stored: frozenset = frozenset()):
+    """Yield (texts, metadatas) batches of chunks not yet in the checkpoint
+    (nor among the `stored` ids).
+
+    Each metadata carries the source file, chunk number and the file's mtime
+    as timestamp, so recency ranking treats notes by when they were written.
+    """
+    texts, metadatas = [], []
+    for path in iter_files(root, extensions):
+        mtime = os.path.getmtime(path)
+        source = os.path.abspath(path)
+        skip = checkpoint.skip(source, mtime)
+        if skip < 0:
+            continue
+        for i, chunk in enumerate(chunk_file(path, chunk_size, overlap)):
+            if i < skip:
+                continue
+            doc_id = chunk_id(source, mtime, i)
+            if doc_id in stored:
+                continue
+            texts.append(chunk)
+            metadatas.append({"timestamp": mtime, "source": source, "chunk": i, "_id": doc_id})
+            if len(texts) >= batch_size:
+                yield texts, metadatas
+                texts, metadatas = [], []
+        # end-of-file marker so the writer can mark the file done
+        metadatas.append({"source": source, "timestamp": mtime, "eof": True})
+        texts.append(None)
+    if texts:
+        yield texts, metadatas
+
+
+def ingest(root: str, memory: Optional[MemoryManager] = None, embedding_factory=default_embeddings,
+           workers: int = os.cpu_count() or 1, batch_size: int = 256, chunk_size: int = 1000,
+           overlap: int = 150, checkpoint_every: int = 5000, extensions=EXTENSIONS,
+           checkpoint_path: Optional[str] = None) -> dict:
+    """Ingest every file under `root` into `memory`'s backend. Returns stats."""
+    root = os.path.abspath(root)
+    memory = memory or MemoryManager(embedding_function=embedding_factory())
+    backend = memory.backend
+    checkpoint = Checkpoint(checkpoint_path or os.path.join(backend.path, CHECKPOINT_NAME))
+    if checkpoint.position is None:
+        # a run interrupted before its first commit still knows where it started
+        checkpoint.position = backend.position()
+        checkpoint.save()
+    # rows stored after the last checkpoint, by a run that was interrupted
+    stored = frozenset(backend.ids_after(checkpoint.position)) if checkpoint.position is not None else frozenset()
+    if stored:
+        print(f"[Ingest] {len(stored)} rows stored after the last checkpoint, skipping their chunks")
+
+    stats = {"files": 0, "chunks": 0, "seconds": 0.0}
+    start = time.perf_counter()
+    since_checkpoint = 0
+
+    def commit():
+        # store first, checkpoint second: the checkpoint never runs ahead
+        backend.persist()
+        checkpoint.position = backend.position()
+        checkpoint.save()
+        elapsed = time.perf_counter() - start
+        print(f"[Ingest] {stats['files']} files, {stats['chunks']} chunks, "
+              f"{stats['chunks'] / elapsed:.1f} chunks/s")
+
+    def store(texts, metadatas, vectors):
+        # `vectors` covers the real chunks only, not the end-of-file markers
+        nonlocal since_checkpoint
+        rows = [(t, m) for t, m in zip(texts, metadatas) if t is not None]
+        if rows:
+            with memory._write_lock:
+                backend.add_embeddings([t for t, _ in rows], vectors, [m for _, m in rows], persist=False)
+        for text, metadata in zip(texts, metadatas):
+            if text is None:
+                checkpoint.done[metadata["source"]] = metadata["timestamp"]
+                checkpoint.partial = {"file": None, "mtime": None, "chunks": 0}
+                stats["files"] += 1
+            else:
+                checkpoint.partial = {"file": metadata["source"], "mtime": metadata["timestamp"],
+                                      "chunks": metadata["chunk"] + 1}
+        stats["chunks"] += len(rows)
+        since_checkpoint += len(rows)
+        if since_checkpoint >= checkpoint_every:
+            commit()
+            since_checkpoint = 0
+
+    batches = iter_batches(root, checkpoint, batch_size, chunk_size, overlap, extensions, stored)
+    if workers <= 0:
+        embeddings = memory.embedding_function
+        for texts, metadatas in batches:
+            store(texts, metadatas, embeddings.embed_documents([t for t in texts if t is not None]))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(embedding_factory,)) as pool:
+            # bounded read-ahead keeps every worker busy without buffering the corpus
+            pending = deque()
+            for texts, metadatas in batches:
+                pending.append((texts, metadatas, pool.submit(_embed, [t for t in texts if t is not None])))
+                if len(pending) >= workers * 2:
+                    texts, metadatas, future = pending.popleft()
+                    store(texts, metadatas, future.result())
+            while pending:
+                texts, metadatas, future = pending.popleft()
+                store(texts, metadatas, future.result())
+
+    commit()
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="directory of notes to ingest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="embedding processes (0 = embed in this process)")
+    parser.add_argument("--batch-size", type=int, default=256, help="chunks per embedding batch")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="characters per chunk")
+    parser.add_argument("--overlap", type=int, default=150, help="characters repeated between chunks")
+    parser.add_argument("--checkpoint-every", type=int, default=5000, help="chunks between checkpoints")
+    parser.add_argument("--extensions", nargs="+", default=list(EXTENSIONS))
+    parser.add_argument("--backend", help="vector backend (default: FRIDAY_VECTOR_BACKEND)")
+    parser.add_argument("--path", help="vector store path (default: the backend's)")
+    args = parser.parse_args()
+
+    memory = MemoryManager(backend=args.backend, path=args.path)
+    stats = ingest(args.root, memory, workers=args.workers, batch_size=args.batch_size,
+                   chunk_size=args.chunk_size, overlap=args.overlap,
+                   checkpoint_every=args.checkpoint_every, extensions=tuple(args.extensions))
+    rate = stats["chunks"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"[Ingest] Done: {stats['files']} files, {stats['chunks']} chunks in "
+          f"{stats['seconds']:.1f}s ({rate:.1f} chunks/s)")
+
+
+if __name__ == "__main__":
+    main()
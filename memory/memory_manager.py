@@ -1,13 +1,32 @@
-import os
-from langchain_community.vectorstores import FAISS
+import threading
+import time
 from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.runnables import RunnableLambda
+from memory.vector_backends import create_backend
+from memory.embedding_service import EmbeddingClient
 from langchain_core.messages import HumanMessage, AIMessage
+from config import (
+    FRIDAY_MEMORY_RECENCY_WEIGHT,
+    FRIDAY_MEMORY_HALF_LIFE_DAYS,
+    FRIDAY_MEMORY_WINDOW_DAYS,
+    FRIDAY_MEMORY_FETCH_FACTOR,
+    FRIDAY_EMBEDDING_MODEL,
+    FRIDAY_EMBEDDING_SOCKET,
+    FRIDAY_CONVERSATION_MAX_MESSAGES,
+)
+
+
+def default_embeddings():
+    """The embedding model shared by chat memory and bulk ingestion."""
+    return HuggingFaceEmbeddings(model_name=FRIDAY_EMBEDDING_MODEL)
+
 
 # Simple custom memory class since ConversationBufferMemory isn't available
 class SimpleConversationalMemory:
-    """Simple chat history manager."""
-    def __init__(self):
+    """Simple chat history manager, keeping the newest `max_messages` messages."""
+    def __init__(self, max_messages: int = FRIDAY_CONVERSATION_MAX_MESSAGES):
         self.messages = []
+        self.max_messages = max_messages
     
     def load_memory_variables(self, inputs):
         """Return chat history."""
@@ -19,47 +38,73 @@ class SimpleConversationalMemory:
             self.messages.append(HumanMessage(content=inputs["input"]))
         if "output" in outputs:
             self.messages.append(AIMessage(content=outputs["output"]))
+        # older turns live on in long-term memory; drop them from the prompt
+        if self.max_messages and len(self.messages) > self.max_messages:
+            del self.messages[:len(self.messages) - self.max_messages]
 
 class MemoryManager:
     """Manages conversational memory and long term vector memory."""
-    def __init__(self):
-        #initializing the embedding model
-        self.embedding_function = HuggingFaceEmbeddings(
-            model_name="all-MiniLM-L6-v2")
+    def __init__(self, embedding_function=None, backend=None, path=None):
+        #initializing the embedding model (via the shared daemon when FRIDAY_EMBEDDING_SOCKET is set)
+        if embedding_function is None and FRIDAY_EMBEDDING_SOCKET:
+            embedding_function = EmbeddingClient(FRIDAY_EMBEDDING_SOCKET, fallback=default_embeddings)
+        self.embedding_function = embedding_function or default_embeddings()
         
-        #initializing FAISS for persistent long term memory
-        self.faiss_index_path = "./faiss_db"
-        
-        # Load existing FAISS index if it exists, otherwise create a new one
-        if os.path.exists(os.path.join(self.faiss_index_path, "index.faiss")):
-            self.vector_store = FAISS.load_local(
-                self.faiss_index_path,
-                self.embedding_function,
-                allow_dangerous_deserialization=True
-            )
-        else:
-            # Create a new FAISS index with a dummy document
-            self.vector_store = FAISS.from_texts(
-                ["Friday AI Assistant initialized"],
-                self.embedding_function
-            )
+        #initializing the persistent long term memory (FAISS or Chroma, see config)
+        self.backend = create_backend(self.embedding_function, backend, path)
+        self.vector_store = self.backend.store
             
         #initializing short term conversational memory (custom implementation)
         self.conversational_memory = SimpleConversationalMemory()
 
-    def get_vector_retriever(self):
-        """Returns the vector store as a retriever for similarity searches."""
-        return self.vector_store.as_retriever(search_kwargs={"k": 3})
+        # retrieval ranking knobs (see search)
+        self.recency_weight = FRIDAY_MEMORY_RECENCY_WEIGHT
+        self.half_life_days = FRIDAY_MEMORY_HALF_LIFE_DAYS
+        self.window_days = FRIDAY_MEMORY_WINDOW_DAYS
+
+        # backend writes are not thread-safe; Streamlit sessions and the
+        # server save interactions from several threads at once
+        self._write_lock = threading.Lock()
+
+    def search(self, query: str, k: int = 3, session_id=None, since=None, until=None):
+        """Retrieve the k most useful memories, blending similarity with recency.
 
-    def save_interaction(self, user_input: str, ai_response: str):
-        """Saves a user-AI interaction to the vector store."""
+        Session and time-window filters are applied by the backend before the
+        vector scan. The backend's candidates are then re-ranked by
+        (1 - w) * similarity + w * 0.5 ** (age / half_life).
+        """
+        if since is None and self.window_days:
+            since = time.time() - self.window_days * 86400
+        candidates = self.backend.search(query, k=k * FRIDAY_MEMORY_FETCH_FACTOR,
+                                         session_id=session_id, since=since, until=until)
+        now = time.time()
+        half_life = self.half_life_days * 86400
+        weight = self.recency_weight
+
+        def score(candidate):
+            doc, distance = candidate
+            # squared L2 on unit vectors -> cosine similarity
+            similarity = max(0.0, 1.0 - distance / 2.0)
+            timestamp = doc.metadata.get("timestamp")
+            recency = 0.5 ** (max(0.0, now - timestamp) / half_life) if timestamp else 0.0
+            return (1 - weight) * similarity + weight * recency
+
+        return [doc for doc, _ in sorted(candidates, key=score, reverse=True)[:k]]
+
+    def get_vector_retriever(self, session_id=None, since=None):
+        """Returns a retriever (invoke/ainvoke) over recency-ranked long-term memory."""
+        return RunnableLambda(lambda query: self.search(query, k=3, session_id=session_id, since=since))
+
+    def save_interaction(self, user_input: str, ai_response: str, session_id=None, tool=None, model=None):
+        """Saves a user-AI interaction to the vector store, with its metadata."""
         interaction_text = f"User asked: {user_input}\nFriday responded: {ai_response}"
-        self.vector_store.add_texts([interaction_text])
-        
-        # Save the updated FAISS index to disk
-        os.makedirs(self.faiss_index_path, exist_ok=True)
-        self.vector_store.save_local(self.faiss_index_path)
+        metadata = {
+            "timestamp": time.time(),
+            "session_id": session_id,
+            "tool": tool,
+            "model": model,
+        }
+        with self._write_lock:
+            self.backend.add_texts([interaction_text], [metadata])
         
         print(f"[Memory] Saved interaction to Vector DB.")
-
-   
\ No newline at end of file
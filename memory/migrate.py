@@ -0,0 +1,110 @@
+"""One-time migration of a FAISS memory store into the mmap or sharded format.
+
+Usage:
+    python -m memory.migrate --src ./faiss_db --dst ./memory_db
+    python -m memory.migrate --src ./faiss_db --dst ./memory_shards --to sharded
+    python -m memory.migrate --src ./faiss_db --dst ./memory_db --compression pq
+    python -m memory.migrate --src ./memory_db --dst ./memory_db_pq --compression pq
+
+Vectors are copied straight out of the FAISS index (nothing is re-embedded)
+and documents keep their ids and metadata; ``--to sharded`` splits them into
+monthly shards by timestamp. ``--compression`` (default
+FRIDAY_VECTOR_COMPRESSION) stores fp16 or PQ codes next to the vectors
+(memory/compression.py); an existing mmap store can be given as ``--src`` to
+compress it into a new directory. Loading the old docstore needs pickle, so
+only migrate FAISS stores you created yourself. Afterwards set
+``FRIDAY_VECTOR_BACKEND=mmap`` (or ``sharded``).
+"""
+
+import argparse
+import os
+import time
+from typing import Optional
+
+from memory.mmap_store import MmapBackend
+from memory.sharded_store import ShardedBackend
+from memory.vector_backends import SEED_TEXT
+
+
+def _faiss_batches(src: str, batch_size: int):
+    """(total, dim, batches of (texts, vectors, metadatas)) from a FAISS store."""
+    from langchain_community.vectorstores import FAISS
+
+    # embeddings are never computed during migration, so no model is loaded
+    store = FAISS.load_local(src, embeddings=None, allow_dangerous_deserialization=True)
+    total = store.index.ntotal
+
+    def batches():
+        for start in range(0, total, batch_size):
+            stop = min(total, start + batch_size)
+            texts, metadatas = [], []
+            for i in range(start, stop):
+                doc_id = store.index_to_docstore_id[i]
+                doc = store.docstore.search(doc_id)
+                texts.append(doc.page_content)
+                metadatas.append({**doc.metadata, "_id": doc_id})
+            yield texts, store.index.reconstruct_n(start, stop - start), metadatas
+    return total, store.index.d, batches()
+
+
+def _mmap_batches(src: str, batch_size: int):
+    """Like _faiss_batches, from an mmap store."""
+    store = MmapBackend(embedding_function=None, path=src, seed=False)
+    total = store.count()
+
+    def batches():
+        vectors = store._column("vectors")
+        for start in range(0, total, batch_size):
+            stop = min(total, start + batch_size)
+            docs = [store.document(i) for i in range(start, stop)]
+            yield ([doc.page_content for doc in docs], vectors[start:stop],
+                   [{**doc.metadata, "_id": doc.id} for doc in docs])
+    return total, store.dim, batches()
+
+
+def migrate(src: str, dst: str, batch_size: int = 5000, to: str = "mmap",
+            compression: Optional[str] = None) -> int:
+    """Copy every vector and document from the FAISS (or mmap) store at `src` to `dst`."""
+    if any(os.path.exists(os.path.join(dst, name)) for name in ("meta.json", "shards.json")):
+        raise FileExistsError(f"{dst} already holds a memory store; pick an empty directory")
+
+    from_mmap = os.path.exists(os.path.join(src, "meta.json"))
+    total, dim, batches = (_mmap_batches if from_mmap else _faiss_batches)(src, batch_size)
+    if to == "sharded":
+        target = ShardedBackend(embedding_function=None, path=dst, compression=compression)
+    else:
+        target = MmapBackend(embedding_function=None, path=dst, dim=dim, seed=False, compression=compression)
+
+    done = 0
+    for texts, vectors, metadatas in batches:
+        done += len(texts)
+        if to == "sharded":
+            # the placeholder would become a shard of its own (1970-01)
+            rows = [i for i, text in enumerate(texts) if text != SEED_TEXT]
+            texts, vectors, metadatas = [texts[i] for i in rows], vectors[rows], [metadatas[i] for i in rows]
+        if not texts:
+            continue
+        target.add_embeddings(texts, vectors, metadatas, persist=False)
+        print(f"[Memory] Migrated {done}/{total} memories.")
+    target.persist()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--src", default="./faiss_db")
+    parser.add_argument("--dst", help="target directory (default ./memory_db or ./memory_shards)")
+    parser.add_argument("--to", choices=["mmap", "sharded"], default="mmap")
+    parser.add_argument("--compression", choices=["none", "fp16", "pq"],
+                        help="vector compression of the new store (default FRIDAY_VECTOR_COMPRESSION)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    args.dst = args.dst or (ShardedBackend if args.to == "sharded" else MmapBackend).default_path
+
+    start = time.perf_counter()
+    total = migrate(args.src, args.dst, args.batch_size, args.to, args.compression)
+    print(f"[Memory] Done: {total} memories in {time.perf_counter() - start:.1f}s -> {args.dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""Pickle-free, memory-mapped long-term memory format (``FRIDAY_VECTOR_BACKEND=mmap``).
+
+On-disk layout (append-only, one row per memory)::
+
+    memory_db/
+        meta.json          {"dim": 384, "version": 1, "compression": "none"}
+        vectors.f32        row-major float32 vectors, memory-mapped for search
+        docs.jsonl         {"id", "text", "metadata"} per line
+        offsets.u64        byte offset of each line in docs.jsonl
+        timestamps.f64     metadata timestamp per row (for time-window filters)
+        sessions.i32       session code per row, -1 for none
+        sessions.json      session code -> session id
+        vectors.f16        float16 vectors            (compression "fp16")
+        codes.u8           product-quantization codes (compression "pq")
+        pq_codebooks.npy   the PQ codebooks           (compression "pq")
+
+Opening the store only reads meta.json and maps the column files, so startup
+time and RSS don't grow with the number of memories. Documents are read on
+demand through the offset index. The number of complete rows is the shortest
+column, so a write interrupted half-way is simply ignored.
+
+A compressed store (memory/compression.py) scans its codes instead of
+vectors.f32 and reads exact vectors only for the shortlist it re-ranks.
+Codes are derived data: rows without them (a store not yet large enough to
+train PQ, or an append interrupted after the vectors) are encoded on the next
+write and searched exactly in the meantime.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from config import (
+    FRIDAY_VECTOR_COMPRESSION,
+    FRIDAY_VECTOR_PQ_M,
+    FRIDAY_VECTOR_PQ_TRAIN_ROWS,
+    FRIDAY_VECTOR_RERANK,
+)
+from memory.compression import exact_distance, load_codec, nearest
+from memory.vector_backends import SEED_TEXT, VectorBackend, clean_metadata
+
+FORMAT_VERSION = 1
+# rows scored per block during brute-force search, to bound temporary memory
+SEARCH_BLOCK_ROWS = 65536
+# smaller blocks for compressed codes: PQ builds a float32 table lookup per block
+CODE_BLOCK_ROWS = 8192
+# at most this many evenly spaced vectors are used to train the PQ codebooks
+PQ_TRAIN_SAMPLE = 65536
+
+
+class MmapBackend(VectorBackend):
+    """Brute-force search over memory-mapped vectors with an on-demand docstore."""
+
+    name = "mmap"
+    default_path = "./memory_db"
+
+    COLUMNS = {
+        "vectors": ("vectors.f32", np.float32),
+        "offsets": ("offsets.u64", np.uint64),
+        "timestamps": ("timestamps.f64", np.float64),
+        "sessions": ("sessions.i32", np.int32),
+    }
+
+    def __init__(self, embedding_function, path: Optional[str] = None, dim: Optional[int] = None,
+                 seed: bool = True, compression: Optional[str] = None):
+        super().__init__(embedding_function, path)
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._maps = {}
+        self.rerank = max(1, FRIDAY_VECTOR_RERANK)
+        self.train_rows = FRIDAY_VECTOR_PQ_TRAIN_ROWS
+
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported memory format version in {meta_path}: {meta.get('version')}")
+            self.dim = meta["dim"]
+        else:
+            # compression is fixed when the store is created (memory.migrate can convert)
+            self.dim = dim or len(self.embedding_function.embed_query(SEED_TEXT))
+            meta = {"dim": self.dim, "version": FORMAT_VERSION,
+                    "compression": compression or FRIDAY_VECTOR_COMPRESSION, "pq_m": FRIDAY_VECTOR_PQ_M}
+            # validate before anything is written
+            load_codec(meta["compression"], self.path, self.dim, meta["pq_m"])
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+        self.compression = meta.get("compression", "none")
+        self.codec = load_codec(self.compression, self.path, self.dim, meta.get("pq_m", FRIDAY_VECTOR_PQ_M))
+
+        with open(self._file("sessions.json"), "a+") as f:
+            f.seek(0)
+            self._session_ids = json.loads(f.read() or "[]")
+        self._session_codes = {sid: i for i, sid in enumerate(self._session_ids)}
+
+        self._docs = open(self._file("docs.jsonl"), "a+b")
+        self._count = self._complete_rows()
+        self._truncate_partial_rows()
+        self._coded = self._truncate_partial_codes()
+        self._exact = None
+        if self.codec is not None:
+            # shortlisted rows are read from here, so vectors.f32 is never mapped for a search
+            self._exact = open(self._file("vectors.f32"), "rb")
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(self._exact.fileno(), 0, 0, os.POSIX_FADV_RANDOM)
+        if self._count == 0 and seed:
+            self.add_texts([SEED_TEXT], [{"timestamp": 0.0}])
+
+    # ── files ──────────────────────────────────────
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _rows_in(self, column: str) -> int:
+        filename, dtype = self.COLUMNS[column]
+        width = self.dim if column == "vectors" else 1
+        path = self._file(filename)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        return size // (np.dtype(dtype).itemsize * width)
+
+    def _complete_rows(self) -> int:
+        return min(self._rows_in(column) for column in self.COLUMNS)
+
+    def _truncate_partial_rows(self):
+        # drop the tail of an interrupted append so new rows stay aligned
+        for column, (filename, dtype) in self.COLUMNS.items():
+            width = self.dim if column == "vectors" else 1
+            path = self._file(filename)
+            expected = self._count * np.dtype(dtype).itemsize * width
+            if not os.path.exists(path):
+                open(path, "wb").close()
+            elif os.path.getsize(path) > expected:
+                os.truncate(path, expected)
+
+    def _truncate_partial_codes(self) -> int:
+        """Number of rows with codes, after dropping partial or orphaned ones."""
+        if self.codec is None:
+            return 0
+        path = self._file(self.codec.filename)
+        row_bytes = np.dtype(self.codec.dtype).itemsize * self.codec.width
+        if not os.path.exists(path) or not self.codec.trained:
+            open(path, "wb").close()
+            return 0
+        rows = min(self._count, os.path.getsize(path) // row_bytes)
+        if os.path.getsize(path) > rows * row_bytes:
+            os.truncate(path, rows * row_bytes)
+        return rows
+
+    def _codes(self) -> Optional[np.ndarray]:
+        """Read-only memory map of the rows that have codes."""
+        cached = self._maps.get("codes")
+        if cached is not None and len(cached) == self._coded:
+            return cached
+        if self._coded == 0:
+            return None
+        mapped = np.memmap(self._file(self.codec.filename), dtype=self.codec.dtype, mode="r",
+                           shape=(self._coded, self.codec.width))
+        self._maps["codes"] = mapped
+        return mapped
+
+    def _column(self, column: str) -> np.ndarray:
+        """Read-only memory map of the first `count` rows of a column."""
+        cached = self._maps.get(column)
+        if cached is not None and len(cached) == self._count:
+            return cached
+        filename, dtype = self.COLUMNS[column]
+        if self._count == 0:
+            return np.empty((0, self.dim) if column == "vectors" else 0, dtype=dtype)
+        shape = (self._count, self.dim) if column == "vectors" else (self._count,)
+        mapped = np.memmap(self._file(filename), dtype=dtype, mode="r", shape=shape)
+        self._maps[column] = mapped
+        return mapped
+
+    # ── writes ─────────────────────────────────────
+    def _session_code(self, session_id) -> int:
+        if session_id is None:
+            return -1
+        if session_id not in self._session_codes:
+            self._session_codes[session_id] = len(self._session_ids)
+            self._session_ids.append(session_id)
+            with open(self._file("sessions.json"), "w") as f:
+                json.dump(self._session_ids, f)
+        return self._session_codes[session_id]
+
+    def add_embeddings(self, texts: list, embeddings, metadatas: Optional[list] = None,
+                       persist: bool = True) -> list:
+        """Append pre-computed embeddings (used by add_texts, ingestion and migration).
+
+        A ``_id`` metadata entry, if present, is used as the document id.
+        """
+        metadatas = clean_metadata(metadatas, len(texts))
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(texts), self.dim)
+        ids = [m.pop("_id", None) or uuid.uuid4().hex for m in metadatas]
+
+        with self._lock:
+            self._docs.seek(0, os.SEEK_END)
+            offsets = []
+            lines = []
+            position = self._docs.tell()
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                line = (json.dumps({"id": doc_id, "text": text, "metadata": metadata}) + "\n").encode("utf-8")
+                offsets.append(position)
+                position += len(line)
+                lines.append(line)
+            self._docs.write(b"".join(lines))
+            self._docs.flush()
+
+            columns = {
+                "offsets": np.asarray(offsets, dtype=np.uint64),
+                "timestamps": np.asarray([m.get("timestamp", 0.0) for m in metadatas], dtype=np.float64),
+                "sessions": np.asarray([self._session_code(m.get("session_id")) for m in metadatas], dtype=np.int32),
+                # vectors last: a row only counts once every column has it
+                "vectors": vectors,
+            }
+            for column, values in columns.items():
+                with open(self._file(self.COLUMNS[column][0]), "ab") as f:
+                    f.write(values.tobytes())
+                    if persist:
+                        f.flush()
+                        os.fsync(f.fileno())
+            self._count += len(texts)
+            self._encode_pending(persist)
+        return ids
+
+    def _encode_pending(self, persist: bool = True):
+        """Write codes for rows that have none yet, training PQ first once there are enough rows."""
+        if self.codec is None or self._coded >= self._count:
+            return
+        if not self.codec.trained:
+            if self._count < self.train_rows:
+                return
+            self._train()
+        vectors = self._column("vectors")
+        with open(self._file(self.codec.filename), "ab") as f:
+            for start in range(self._coded, self._count, SEARCH_BLOCK_ROWS):
+                stop = min(self._count, start + SEARCH_BLOCK_ROWS)
+                f.write(self.codec.encode(vectors[start:stop]).tobytes())
+            if persist:
+                f.flush()
+                os.fsync(f.fileno())
+        self._coded = self._count
+
+    def _train(self):
+        start = time.perf_counter()
+        vectors = self._column("vectors")
+        sample = np.linspace(0, self._count - 1, min(self._count, PQ_TRAIN_SAMPLE)).astype(np.int64)
+        self.codec.train(vectors[np.unique(sample)])
+        self.codec.save(self.path)
+        print(f"[Memory] Trained {self.codec.m}-byte PQ codes on {len(sample)} vectors "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def add_texts(self, texts, metadatas=None, persist=True):
+        embeddings = self.embedding_function.embed_documents(list(texts))
+        return self.add_embeddings(texts, embeddings, metadatas, persist)
+
+    def persist(self):
+        with self._lock:
+            self._docs.flush()
+            os.fsync(self._docs.fileno())
+
+    def close(self):
+        """Release the open docstore file and column maps."""
+        with self._lock:
+            self._docs.close()
+            if self._exact is not None:
+                self._exact.close()
+            self._maps.clear()
+
+    # ── reads ──────────────────────────────────────
+    def document(self, row: int) -> Document:
+        """Read one document from docs.jsonl via the offset index."""
+        with self._lock:
+            self._docs.seek(int(self._column("offsets")[row]))
+            record = json.loads(self._docs.readline())
+        return Document(id=record["id"], page_content=record["text"], metadata=record["metadata"])
+
+    def _eligible(self, session_id, since, until) -> Optional[np.ndarray]:
+        """Boolean mask of rows passing the filters, or None for no filter."""
+        if session_id is None and since is None and until is None:
+            return None
+        mask = np.ones(self._count, dtype=bool)
+        if since is not None:
+            mask &= self._column("timestamps") >= since
+        if until is not None:
+            mask &= self._column("timestamps") <= until
+        if session_id is not None:
+            code = self._session_codes.get(session_id)
+            if code is None:
+                return np.zeros(self._count, dtype=bool)
+            mask &= self._column("sessions") == code
+        return mask
+
+    def _exact_rows(self, rows: np.ndarray) -> np.ndarray:
+        """Exact vectors of a few (sorted) rows, read directly from vectors.f32."""
+        row_bytes = self.dim * 4
+        out = np.empty((len(rows), self.dim), dtype=np.float32)
+        with self._lock:
+            for i, row in enumerate(rows):
+                self._exact.seek(int(row) * row_bytes)
+                out[i] = np.frombuffer(self._exact.read(row_bytes), dtype=np.float32)
+        return out
+
+    def _scan(self, matrix, best, k: int, mask: Optional[np.ndarray], start: int = 0,
+              block_rows: int = SEARCH_BLOCK_ROWS) -> tuple:
+        """Rows and distances of the k best rows of `matrix` from `start` on, block by block
+        (`best(block, k)` is a codec's ``nearest``)."""
+        best_rows = np.empty(0, dtype=np.int64)
+        best_dist = np.empty(0, dtype=np.float32)
+        for block_start in range(start, len(matrix), block_rows):
+            stop = min(len(matrix), block_start + block_rows)
+            rows = np.arange(block_start, stop)
+            if mask is not None:
+                rows = rows[mask[block_start:stop]]
+                if len(rows) == 0:
+                    continue
+                block = matrix[rows]
+            else:
+                block = matrix[block_start:stop]
+            positions, distances = best(block, k)
+            best_rows = np.concatenate([best_rows, rows[positions]])
+            best_dist = np.concatenate([best_dist, distances.astype(np.float32)])
+            if len(best_rows) > k:
+                keep = np.argpartition(best_dist, k)[:k]
+                best_rows, best_dist = best_rows[keep], best_dist[keep]
+        return best_rows, best_dist
+
+    def search_vector(self, query_vector, k: int = 3, session_id=None, since=None, until=None) -> list:
+        """Top-k ``(row, squared L2 distance)`` for a query vector."""
+        with self._lock:
+            codes = self._codes() if self.codec is not None else None
+            vectors = self._column("vectors") if codes is None or len(codes) < self._count else None
+            mask = self._eligible(session_id, since, until)
+        exact = exact_distance(query_vector)
+
+        if codes is None:
+            best_rows, best_dist = self._scan(vectors, nearest(exact), k, mask)
+        else:
+            # shortlist from the codes, re-ranked with the exact vectors of those rows only
+            shortlist, _ = self._scan(codes, self.codec.nearest(query_vector), k * self.rerank, mask,
+                                      block_rows=CODE_BLOCK_ROWS)
+            best_rows = np.sort(shortlist)
+            best_dist = exact(self._exact_rows(best_rows)).astype(np.float32)
+            if vectors is not None:
+                # rows written since the codes were (usually none) are scanned exactly
+                tail_rows, tail_dist = self._scan(vectors, nearest(exact), k, mask, start=len(codes))
+                best_rows = np.concatenate([best_rows, tail_rows])
+                best_dist = np.concatenate([best_dist, tail_dist])
+
+        order = np.argsort(best_dist)[:k]
+        return [(int(best_rows[i]), float(max(0.0, best_dist[i]))) for i in order]
+
+    def search(self, query, k=3, session_id=None, since=None, until=None):
+        return self.search_by_vector(self.embedding_function.embed_query(query), k, session_id, since, until)
+
+    def search_by_vector(self, vector, k=3, session_id=None, since=None, until=None):
+        hits = self.search_vector(vector, k, session_id, since, until)
+        return [(self.document(row), distance) for row, distance in hits]
+
+    def as_retriever(self, k: int = 3):
+        return RunnableLambda(lambda query: [doc for doc, _ in self.search(query, k)])
+
+    def count(self):
+        return self._count
+
+    def position(self):
+        return self._count
+
+    def ids_after(self, position) -> set:
+        # rows are appended in order, so these are the last count - position lines
+        return {self.document(row).id for row in range(position or 0, self._count)}
@@ -0,0 +1,212 @@
+"""Durable chat session store on SQLite (WAL mode).
+
+Holds sessions, their messages and per-message metadata so transcripts
+survive restarts. Appends are buffered and written in batches; history is
+read back lazily one page at a time through the (session_id, seq) primary
+key, so resuming a session costs the same no matter how long it is.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+
+from config import (
+    FRIDAY_SESSION_DB,
+    FRIDAY_SESSION_BATCH_SIZE,
+    FRIDAY_SESSION_FLUSH_SECONDS,
+    FRIDAY_SESSION_RETENTION_DAYS,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id            TEXT PRIMARY KEY,
+    title         TEXT,
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_by_updated ON sessions (updated_at);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq        INTEGER NOT NULL,
+    role       TEXT NOT NULL,
+    content    TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    metadata   TEXT,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SessionStore:
+    """SQLite-backed sessions + messages with batched writes and paged reads."""
+
+    def __init__(self, path: str = FRIDAY_SESSION_DB, batch_size: int = FRIDAY_SESSION_BATCH_SIZE,
+                 flush_seconds: float = FRIDAY_SESSION_FLUSH_SECONDS,
+                 retention_days: float = FRIDAY_SESSION_RETENTION_DAYS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.retention_days = retention_days
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._pending = []       # message rows not yet written
+        self._counts = {}        # session_id -> next seq (includes pending rows)
+        self._last_flush = time.monotonic()
+
+    # ── sessions ───────────────────────────────────
+    def create_session(self, title: Optional[str] = None) -> str:
+        """Start a new, empty session and return its id."""
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (id, title, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (session_id, title, now, now),
+            )
+            self._counts[session_id] = 0
+        return session_id
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id in self._counts:
+                return True
+            row = self._conn.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            return row is not None
+
+    def latest_session(self) -> Optional[str]:
+        """Id of the most recently active session with messages, or None.
+
+        Sessions that were started but never written to (a launch without a
+        single turn) are skipped, so they don't shadow the last real conversation.
+        """
+        self.flush()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM sessions WHERE message_count > 0 ORDER BY updated_at DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def message_count(self, session_id: str) -> int:
+        with self._lock:
+            if session_id not in self._counts:
+                row = self._conn.execute(
+                    "SELECT message_count FROM sessions WHERE id = ?", (session_id,)
+                ).fetchone()
+                self._counts[session_id] = row[0] if row else 0
+            return self._counts[session_id]
+
+    # ── messages ───────────────────────────────────
+    def append(self, session_id: str, role: str, content: str, metadata: Optional[dict] = None) -> int:
+        """Queue a message for writing and return its sequence number."""
+        with self._lock:
+            seq = self.message_count(session_id)
+            self._counts[session_id] = seq + 1
+            self._pending.append((
+                session_id, seq, role, content, time.time(),
+                json.dumps(metadata) if metadata else None,
+            ))
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_seconds)
+        if due:
+            self.flush()
+        return seq
+
+    def flush(self):
+        """Write all queued messages in one transaction."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            rows, self._pending = self._pending, []
+            latest = {}
+            for row in rows:
+                latest[row[0]] = (row[4], row[1] + 1)
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO messages (session_id, seq, role, content, created_at, metadata) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.executemany(
+                    "UPDATE sessions SET updated_at = ?, message_count = MAX(message_count, ?) WHERE id = ?",
+                    [(ts, count, sid) for sid, (ts, count) in latest.items()],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                self._pending = rows + self._pending
+                raise
+
+    def load_page(self, session_id: str, before_seq: Optional[int] = None, limit: int = 50) -> list:
+        """Return up to `limit` messages older than `before_seq` (newest page by default),
+        oldest first, as dicts with role, content, seq, created_at and metadata."""
+        self.flush()
+        if before_seq is None:
+            before_seq = self.message_count(session_id)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, role, content, created_at, metadata FROM messages "
+                "WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+                (session_id, before_seq, limit),
+            ).fetchall()
+        return [
+            {"role": role, "content": content, "seq": seq, "created_at": created_at,
+             "metadata": json.loads(metadata) if metadata else {}}
+            for seq, role, content, created_at, metadata in reversed(rows)
+        ]
+
+    # ── housekeeping ───────────────────────────────
+    def prune(self) -> int:
+        """Delete sessions idle for longer than the retention period. Returns how many."""
+        if not self.retention_days:
+            return 0
+        self.flush()
+        cutoff = time.time() - self.retention_days * 86400
+        with self._lock:
+            expired = [r[0] for r in self._conn.execute(
+                "SELECT id FROM sessions WHERE updated_at < ?", (cutoff,)
+            )]
+            if expired:
+                self._conn.execute("BEGIN")
+                self._conn.executemany("DELETE FROM messages WHERE session_id = ?", [(s,) for s in expired])
+                self._conn.executemany("DELETE FROM sessions WHERE id = ?", [(s,) for s in expired])
+                self._conn.execute("COMMIT")
+                for s in expired:
+                    self._counts.pop(s, None)
+        if expired:
+            print(f"[Sessions] Pruned {len(expired)} sessions older than {self.retention_days} days.")
+        return len(expired)
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store (pruned once on first use)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore()
+            _store.prune()
+            atexit.register(_store.close)
+        return _store
@@ -0,0 +1,368 @@
+"""Time-partitioned long-term memory (``FRIDAY_VECTOR_BACKEND=sharded``).
+
+Memories are split into one store per calendar month (UTC) of their
+timestamp::
+
+    memory_shards/
+        shards.json        {"format": "faiss", "shards": {"2026-10": {"count", "first", "last", "format"}}}
+        2026-09/           an archived (mmap) store
+        2026-10/           a hot store in FRIDAY_MEMORY_SHARD_FORMAT
+
+The newest ``FRIDAY_MEMORY_HOT_SHARDS`` months are hot: they use
+``FRIDAY_MEMORY_SHARD_FORMAT`` (faiss by default), are loaded at startup and
+stay resident. When a month drops out of the hot set it is archived once to
+the pickle-free mmap format (memory/mmap_store.py), which opens without
+reading the vectors, so startup cost no longer grows with the whole history.
+New mmap shards and archives use FRIDAY_VECTOR_COMPRESSION (memory/compression.py).
+Archived months are opened on demand; at most ``FRIDAY_MEMORY_COLD_SHARDS``
+stay open (least recently used first out, closed once no search uses them).
+
+A search embeds the query once, skips months outside its ``since``/``until``
+window using the timestamp ranges in shards.json, runs on the remaining
+shards in parallel and merges their top-k by distance. Without a ``since`` a
+search covers every month, unless ``FRIDAY_MEMORY_SEARCH_MONTHS`` is set: it
+then searches the newest months first and only opens the older ones when
+fewer than k hits are within ``FRIDAY_MEMORY_WIDEN_DISTANCE``, so everyday
+lookups skip the archive without ever losing old memories. Writes only touch (and, for FAISS, only re-save) the month they
+belong to.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from langchain_core.runnables import RunnableLambda
+
+from config import (
+    FRIDAY_MEMORY_SHARD_FORMAT,
+    FRIDAY_MEMORY_HOT_SHARDS,
+    FRIDAY_MEMORY_COLD_SHARDS,
+    FRIDAY_MEMORY_SEARCH_MONTHS,
+    FRIDAY_MEMORY_SHARD_WORKERS,
+    FRIDAY_MEMORY_WIDEN_DISTANCE,
+)
+from memory.mmap_store import MmapBackend
+from memory.vector_backends import FAISSBackend, VectorBackend, clean_metadata
+
+SHARD_FORMATS = {"faiss": FAISSBackend, "mmap": MmapBackend}
+
+
+def shard_key(timestamp: float) -> str:
+    """The month ("YYYY-MM", UTC) a memory with this timestamp belongs to."""
+    return time.strftime("%Y-%m", time.gmtime(max(0.0, timestamp or 0.0)))
+
+
+class ShardedBackend(VectorBackend):
+    """Monthly shards: hot ones resident, older ones archived and opened on demand."""
+
+    name = "sharded"
+    default_path = "./memory_shards"
+
+    def __init__(self, embedding_function, path: Optional[str] = None, shard_format: Optional[str] = None,
+                 hot_shards: int = FRIDAY_MEMORY_HOT_SHARDS, cold_shards: int = FRIDAY_MEMORY_COLD_SHARDS,
+                 workers: int = FRIDAY_MEMORY_SHARD_WORKERS, compression: Optional[str] = None,
+                 search_months: int = FRIDAY_MEMORY_SEARCH_MONTHS,
+                 widen_distance: float = FRIDAY_MEMORY_WIDEN_DISTANCE):
+        super().__init__(embedding_function, path)
+        os.makedirs(self.path, exist_ok=True)
+        self.hot_shards = max(1, hot_shards)
+        # vector compression of mmap shards created from now on (None: FRIDAY_VECTOR_COMPRESSION)
+        self.compression = compression
+        # the shard just opened always stays, so the caller can use it
+        self.cold_shards = max(1, cold_shards)
+        self.search_months = max(0, search_months)
+        self.widen_distance = widen_distance
+        self.widened = 0
+        self._lock = threading.RLock()
+        self._cold = OrderedDict()
+        self._dirty = set()
+        self._holds = {}     # id(shard) -> searches still reading it
+        self._closing = {}   # id(shard) -> evicted shard, closed when its last search ends
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="friday-shard")
+        self.cold_loads = 0
+        self.archived = 0
+
+        manifest = self._read_manifest()
+        self.shard_format = manifest.get("format") or (shard_format or FRIDAY_MEMORY_SHARD_FORMAT)
+        if self.shard_format not in SHARD_FORMATS:
+            raise ValueError(f"Unknown shard format '{self.shard_format}'. Choose one of: {', '.join(SHARD_FORMATS)}")
+        self.shards = manifest.get("shards", {})
+        hot = self._hot_keys()
+        self._hot = dict(zip(hot, self._pool.map(self._open, hot)))
+        # the manifest is written with every add; rows a faiss shard never saved are gone
+        stale = [key for key, shard in self._hot.items() if shard.count() != self.shards[key]["count"]]
+        for key in stale:
+            self.shards[key]["count"] = self._hot[key].count()
+        if stale:
+            self._write_manifest()
+
+    # ── manifest ───────────────────────────────────
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, "shards.json")
+
+    def _read_manifest(self) -> dict:
+        if not os.path.exists(self._manifest_path()):
+            return {}
+        with open(self._manifest_path()) as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"format": self.shard_format, "shards": self.shards}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self._manifest_path())
+
+    # ── shard loading ──────────────────────────────
+    def _hot_keys(self) -> list:
+        return sorted(self.shards)[-self.hot_shards:]
+
+    def _open(self, key: str, dim: Optional[int] = None) -> VectorBackend:
+        # shards start empty: no seed document, `dim` comes from the first rows
+        shard_format = self.shards[key]["format"]
+        path = os.path.join(self.path, key)
+        if shard_format == "mmap":
+            return MmapBackend(self.embedding_function, path, dim=dim, seed=False, compression=self.compression)
+        return SHARD_FORMATS[shard_format](self.embedding_function, path, dim=dim, seed=False)
+
+    def _evict(self):
+        while len(self._cold) > self.cold_shards:
+            key, shard = self._cold.popitem(last=False)
+            if key in self._dirty:
+                shard.persist()
+                self._dirty.discard(key)
+            if self._holds.get(id(shard)):
+                self._closing[id(shard)] = shard
+            else:
+                self._close(shard)
+
+    @staticmethod
+    def _close(shard: VectorBackend):
+        # mmap shards hold open files and maps; faiss shards are plain memory
+        if hasattr(shard, "close"):
+            shard.close()
+
+    def _hold(self, shards):
+        for shard in shards:
+            self._holds[id(shard)] = self._holds.get(id(shard), 0) + 1
+
+    def _release(self, shards):
+        """End a search's use of `shards`, closing those evicted in the meantime."""
+        with self._lock:
+            for shard in shards:
+                self._holds[id(shard)] -= 1
+                if not self._holds[id(shard)]:
+                    del self._holds[id(shard)]
+                    if id(shard) in self._closing:
+                        self._close(self._closing.pop(id(shard)))
+
+    def _loaded(self, key: str) -> Optional[VectorBackend]:
+        if key in self._hot:
+            return self._hot[key]
+        if key in self._cold:
+            self._cold.move_to_end(key)
+            return self._cold[key]
+        return None
+
+    def _register(self, key: str, shard: VectorBackend) -> VectorBackend:
+        """Keep a freshly opened shard (hot, or in the cold LRU); returns the one to use."""
+        with self._lock:
+            existing = self._loaded(key)
+            if existing is not None:
+                # another search opened it first
+                self._close(shard)
+                return existing
+            if key in self._hot_keys():
+                self._hot[key] = shard
+            else:
+                self.cold_loads += 1
+                self._cold[key] = shard
+                self._evict()
+            return shard
+
+    def _shard(self, key: str, dim: Optional[int] = None) -> VectorBackend:
+        """Return the loaded shard for `key`, loading (or creating) it if needed."""
+        with self._lock:
+            return self._loaded(key) or self._register(key, self._open(key, dim))
+
+    def _load_many(self, keys: list) -> dict:
+        """Loaded shards for `keys`; missing ones are opened in parallel, outside the lock.
+
+        The shards are held until ``_release``, so eviction doesn't close them mid-search.
+        """
+        with self._lock:
+            shards = {key: self._loaded(key) for key in keys}
+            self._hold(shard for shard in shards.values() if shard is not None)
+        missing = [key for key, shard in shards.items() if shard is None]
+        for key, shard in zip(missing, self._pool.map(self._open, missing)):
+            with self._lock:
+                shards[key] = self._register(key, shard)
+                self._hold([shards[key]])
+        return shards
+
+    # ── archiving ──────────────────────────────────
+    def _archive(self, key: str, shard: VectorBackend):
+        """Rewrite a month that left the hot set in the mmap format."""
+        if self.shards[key]["format"] == "mmap":
+            return
+        start = time.perf_counter()
+        store = shard.store
+        total = store.index.ntotal
+        vectors = store.index.reconstruct_n(0, total)
+        texts, metadatas = [], []
+        for i in range(total):
+            doc_id = store.index_to_docstore_id[i]
+            doc = store.docstore.search(doc_id)
+            texts.append(doc.page_content)
+            metadatas.append({**doc.metadata, "_id": doc_id})
+
+        shard_path = os.path.join(self.path, key)
+        staging, retired = shard_path + ".archiving", shard_path + ".retired"
+        shutil.rmtree(staging, ignore_errors=True)
+        archive = MmapBackend(self.embedding_function, staging, dim=store.index.d, seed=False,
+                              compression=self.compression)
+        archive.add_embeddings(texts, vectors, metadatas, persist=True)
+        archive.close()
+        # swap directories, then record the new format (an unsaved shard has no directory yet)
+        if os.path.exists(shard_path):
+            os.replace(shard_path, retired)
+        os.replace(staging, shard_path)
+        self.shards[key]["format"] = "mmap"
+        self._write_manifest()
+        shutil.rmtree(retired, ignore_errors=True)
+        self._dirty.discard(key)
+        self.archived += 1
+        print(f"[Memory] Archived shard {key} ({total} memories) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def _rebalance(self):
+        """After a new month appears, archive the months that are no longer among the newest."""
+        hot = set(self._hot_keys())
+        for key in [k for k in self._hot if k not in hot]:
+            self._archive(key, self._hot.pop(key))
+
+    # ── writes ─────────────────────────────────────
+    def add_embeddings(self, texts: list, embeddings, metadatas: Optional[list] = None,
+                       persist: bool = True) -> list:
+        """Store rows in the shard of their timestamp's month (creating it if new)."""
+        metadatas = clean_metadata(metadatas, len(texts))
+        groups = {}
+        for i, metadata in enumerate(metadatas):
+            groups.setdefault(shard_key(metadata.get("timestamp", 0.0)), []).append(i)
+
+        ids = [None] * len(texts)
+        with self._lock:
+            for key, rows in sorted(groups.items()):
+                if key not in self.shards:
+                    # months older than the hot set (bulk ingestion) are created archived
+                    newest = self._hot_keys()
+                    hot = len(newest) < self.hot_shards or key > newest[0]
+                    self.shards[key] = {"count": 0, "first": None, "last": None,
+                                        "format": self.shard_format if hot else "mmap"}
+                    self._rebalance()
+                shard = self._shard(key, dim=len(embeddings[rows[0]]))
+                rows_meta = [metadatas[i] for i in rows]
+                if self.shards[key]["format"] == "faiss":
+                    for m in rows_meta:
+                        m.pop("_id", None)
+                shard_ids = shard.add_embeddings([texts[i] for i in rows], [embeddings[i] for i in rows],
+                                                 rows_meta, persist=persist)
+                for i, doc_id in zip(rows, shard_ids):
+                    ids[i] = doc_id
+                if not persist:
+                    self._dirty.add(key)
+                stamps = [m.get("timestamp", 0.0) for m in rows_meta]
+                info = self.shards[key]
+                info["count"] += len(rows)
+                info["first"] = min(stamps + ([info["first"]] if info["first"] is not None else []))
+                info["last"] = max(stamps + ([info["last"]] if info["last"] is not None else []))
+            self._write_manifest()
+        return ids
+
+    def add_texts(self, texts, metadatas=None, persist=True):
+        embeddings = self.embedding_function.embed_documents(list(texts))
+        return self.add_embeddings(texts, embeddings, metadatas, persist)
+
+    def persist(self):
+        with self._lock:
+            loaded = {**self._cold, **self._hot}
+            for key in list(self._dirty):
+                if key in loaded:
+                    loaded[key].persist()
+            self._dirty.clear()
+            self._write_manifest()
+
+    # ── reads ──────────────────────────────────────
+    def _overlapping(self, since, until) -> list:
+        with self._lock:
+            return [key for key, info in self.shards.items()
+                    if info["count"] and (since is None or info["last"] >= since)
+                    and (until is None or info["first"] <= until)]
+
+    def search_by_vector(self, vector, k=3, session_id=None, since=None, until=None):
+        keys = sorted(self._overlapping(since, until))
+        if since is None and self.search_months and len(keys) > self.search_months:
+            # newest months first; the archive only when they lack k close hits
+            older, keys = keys[:-self.search_months], keys[-self.search_months:]
+            hits = self._search_keys(keys, vector, k, session_id, since, until)
+            if sum(distance <= self.widen_distance for _, distance in hits) >= k:
+                return hits
+            self.widened += 1
+            hits += self._search_keys(older, vector, k, session_id, since, until)
+            return sorted(hits, key=lambda hit: hit[1])[:k]
+        return self._search_keys(keys, vector, k, session_id, since, until)
+
+    def _search_keys(self, keys: list, vector, k, session_id, since, until) -> list:
+        shards = self._load_many(keys)
+        try:
+            return self._search_shards(shards, vector, k, session_id, since, until)
+        finally:
+            self._release(shards.values())
+
+    def _search_shards(self, shards: dict, vector, k, session_id, since, until) -> list:
+        def search_shard(key):
+            info, shard = self.shards[key], shards[key]
+            # a window covering the whole shard needs no per-row time filter
+            lower = since if since is not None and info["first"] < since else None
+            upper = until if until is not None and info["last"] > until else None
+            if isinstance(shard, MmapBackend):
+                # rows only: documents are read for the merged top-k alone
+                return [(distance, key, row) for row, distance in
+                        shard.search_vector(vector, k, session_id, lower, upper)]
+            return [(distance, key, doc) for doc, distance in
+                    shard.search_by_vector(vector, k, session_id, lower, upper)]
+
+        hits = sorted((hit for shard_hits in self._pool.map(search_shard, shards) for hit in shard_hits),
+                      key=lambda hit: hit[0])[:k]
+        return [(shards[key].document(found) if isinstance(found, int) else found, distance)
+                for distance, key, found in hits]
+
+    def search(self, query, k=3, session_id=None, since=None, until=None):
+        return self.search_by_vector(self.embedding_function.embed_query(query), k, session_id, since, until)
+
+    def as_retriever(self, k: int = 3):
+        return RunnableLambda(lambda query: [doc for doc, _ in self.search(query, k)])
+
+    def count(self):
+        return sum(info["count"] for info in self.shards.values())
+
+    def position(self):
+        with self._lock:
+            return {key: info["count"] for key, info in self.shards.items()}
+
+    def ids_after(self, position) -> set:
+        # only mmap shards write through; unsaved faiss rows are lost with the process
+        position = position or {}
+        with self._lock:
+            keys = [key for key, info in self.shards.items()
+                    if info["format"] == "mmap" and info["count"] > position.get(key, 0)]
+            return {doc_id for key in keys for doc_id in self._shard(key).ids_after(position.get(key, 0))}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"shards": len(self.shards), "hot": sorted(self._hot), "cold_open": list(self._cold),
+                    "cold_loads": self.cold_loads, "archived": self.archived, "widened": self.widened,
+                    "memories": self.count()}
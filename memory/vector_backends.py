@@ -0,0 +1,291 @@
+"""Interchangeable vector store backends for long-term memory.
+
+``FRIDAY_VECTOR_BACKEND`` picks one:
+
+* ``faiss``  — LangChain's FAISS wrapper; every write re-saves the whole
+  index + docstore under ``./faiss_db`` (the original behaviour).
+* ``chroma`` — persistent Chroma collection under ``./chroma_db``; writes are
+  incremental upserts, nothing is rewritten.
+* ``mmap``   — pickle-free native format under ``./memory_db`` with
+  memory-mapped vectors and an on-demand docstore (memory/mmap_store.py),
+  optionally searched through fp16 or PQ codes (memory/compression.py).
+* ``sharded`` — one faiss or mmap store per month under ``./memory_shards``;
+  only recent months are loaded up front (memory/sharded_store.py).
+
+Backends wrap a LangChain ``VectorStore`` (exposed as ``.store``) and add a
+``search`` that can restrict candidates to one session and/or a time window
+*before* the vector scan, using the metadata saved with every memory.
+"""
+
+import os
+import uuid
+from typing import Optional
+
+from langchain_core.documents import Document
+
+from config import FRIDAY_VECTOR_BACKEND, FRIDAY_VECTOR_PATH
+
+SEED_TEXT = "Friday AI Assistant initialized"
+
+
+def clean_metadata(metadatas: Optional[list], n: int) -> list:
+    """One metadata dict per text, without None values (Chroma rejects them)."""
+    metadatas = metadatas or [{} for _ in range(n)]
+    return [{k: v for k, v in (m or {}).items() if v is not None} for m in metadatas]
+
+
+class VectorBackend:
+    """Interface shared by every long-term memory backend."""
+
+    name = "base"
+    default_path = None
+
+    def __init__(self, embedding_function, path: Optional[str] = None):
+        self.embedding_function = embedding_function
+        self.path = path or self.default_path
+        self.store = None
+
+    def add_texts(self, texts: list, metadatas: Optional[list] = None, persist: bool = True) -> list:
+        """Embed and store `texts` (persisting unless told not to). Returns their ids."""
+        raise NotImplementedError
+
+    def add_embeddings(self, texts: list, embeddings, metadatas: Optional[list] = None,
+                       persist: bool = True) -> list:
+        """Store texts with pre-computed embeddings (bulk ingestion, migration)."""
+        raise NotImplementedError
+
+    def persist(self):
+        """Flush pending writes to disk (no-op for backends that write through)."""
+
+    def search(self, query: str, k: int = 3, session_id: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None) -> list:
+        """Return up to k ``(Document, distance)`` pairs, optionally limited to a
+        session and a ``[since, until]`` timestamp window."""
+        def keep(metadata):
+            ts = metadata.get("timestamp", 0.0)
+            return ((session_id is None or metadata.get("session_id") == session_id)
+                    and (since is None or ts >= since) and (until is None or ts <= until))
+
+        if session_id is None and since is None and until is None:
+            return self.store.similarity_search_with_score(query, k=k)
+        return self.store.similarity_search_with_score(query, k=k, filter=keep, fetch_k=k * 20)
+
+    def search_by_vector(self, vector, k: int = 3, session_id: Optional[str] = None,
+                         since: Optional[float] = None, until: Optional[float] = None) -> list:
+        """Like search, for an already embedded query (used to fan one query out to shards)."""
+        raise NotImplementedError(f"The {self.name} backend cannot search by vector")
+
+    def as_retriever(self, k: int = 3):
+        return self.store.as_retriever(search_kwargs={"k": k})
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def position(self):
+        """Marker of the rows written so far, for ids_after(); None for backends
+        that only write on persist() (and so lose unsaved rows on a crash)."""
+        return None
+
+    def ids_after(self, position) -> set:
+        """Ids of the rows written since `position` (see memory/ingest.py)."""
+        return set()
+
+
+class FAISSBackend(VectorBackend):
+    """In-memory FAISS index persisted with whole-file saves.
+
+    Timestamps and session ids are mirrored into arrays aligned with the
+    index positions, so filters become a FAISS ID selector and excluded
+    vectors are never scored.
+    """
+
+    name = "faiss"
+    default_path = "./faiss_db"
+
+    def __init__(self, embedding_function, path: Optional[str] = None, dim: Optional[int] = None,
+                 seed: bool = True):
+        super().__init__(embedding_function, path)
+        from langchain_community.vectorstores import FAISS
+
+        # Load existing FAISS index if it exists, otherwise create a new one
+        if os.path.exists(os.path.join(self.path, "index.faiss")):
+            self.store = FAISS.load_local(
+                self.path,
+                self.embedding_function,
+                allow_dangerous_deserialization=True
+            )
+        elif seed:
+            # Create a new FAISS index with a dummy document
+            self.store = FAISS.from_texts([SEED_TEXT], self.embedding_function)
+        else:
+            import faiss
+            from langchain_community.docstore.in_memory import InMemoryDocstore
+
+            dim = dim or len(self.embedding_function.embed_query(SEED_TEXT))
+            self.store = FAISS(self.embedding_function, faiss.IndexFlatL2(dim), InMemoryDocstore(), {})
+
+        self._timestamps = []
+        self._sessions = []
+        for i in range(self.store.index.ntotal):
+            doc = self.store.docstore.search(self.store.index_to_docstore_id[i])
+            metadata = doc.metadata if isinstance(doc, Document) else {}
+            self._timestamps.append(metadata.get("timestamp", 0.0))
+            self._sessions.append(metadata.get("session_id"))
+
+    def add_texts(self, texts, metadatas=None, persist=True):
+        embeddings = self.embedding_function.embed_documents(list(texts))
+        return self.add_embeddings(texts, embeddings, metadatas, persist)
+
+    def add_embeddings(self, texts, embeddings, metadatas=None, persist=True):
+        metadatas = clean_metadata(metadatas, len(texts))
+        ids = [m.pop("_id", None) or uuid.uuid4().hex for m in metadatas]
+        ids = self.store.add_embeddings(list(zip(texts, embeddings)), metadatas=metadatas, ids=ids)
+        self._timestamps.extend(m.get("timestamp", 0.0) for m in metadatas)
+        self._sessions.extend(m.get("session_id") for m in metadatas)
+        if persist:
+            self.persist()
+        return ids
+
+    def persist(self):
+        # Save the updated FAISS index to disk
+        os.makedirs(self.path, exist_ok=True)
+        self.store.save_local(self.path)
+
+    def _selector(self, session_id, since, until):
+        import faiss
+        import numpy as np
+
+        mask = np.ones(len(self._timestamps), dtype=bool)
+        if since is not None or until is not None:
+            timestamps = np.asarray(self._timestamps, dtype=np.float64)
+            if since is not None:
+                mask &= timestamps >= since
+            if until is not None:
+                mask &= timestamps <= until
+        if session_id is not None:
+            mask &= np.asarray([s == session_id for s in self._sessions], dtype=bool)
+
+        eligible = np.flatnonzero(mask)
+        if len(eligible) == 0:
+            return None, 0
+        if eligible[-1] - eligible[0] + 1 == len(eligible):
+            # memories are appended in time order, so windows are usually contiguous
+            return faiss.IDSelectorRange(int(eligible[0]), int(eligible[-1]) + 1), len(eligible)
+        return faiss.IDSelectorBatch(eligible.astype("int64")), len(eligible)
+
+    def search(self, query, k=3, session_id=None, since=None, until=None):
+        return self.search_by_vector(self.embedding_function.embed_query(query), k, session_id, since, until)
+
+    def search_by_vector(self, vector, k=3, session_id=None, since=None, until=None):
+        if session_id is None and since is None and until is None:
+            return self.store.similarity_search_with_score_by_vector(list(vector), k=k)
+
+        import faiss
+        import numpy as np
+
+        selector, eligible = self._selector(session_id, since, until)
+        if selector is None:
+            return []
+        vector = np.asarray([vector], dtype=np.float32)
+        if self.store._normalize_L2:
+            faiss.normalize_L2(vector)
+        distances, indices = self.store.index.search(
+            vector, min(k, eligible), params=faiss.SearchParameters(sel=selector)
+        )
+        results = []
+        for distance, i in zip(distances[0], indices[0]):
+            if i == -1:
+                continue
+            doc = self.store.docstore.search(self.store.index_to_docstore_id[int(i)])
+            results.append((doc, float(distance)))
+        return results
+
+    def count(self):
+        return self.store.index.ntotal
+
+
+class ChromaBackend(VectorBackend):
+    """Persistent Chroma collection with incremental upserts."""
+
+    name = "chroma"
+    default_path = "./chroma_db"
+    collection_name = "friday_memory"
+
+    def __init__(self, embedding_function, path: Optional[str] = None):
+        super().__init__(embedding_function, path)
+        try:
+            from langchain_chroma import Chroma
+        except ImportError:
+            try:
+                from langchain_community.vectorstores import Chroma
+            except ImportError as e:
+                raise ImportError(
+                    "The chroma backend needs `pip install langchain-chroma`"
+                ) from e
+
+        self.store = Chroma(
+            collection_name=self.collection_name,
+            embedding_function=self.embedding_function,
+            persist_directory=self.path,
+        )
+        if self.count() == 0:
+            self.add_texts([SEED_TEXT], [{"timestamp": 0.0}])
+
+    def add_texts(self, texts, metadatas=None, persist=True):
+        # Chroma writes each upsert straight to its SQLite store — no full save
+        ids = [uuid.uuid4().hex for _ in texts]
+        metadatas = [m or {"timestamp": 0.0} for m in clean_metadata(metadatas, len(texts))]
+        return self.store.add_texts(texts, metadatas=metadatas, ids=ids)
+
+    def add_embeddings(self, texts, embeddings, metadatas=None, persist=True):
+        # a ``_id`` metadata entry is used as the id, so re-adding a row overwrites it
+        metadatas = clean_metadata(metadatas, len(texts))
+        ids = [m.pop("_id", None) or uuid.uuid4().hex for m in metadatas]
+        metadatas = [m or {"timestamp": 0.0} for m in metadatas]
+        self.store._collection.upsert(
+            ids=ids, embeddings=[list(map(float, e)) for e in embeddings],
+            metadatas=metadatas, documents=list(texts),
+        )
+        return ids
+
+    def search(self, query, k=3, session_id=None, since=None, until=None):
+        # Chroma applies `where` to the metadata index before the vector search
+        clauses = []
+        if session_id is not None:
+            clauses.append({"session_id": session_id})
+        if since is not None:
+            clauses.append({"timestamp": {"$gte": since}})
+        if until is not None:
+            clauses.append({"timestamp": {"$lte": until}})
+        where = None
+        if len(clauses) == 1:
+            where = clauses[0]
+        elif clauses:
+            where = {"$and": clauses}
+        return self.store.similarity_search_with_score(query, k=k, filter=where)
+
+    def count(self):
+        return self.store._collection.count()
+
+
+BACKENDS = {
+    FAISSBackend.name: FAISSBackend,
+    ChromaBackend.name: ChromaBackend,
+}
+
+
+def _register_lazy_backends():
+    # imported lazily: these modules subclass VectorBackend from this module
+    from memory.mmap_store import MmapBackend
+    from memory.sharded_store import ShardedBackend
+    BACKENDS.setdefault(MmapBackend.name, MmapBackend)
+    BACKENDS.setdefault(ShardedBackend.name, ShardedBackend)
+
+
+def create_backend(embedding_function, name: Optional[str] = None, path: Optional[str] = None) -> VectorBackend:
+    """Instantiate the configured (or named) backend."""
+    _register_lazy_backends()
+    name = (name or FRIDAY_VECTOR_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown vector backend '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name](embedding_function, path or FRIDAY_VECTOR_PATH or None)
@@ -0,0 +1,366 @@
+"""Friday AI — headless HTTP/WebSocket server entry point.
+
+Loads the LLM clients, MemoryManager and both agents once and serves them to
+any number of front ends from a single warm process:
+
+    POST /chat       {"message": "...", "session_id": "..."} -> full reply
+    WS   /ws         send {"message": "..."}; receive streamed tokens
+    GET  /health     readiness of each dependency (503 until all are ready)
+    GET  /metrics    request counters, latency percentiles, in-flight turns
+
+Each session (an HTTP ``session_id`` or a WebSocket connection) gets its own
+short-term chat history; long-term vector memory is shared.
+
+The models, memory and agents load in the background after startup; until
+they are ready /health reports "starting" and requests get a 503.
+
+Run with:  python server.py
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from agents.fast_path import FastPath
+from agents.friday_agent import create_friday_agent
+from agents.tool_selector import get_tool_selector
+from config import (
+    GOOGLE_API_KEY,
+    FRIDAY_SERVER_HOST,
+    FRIDAY_SERVER_PORT,
+    FRIDAY_SERVER_MAX_CONCURRENT,
+    FRIDAY_SERVER_QUEUE_TIMEOUT,
+    FRIDAY_SERVER_MAX_SESSIONS,
+    FRIDAY_FAST_PATH,
+)
+from core.llm_engine import get_flash_llm, get_pro_llm
+from core.adaptive_router import get_router, observe
+from core.cassette import get_cassette
+from core.key_pool import get_key_pool
+from core.prompt_cache import get_prompt_cache
+from core.scheduler import SchedulerRejected, get_scheduler
+from core.warmup import get_warmup
+from memory.memory_manager import MemoryManager, SimpleConversationalMemory
+from ui.context import abuild_agent_input
+from ui.router import aroute_query
+
+
+class SessionRegistry:
+    """LRU map of session_id -> SimpleConversationalMemory."""
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+
+    def get(self, session_id: str) -> SimpleConversationalMemory:
+        memory = self._sessions.pop(session_id, None) or SimpleConversationalMemory()
+        self._sessions[session_id] = memory
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return memory
+
+    def drop(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class Metrics:
+    """In-process request counters and a rolling latency window."""
+
+    def __init__(self, window: int = 1000):
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.by_model = {"standard": 0, "powerful": 0}
+        self.latencies = deque(maxlen=window)
+
+    def snapshot(self, sessions: int) -> dict:
+        ordered = sorted(self.latencies)
+        pct = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3) if ordered else None
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests_total": self.requests,
+            "errors_total": self.errors,
+            "rejected_total": self.rejected,
+            "in_flight": self.in_flight,
+            "max_concurrent": FRIDAY_SERVER_MAX_CONCURRENT,
+            "sessions": sessions,
+            "requests_by_model": self.by_model,
+            "latency_p50": pct(0.50),
+            "latency_p95": pct(0.95),
+            "latency_p99": pct(0.99),
+        }
+
+
+class Friday:
+    """The warm, shared state of the server process."""
+
+    def __init__(self):
+        print("[Server] Loading memory and LLM models...")
+        self.memory_manager = MemoryManager()
+        self.flash_llm = get_flash_llm()
+        self.pro_llm = get_pro_llm()
+        self.tool_selector = get_tool_selector(self.memory_manager.embedding_function)
+        self.agents = {
+            "standard": create_friday_agent(self.flash_llm, self.memory_manager.conversational_memory,
+                                            self.tool_selector),
+            "powerful": create_friday_agent(self.pro_llm, self.memory_manager.conversational_memory,
+                                            self.tool_selector),
+        }
+        self.fast_path = FastPath() if FRIDAY_FAST_PATH else None
+        self.warmup = get_warmup((self.flash_llm, self.pro_llm), self.memory_manager.embedding_function)
+        self.sessions = SessionRegistry(FRIDAY_SERVER_MAX_SESSIONS)
+        self.metrics = Metrics()
+        self.limiter = asyncio.Semaphore(FRIDAY_SERVER_MAX_CONCURRENT)
+        print("[Server] Friday is warm and ready.")
+
+    @asynccontextmanager
+    async def slot(self):
+        """Admit a turn if a concurrency slot frees up within the queue timeout."""
+        try:
+            await asyncio.wait_for(self.limiter.acquire(), FRIDAY_SERVER_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.metrics.rejected += 1
+            raise HTTPException(status_code=503, detail="Friday is busy, try again shortly.")
+        self.metrics.in_flight += 1
+        try:
+            yield
+        finally:
+            self.metrics.in_flight -= 1
+            self.limiter.release()
+
+    def readiness(self) -> dict:
+        """Per dependency: {"ready": bool, "detail": str}."""
+        checks = {}
+        missing = [name for name, agent in self.agents.items() if agent is None]
+        checks["agents"] = {"ready": not missing,
+                            "detail": f"missing: {', '.join(missing)}" if missing else ", ".join(self.agents)}
+        try:
+            checks["memory"] = {"ready": True, "detail": f"{self.memory_manager.backend.count()} memories"}
+        except Exception as e:
+            checks["memory"] = {"ready": False, "detail": f"vector store unusable: {e}"}
+        cassette, pool = get_cassette(), get_key_pool()
+        if cassette is not None and cassette.mode == "replay":
+            checks["llm"] = {"ready": True, "detail": "replaying a cassette"}
+        elif len(pool):
+            available = pool.available()
+            checks["llm"] = {"ready": available > 0, "detail": f"{available} of {len(pool)} API keys available"}
+        else:
+            ready = bool(GOOGLE_API_KEY or os.getenv("GOOGLE_API_KEY"))
+            checks["llm"] = {"ready": ready, "detail": "API key set" if ready else "no Gemini API key configured"}
+        return checks
+
+    async def fast(self, message: str) -> Optional[dict]:
+        """Run an unambiguous tool command directly (no LLM calls), else None."""
+        if self.fast_path is None:
+            return None
+        return await asyncio.to_thread(self.fast_path.handle, message)
+
+    async def prepare(self, message: str):
+        """Route and retrieve concurrently; returns (model, agent, agent_input)."""
+        chosen, agent_input = await asyncio.gather(
+            aroute_query(message, self.flash_llm),
+            abuild_agent_input(message, self.memory_manager),
+        )
+        self.metrics.by_model[chosen] += 1
+        return chosen, self.agents[chosen], agent_input
+
+    async def remember(self, memory: SimpleConversationalMemory, message: str, reply: str,
+                       session_id: str, model: str, tool: Optional[str] = None):
+        memory.save_context({"input": message}, {"output": reply})
+        await asyncio.to_thread(self.memory_manager.save_interaction, message, reply,
+                                session_id=session_id, tool=tool, model=model)
+
+
+friday = None
+load_error = None
+
+
+async def load_friday():
+    """Load the shared state off the event loop, so /health answers while it warms up."""
+    global friday, load_error
+    try:
+        friday = await asyncio.to_thread(Friday)
+    except Exception as e:
+        load_error = f"{type(e).__name__}: {e}"
+        print(f"[Server] Friday failed to load: {load_error}")
+
+
+def warm() -> Friday:
+    """The loaded shared state; 503 while it is still loading (or failed to)."""
+    if friday is None:
+        raise HTTPException(status_code=503, detail=load_error or "Friday is still starting, try again shortly.",
+                            headers={"Retry-After": "5"})
+    return friday
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loading = asyncio.create_task(load_friday())
+    yield
+    loading.cancel()
+
+
+app = FastAPI(title="Friday AI", lifespan=lifespan)
+
+
+class ChatRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    warm()
+    session_id = request.session_id or uuid.uuid4().hex
+    memory = friday.sessions.get(session_id)
+    async with friday.slot():
+        start = time.perf_counter()
+        friday.metrics.requests += 1
+        try:
+            response, chosen = await friday.fast(request.message), "fast_path"
+            if response is None:
+                chosen, agent, agent_input = await friday.prepare(request.message)
+                history = memory.load_memory_variables({})["chat_history"]
+                agent_start = time.perf_counter()
+                try:
+                    response = await agent.ainvoke({"input": agent_input, "chat_history": list(history)})
+                except Exception:
+                    observe(chosen, request.message, time.perf_counter() - agent_start, ok=False)
+                    raise
+                observe(chosen, request.message, time.perf_counter() - agent_start)
+                if friday.fast_path:
+                    friday.fast_path.record_fallback(time.perf_counter() - start)
+        except SchedulerRejected as e:
+            friday.metrics.rejected += 1
+            raise HTTPException(status_code=503, detail=str(e),
+                                headers={"Retry-After": str(max(1, round(e.retry_after)))})
+        except Exception as e:
+            friday.metrics.errors += 1
+            raise HTTPException(status_code=500, detail=f"Sorry, something went wrong: {e}")
+        latency = time.perf_counter() - start
+        friday.metrics.latencies.append(latency)
+
+    reply = response["output"]
+    await friday.remember(memory, request.message, reply, session_id, chosen, response.get("tool"))
+    return {"session_id": session_id, "response": reply, "model": chosen, "latency": round(latency, 3)}
+
+
+@app.websocket("/ws")
+async def chat_stream(websocket: WebSocket):
+    await websocket.accept()
+    if friday is None:
+        await websocket.send_json({"type": "error", "error": load_error or "Friday is still starting, try again shortly."})
+        # 1013: try again later
+        await websocket.close(code=1013)
+        return
+    if friday.warmup:
+        # a client connecting is about to send a message
+        friday.warmup.trigger("connect")
+    # without an explicit session_id the history lives only as long as the connection
+    ephemeral = "session_id" not in websocket.query_params
+    session_id = websocket.query_params.get("session_id") or uuid.uuid4().hex
+    memory = friday.sessions.get(session_id)
+    await websocket.send_json({"type": "session", "session_id": session_id})
+
+    try:
+        while True:
+            data = await websocket.receive_json()
+            message = (data.get("message") or "").strip()
+            if not message:
+                continue
+            try:
+                async with friday.slot():
+                    start = time.perf_counter()
+                    friday.metrics.requests += 1
+                    fast = await friday.fast(message)
+                    if fast is not None:
+                        chosen, parts = "fast_path", [fast["output"]]
+                        await websocket.send_json({"type": "model", "model": chosen})
+                        await websocket.send_json({"type": "token", "text": fast["output"]})
+                    else:
+                        chosen, agent, agent_input = await friday.prepare(message)
+                        await websocket.send_json({"type": "model", "model": chosen})
+                        history = memory.load_memory_variables({})["chat_history"]
+                        parts = []
+                        agent_start = time.perf_counter()
+                        try:
+                            async for text in agent.astream({"input": agent_input, "chat_history": list(history)}):
+                                parts.append(text)
+                                await websocket.send_json({"type": "token", "text": text})
+                        except Exception:
+                            observe(chosen, message, time.perf_counter() - agent_start, ok=False)
+                            raise
+                        observe(chosen, message, time.perf_counter() - agent_start)
+                        if friday.fast_path:
+                            friday.fast_path.record_fallback(time.perf_counter() - start)
+                    latency = time.perf_counter() - start
+                    friday.metrics.latencies.append(latency)
+            except HTTPException as e:
+                await websocket.send_json({"type": "error", "error": e.detail})
+                continue
+            except SchedulerRejected as e:
+                friday.metrics.rejected += 1
+                await websocket.send_json({"type": "error", "error": str(e), "retry_after": round(e.retry_after, 1)})
+                continue
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                friday.metrics.errors += 1
+                await websocket.send_json({"type": "error", "error": f"Sorry, something went wrong: {e}"})
+                continue
+
+            reply = "".join(parts).strip()
+            await websocket.send_json({"type": "done", "latency": round(latency, 3)})
+            await friday.remember(memory, message, reply, session_id, chosen, fast["tool"] if fast else None)
+    except WebSocketDisconnect:
+        if ephemeral:
+            friday.sessions.drop(session_id)
+
+
+@app.get("/health")
+async def health():
+    if friday is None:
+        status = "failed" if load_error else "starting"
+        return JSONResponse({"status": status, "error": load_error}, status_code=503)
+    checks = await asyncio.to_thread(friday.readiness)
+    ready = all(check["ready"] for check in checks.values())
+    return JSONResponse({"status": "ok" if ready else "degraded", "checks": checks},
+                        status_code=200 if ready else 503)
+
+
+@app.get("/metrics")
+async def metrics():
+    warm()
+    snapshot = friday.metrics.snapshot(len(friday.sessions))
+    if friday.fast_path:
+        snapshot["fast_path"] = friday.fast_path.stats()
+    if get_scheduler():
+        snapshot["scheduler"] = get_scheduler().stats()
+    if get_router():
+        snapshot["routing"] = get_router().stats()
+    if friday.tool_selector:
+        snapshot["tool_preselect"] = friday.tool_selector.stats()
+    if get_prompt_cache():
+        snapshot["prompt_cache"] = get_prompt_cache().stats()
+    if friday.warmup:
+        snapshot["warmup"] = friday.warmup.stats()
+    return snapshot
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=FRIDAY_SERVER_HOST, port=FRIDAY_SERVER_PORT)
@@ -1,12 +1,16 @@
 """Friday AI — Streamlit frontend entry point."""
 
+import time
+
 import streamlit as st
+from config import FRIDAY_FAST_PATH
 from ui.styles import inject_css
-from ui.state import init_state, append_message, clear_history
-from ui.loader import load_llms, load_memory_manager, load_agents
+from ui.state import init_state, append_message, clear_history, load_earlier, unloaded_count, PAGE_SIZE
+from ui.loader import load_llms, load_memory_manager, load_agents, load_fast_path, load_warmup
 from ui.router import route_query
+from core.adaptive_router import observe
 from ui.context import build_agent_input, save_interaction
-from ui.chat import render_message, stream_response, show_thinking_indicator
+from ui.chat import render_message, render_history, stream_response, show_thinking_indicator
 
 # ── Page config (must be first st call) ─────────
 st.set_page_config(
@@ -24,6 +28,13 @@ init_state()
 flash_llm, pro_llm = load_llms()
 memory_manager = load_memory_manager()
 flash_agent, pro_agent = load_agents(flash_llm, pro_llm, memory_manager)
+fast_path = load_fast_path() if FRIDAY_FAST_PATH else None
+
+# every run (page load, a click, a sent message) precedes the user typing the
+# next query: warm connections and the embedding model in the meantime
+warmup = load_warmup(flash_llm, pro_llm, memory_manager)
+if warmup:
+    warmup.trigger("page")
 
 # ── Sidebar ─────────────────────────────────────
 with st.sidebar:
@@ -56,8 +67,10 @@ with st.sidebar:
         )
 
 # ── Render existing chat history ────────────────
-for msg in st.session_state.messages:
-    render_message(msg["role"], msg["content"])
+# Full reruns draw a page of history; everything after `live_start` belongs
+# to the chat fragment below, which reruns on its own for each new turn.
+st.session_state.live_start = len(st.session_state.messages)
+render_history(st.session_state.messages, st.session_state.history_window, load_earlier, unloaded_count())
 
 # ── Empty-state hero (when no messages yet) ─────
 STARTER_PROMPTS = [
@@ -92,15 +105,32 @@ if not st.session_state.messages:
                 st.session_state["_prefill"] = prompt
                 st.rerun()
 
-# ── Check for prefill from starter chip ─────────
-prefill = st.session_state.pop("_prefill", None)
+# ── Active turn (fragment) ──────────────────────
+@st.fragment
+def chat_turn():
+    """Draw turns since the last full rerun and handle new input.
+
+    Submitting here reruns only this fragment, so old messages, the CSS and
+    the sidebar are not re-processed.
+    """
+    messages = st.session_state.messages
+    for msg in messages[st.session_state.live_start:]:
+        render_message(msg["role"], msg["content"])
 
-# ── Chat input ──────────────────────────────────
-user_input = prefill or st.chat_input("Ask Friday anything…")
+    # ── Check for prefill from starter chip ─────────
+    prefill = st.session_state.pop("_prefill", None)
+
+    # ── Chat input ──────────────────────────────────
+    user_input = prefill or st.chat_input("Ask Friday anything…")
+    if not user_input:
+        return
 
-if user_input:
     # strip emoji prefix from starter chips if present
     clean_input = user_input.split(" ", 1)[-1] if user_input[0] not in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ" and " " in user_input else user_input
+    shown_model = st.session_state.last_model
+
+    # this browser session's previous request, for tool preselection on follow-ups
+    previous = next((m["content"] for m in reversed(messages) if m["role"] == "user"), None)
 
     # show user message immediately
     append_message("user", clean_input)
@@ -110,14 +140,28 @@ if user_input:
     thinking = show_thinking_indicator()
 
     try:
-        # route to correct model
-        chosen = route_query(clean_input, flash_llm)
-        active_agent = pro_agent if chosen == "powerful" else flash_agent
-        st.session_state.last_model = chosen
-
-        # build context-enriched input and get response
-        agent_input = build_agent_input(clean_input, memory_manager)
-        response = active_agent.invoke({"input": agent_input})
+        # unambiguous tool commands skip both LLM calls
+        response = fast_path.handle(clean_input) if fast_path else None
+        if response is not None:
+            chosen = "fast_path"
+        else:
+            turn_start = time.perf_counter()
+            # route to correct model
+            chosen = route_query(clean_input, flash_llm)
+            active_agent = pro_agent if chosen == "powerful" else flash_agent
+            st.session_state.last_model = chosen
+
+            # build context-enriched input and get response
+            agent_input = build_agent_input(clean_input, memory_manager)
+            agent_start = time.perf_counter()
+            try:
+                response = active_agent.invoke({"input": agent_input, "previous": previous})
+            except Exception:
+                observe(chosen, clean_input, time.perf_counter() - agent_start, ok=False)
+                raise
+            observe(chosen, clean_input, time.perf_counter() - agent_start)
+            if fast_path:
+                fast_path.record_fallback(time.perf_counter() - turn_start)
         response_text = response["output"]
 
         # clear thinking indicator
@@ -125,13 +169,25 @@ if user_input:
 
         # stream the response
         stream_response(response_text)
-        append_message("assistant", response_text)
+        append_message("assistant", response_text, {"model": chosen})
 
         # persist to memory
-        save_interaction(clean_input, response_text, memory_manager)
+        save_interaction(
+            clean_input, response_text, memory_manager,
+            session_id=st.session_state.session_id, tool=response.get("tool"), model=chosen,
+        )
 
     except Exception as e:
         thinking.empty()
         error_msg = f"Sorry, something went wrong: {e}"
         render_message("assistant", error_msg)
         append_message("assistant", error_msg)
+
+    # Things outside the fragment (empty-state hero, sidebar badge) or a live
+    # area that has outgrown one page need a full rerun to catch up.
+    live = len(st.session_state.messages) - st.session_state.live_start
+    if st.session_state.live_start == 0 or shown_model != st.session_state.last_model or live > PAGE_SIZE:
+        st.rerun(scope="app")
+
+
+chat_turn()
@@ -0,0 +1 @@
+"""Unit tests and the offline test doubles (tests/fakes.py) shared with the benchmarks."""
@@ -0,0 +1,176 @@
+"""Offline stand-ins for the Gemini chat models, for tests, benchmarks and dry runs.
+
+``FakeChatModel`` behaves like a tool-bound chat model: it answers the router
+prompt with 'standard'/'powerful', emits a tool call for obvious tool
+requests (weather, play/pause music, open a website) when tools are bound,
+and otherwise replies with a short canned answer — all after a fixed
+simulated latency. ``fake_tools`` supplies matching stand-ins for the tools,
+so dry runs never open a browser or touch Spotify.
+
+With ``prefill_per_1k`` the latency also grows with the prompt (system
+prompt, history and tool schemas, ~4 characters per token), and
+``FakeCacheBackend`` stands in for Gemini cached contents: a call made with
+``cached_content`` skips the prefill of the cached prefix and reports it as
+``cache_read`` tokens in its usage metadata (core/prompt_cache.py).
+"""
+
+import asyncio
+import json
+import re
+import time
+from typing import Any, Optional
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, SystemMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.tools import Tool
+
+from core.cassette import to_messages
+from core.prompt_cache import estimate_tokens
+
+POWERFUL_MARKERS = ("explain in detail", "in depth", "comprehensive", "break it down", "step by step")
+
+
+def _tool_call(name: str, arg: str) -> dict:
+    return {"name": name, "args": {"__arg1": arg}, "id": f"fake-{name.lower()}"}
+
+
+class FakeAPIError(RuntimeError):
+    """Error carrying a status code and status, like google.genai's ``APIError``."""
+
+    def __init__(self, code: int, status: str, message: str):
+        super().__init__(f"{code} {status}. {message}")
+        self.code = code
+        self.status = status
+
+
+class FakeCacheBackend:
+    """In-memory stand-in for Gemini cached contents."""
+
+    account = "fake"
+
+    def __init__(self, clock=time.monotonic, fail: bool = False):
+        self.clock = clock
+        self.fail = fail
+        self.entries = {}
+
+    def create(self, system: str, tools: tuple, ttl: float) -> str:
+        if self.fail:
+            raise FakeAPIError(400, "INVALID_ARGUMENT", "caching is not supported for this model")
+        name = f"cachedContents/fake-{len(self.entries)}"
+        self.entries[name] = {"tokens": estimate_tokens(system, tools),
+                              "tools": tuple(t.name for t in tools), "expires": self.clock() + ttl}
+        return name
+
+    def renew(self, name: str, ttl: float):
+        self.get(name)["expires"] = self.clock() + ttl
+
+    def get(self, name: str) -> dict:
+        entry = self.entries.get(name)
+        if entry is None or self.clock() >= entry["expires"]:
+            raise FakeAPIError(404, "NOT_FOUND", f"CachedContent not found: {name}")
+        return entry
+
+
+class FakeChatModel(Runnable[LanguageModelInput, BaseMessage]):
+    """Deterministic chat model with a simulated response latency."""
+
+    def __init__(self, latency: float = 1.0, model: str = "fake", tools: tuple = (),
+                 prefill_per_1k: float = 0.0, caches: Optional[FakeCacheBackend] = None, tool_tokens: int = 0):
+        self.latency = latency
+        self.model = model
+        self.tools = tools
+        self.prefill_per_1k = prefill_per_1k
+        self.caches = caches
+        self.tool_tokens = tool_tokens
+        self.calls = 0
+
+    def bind_tools(self, tools, **kwargs):
+        names = tuple(getattr(t, "name", str(t)) for t in tools)
+        return FakeChatModel(self.latency, self.model, names, self.prefill_per_1k, self.caches,
+                             estimate_tokens("", tools))
+
+    def _prefill(self, input: LanguageModelInput, cached_content: Optional[str]) -> tuple:
+        """(simulated latency, usage metadata, tool names) for a request."""
+        messages = to_messages(input)
+        system = "\n\n".join(str(m.content) for m in messages if isinstance(m, SystemMessage))
+        rest = sum(len(str(m.content)) for m in messages if not isinstance(m, SystemMessage)) // 4
+        tokens, cached, tools = estimate_tokens(system) + self.tool_tokens + rest, 0, self.tools
+        if cached_content:
+            entry = self.caches.get(cached_content)
+            cached, tools = entry["tokens"], entry["tools"]
+            tokens += cached
+        usage = {"input_tokens": tokens, "output_tokens": 20, "total_tokens": tokens + 20,
+                 "input_token_details": {"cache_read": cached}}
+        return self.latency + self.prefill_per_1k * (tokens - cached) / 1000, usage, tools
+
+    def _respond(self, input: LanguageModelInput, tools: tuple = None) -> AIMessage:
+        self.calls += 1
+        tools = self.tools if tools is None else tools
+        messages = to_messages(input)
+        text = str(messages[-1].content) if messages else ""
+        query = text.rsplit("User's current query:", 1)[-1].strip().lower()
+
+        if "Respond with only the single word" in text:
+            routed = re.search(r'User Query: "(.*)"', text, re.DOTALL)
+            query = routed.group(1).lower() if routed else query
+            decision = "powerful" if any(m in query for m in POWERFUL_MARKERS) else "standard"
+            return AIMessage(content=decision)
+
+        if tools:
+            weather = re.search(r"weather(?: like)?(?: in| at| for)? ([a-z ]+)", query)
+            if "Weather" in tools and "weather" in query:
+                city = weather.group(1).strip() if weather else "auto"
+                return AIMessage(content="", tool_calls=[_tool_call("Weather", city)])
+            if "SpotifyPauser" in tools and re.search(r"\b(pause|stop) (the )?music\b", query):
+                return AIMessage(content="", tool_calls=[_tool_call("SpotifyPauser", "")])
+            play = re.match(r"play (.+)", query)
+            if "SpotifyPlayer" in tools and play:
+                return AIMessage(content="", tool_calls=[_tool_call("SpotifyPlayer", play.group(1))])
+            site = re.match(r"open (\S+\.\S+)", query)
+            if "WebsiteOpener" in tools and site:
+                return AIMessage(content="", tool_calls=[_tool_call("WebsiteOpener", site.group(1))])
+
+        return AIMessage(content=f"Sure thing, Boss! ({self.model} answering: {query[:60]})")
+
+    def invoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+               cached_content: Optional[str] = None, **kwargs: Any) -> BaseMessage:
+        delay, usage, tools = self._prefill(input, cached_content)
+        time.sleep(delay)
+        message = self._respond(input, tools)
+        message.usage_metadata = usage
+        return message
+
+    async def ainvoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      cached_content: Optional[str] = None, **kwargs: Any) -> BaseMessage:
+        delay, usage, tools = self._prefill(input, cached_content)
+        await asyncio.sleep(delay)
+        message = self._respond(input, tools)
+        message.usage_metadata = usage
+        return message
+
+    async def astream(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any):
+        message = await self.ainvoke(input, config, **kwargs)
+        if message.tool_calls:
+            yield AIMessageChunk(content="", tool_call_chunks=[
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                for i, c in enumerate(message.tool_calls)
+            ])
+            return
+        words = message.content.split(" ")
+        for i, word in enumerate(words):
+            yield AIMessageChunk(content=word + (" " if i < len(words) - 1 else ""))
+
+
+def fake_tools(latency: float = 0.0) -> list:
+    """Offline stand-ins for Friday's tools (same names), each taking `latency` seconds."""
+    from tools.custom_tools import all_tools
+
+    def make(name):
+        def run(arg=""):
+            time.sleep(latency)
+            return f"{name} done ({arg})"
+        return run
+
+    return [Tool(name=t.name, func=make(t.name), description=t.description) for t in all_tools]
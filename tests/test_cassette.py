@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from core.cassette import Cassette, CassetteChatModel, CassetteMiss, _redact, _redact_body
+from tests.fakes import FakeChatModel
+
+
+@pytest.fixture(params=["session.jsonl", "session.jsonl.gz"])
+def path(request, tmp_path):
+    return str(tmp_path / request.param)
+
+
+def record_session(path, prompts):
+    cassette = Cassette(path, "record")
+    model = CassetteChatModel(FakeChatModel(0.0, "flash"), "flash", cassette)
+    answers = [model.invoke(prompt) for prompt in prompts]
+    cassette.close()
+    return answers
+
+
+def test_recorded_answers_replay_without_the_model(path):
+    answers = record_session(path, ["tell me a joke", "what time is it"])
+    replay = CassetteChatModel(None, "flash", Cassette(path, "replay", latency="zero"))
+    assert replay.invoke("what time is it").content == answers[1].content
+    assert asyncio.run(replay.ainvoke("tell me a joke")).content == answers[0].content
+    with pytest.raises(CassetteMiss):
+        replay.invoke("tell me a joke")
+
+
+def test_drifted_requests_replay_the_next_unused_recording(path):
+    answers = record_session(path, ["first question", "second question"])
+    replay = CassetteChatModel(None, "flash", Cassette(path, "replay", latency="zero"))
+    assert replay.invoke("something else entirely").content == answers[0].content
+    # the exact match for the first prompt is used up, so it also gets the next one in order
+    assert replay.invoke("first question").content == answers[1].content
+
+
+def test_tool_calls_round_trip(tmp_path):
+    path = str(tmp_path / "tools.jsonl")
+    cassette = Cassette(path, "record")
+    cassette.record("llm", "k", {}, {"type": "ai", "data": AIMessage(
+        content="", tool_calls=[{"name": "Weather", "args": {"location": "mumbai"}, "id": "1"}]).model_dump()}, 0.5)
+    cassette.close()
+
+    entry = Cassette(path, "replay").replay("llm", "k")
+    assert entry["latency"] == 0.5
+    assert entry["response"]["data"]["tool_calls"][0]["args"] == {"location": "mumbai"}
+
+
+def test_unknown_mode_is_rejected(path):
+    with pytest.raises(ValueError):
+        Cassette(path, "rewind")
+
+
+def test_credentials_are_redacted():
+    assert _redact({"grant_type": "refresh_token", "refresh_token": "secret"}) == {
+        "grant_type": "refresh_token", "refresh_token": "REDACTED"}
+    assert _redact("grant_type=authorization_code&code=abc&redirect_uri=x") == (
+        "grant_type=authorization_code&code=REDACTED&redirect_uri=x")
+    assert _redact("q=weather+in+mumbai") == "q=weather+in+mumbai"
+    body = json.loads(_redact_body('{"access_token": "tok", "expires_in": 3600}'))
+    assert body == {"access_token": "REDACTED", "expires_in": 3600}
+    assert _redact_body("<html>not json</html>") == "<html>not json</html>"
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from memory.compression import Float16Codec, PQCodec, exact_distance, load_codec, nearest
+from memory.mmap_store import MmapBackend
+
+DIM = 32
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(2000, DIM)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def test_nearest_returns_the_k_smallest_distances(vectors):
+    positions, distances = nearest(exact_distance(vectors[7]))(vectors, 3)
+    assert positions[0] == 7 and distances[0] == pytest.approx(0.0, abs=1e-5)
+    assert list(distances) == sorted(distances)
+
+
+def test_fp16_codes_are_half_the_size_and_rank_alike(vectors):
+    codec = Float16Codec(DIM)
+    codes = codec.encode(vectors)
+    assert codes.dtype == np.float16 and codes.nbytes == vectors.nbytes // 2
+    exact, _ = nearest(exact_distance(vectors[0]))(vectors, 10)
+    approx, _ = codec.nearest(vectors[0])(codes, 10)
+    assert set(approx) == set(exact)
+
+
+def test_pq_codes_find_the_true_neighbour_in_a_shortlist(vectors, tmp_path):
+    codec = PQCodec(DIM, m=8)
+    assert not codec.trained
+    codec.train(vectors)
+    codes = codec.encode(vectors)
+    assert codes.shape == (len(vectors), 8) and codes.dtype == np.uint8
+
+    queries = vectors[:50] + 0.05
+    found = 0
+    for i, query in enumerate(queries):
+        shortlist, _ = codec.nearest(query)(codes, 20)
+        found += i in shortlist
+    assert found >= 45
+
+    codec.save(str(tmp_path))
+    reloaded = load_codec("pq", str(tmp_path), DIM, 8)
+    assert np.array_equal(reloaded.encode(vectors[:10]), codes[:10])
+
+
+def test_pq_needs_a_dimension_the_sub_quantizers_divide():
+    with pytest.raises(ValueError):
+        PQCodec(DIM, m=5)
+    with pytest.raises(ValueError):
+        load_codec("zip", ".", DIM, 8)
+
+
+def test_pq_store_searches_exactly_until_trained_then_reranks(tmp_path):
+    # 96 dimensions: two per sub-quantizer at the default FRIDAY_VECTOR_PQ_M
+    store = MmapBackend(DeterministicFakeEmbedding(size=96), path=str(tmp_path), seed=False, compression="pq")
+    store.train_rows = 300
+    texts = [f"memory number {i}" for i in range(400)]
+    store.add_texts(texts[:200])
+    assert not store.codec.trained and store.search(texts[42], k=1)[0][0].page_content == texts[42]
+
+    store.add_texts(texts[200:])
+    assert store.codec.trained and store._coded == 400
+    assert (tmp_path / "pq_codebooks.npy").exists()
+    for i in (3, 250, 399):
+        (doc, distance), = store.search(texts[i], k=1)
+        assert doc.page_content == texts[i] and distance == pytest.approx(0.0, abs=1e-4)
+    store.close()
@@ -0,0 +1,60 @@
+import pytest
+from langchain_core.tools import Tool
+
+from agents.fast_path import FastPath, match
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("pause the music", ("SpotifyPauser", "")),
+    ("Hey Friday, could you please stop the song now", ("SpotifyPauser", "")),
+    ("play bohemian rhapsody on spotify", ("SpotifyPlayer", "bohemian rhapsody")),
+    ("play the song shape of you", ("SpotifyPlayer", "shape of you")),
+    ("open github dot com", ("WebsiteOpener", "github.com")),
+    ("go to https://news.ycombinator.com/news", ("WebsiteOpener", "https://news.ycombinator.com/news")),
+    ("what's the weather in mumbai?", ("Weather", "mumbai")),
+    ("weather", ("Weather", "auto")),
+    ("how is the weather like in new delhi today", ("Weather", "new delhi")),
+])
+def test_unambiguous_commands_match(query, expected):
+    assert match(query) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "play some music",                        # vague: the agent picks
+    "play something relaxing",
+    "play it again",
+    "pause the music and open youtube.com",   # compound
+    "what's the weather in pune tomorrow",    # forecast, not current weather
+    "open notepad.exe",                       # a file, not a website
+    "open visual studio code",                # apps go through the agent
+    "tell me a joke",
+    "",
+])
+def test_anything_uncertain_goes_to_the_agent(query):
+    assert match(query) is None
+
+
+def test_fast_path_calls_the_tool_and_counts_hits():
+    calls = []
+    tools = [Tool(name="SpotifyPauser", func=lambda arg: calls.append(arg) or "paused", description="pause")]
+    fast_path = FastPath(tools)
+
+    assert fast_path.handle("pause the music") == {"output": "SpotifyPauser: paused", "tool": "SpotifyPauser"}
+    # matched, but the tool is not available here
+    assert fast_path.handle("open github.com") is None
+    assert fast_path.handle("tell me a joke") is None
+    fast_path.record_fallback(2.0)
+
+    stats = fast_path.stats()
+    assert calls == [""]
+    assert (stats["hits"], stats["turns"], stats["by_tool"]) == (1, 3, {"SpotifyPauser": 1})
+    assert stats["saved_seconds_estimate"] == pytest.approx(2.0, abs=0.1)
+
+
+def test_tool_errors_are_reported_not_raised():
+    def fail(arg):
+        raise RuntimeError("no active device")
+
+    fast_path = FastPath([Tool(name="SpotifyPlayer", func=fail, description="play")])
+    assert fast_path.handle("play yellow") == {"output": "SpotifyPlayer: error: no active device",
+                                              "tool": "SpotifyPlayer"}
@@ -0,0 +1,122 @@
+from collections import Counter
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from core.key_pool import (
+    KeyPool,
+    KeyPoolExhausted,
+    PooledChatModel,
+    is_rate_limit_error,
+    parse_keys,
+    parse_retry_after,
+)
+from tests.fakes import FakeAPIError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class KeyClient:
+    """Per-key client that answers with its key, or fails with `error`."""
+
+    def __init__(self, key, error=None):
+        self.key = key
+        self.error = error
+        self.calls = 0
+
+    def invoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return AIMessage(content=self.key)
+
+
+def test_parse_keys_weights_default_to_one():
+    assert parse_keys(" k1, k2:3 ,k3:x,,k4:0") == [("k1", 1), ("k2", 3), ("k3", 1), ("k4", 1)]
+    assert parse_keys("") == []
+
+
+def test_weighted_round_robin_follows_weights_smoothly():
+    pool = KeyPool([("a", 1), ("b", 3)], clock=Clock())
+    picks = [pool.try_acquire()[0] for _ in range(8)]
+    assert Counter(picks) == {"a": 2, "b": 6}
+    # smooth: the light key is spread out, not served in a block
+    assert picks[:4].count("a") == 1
+
+
+def test_rate_limited_key_is_skipped_until_its_cooldown_ends():
+    clock = Clock()
+    pool = KeyPool([("a", 1), ("b", 1)], cooldown_seconds=10, clock=clock)
+    pool.report_rate_limited("a")
+    assert {pool.try_acquire()[0] for _ in range(4)} == {"b"}
+    assert pool.available() == 1
+    clock.now = 10.0
+    assert "a" in {pool.try_acquire()[0] for _ in range(4)}
+
+
+def test_cooldown_backs_off_exponentially_and_resets_on_success():
+    clock = Clock()
+    pool = KeyPool([("a", 1)], cooldown_seconds=10, clock=clock)
+    for expected in (10, 20, 40):
+        pool.report_rate_limited("a")
+        assert pool.try_acquire() == (None, expected)
+    pool.report_success("a")
+    pool.report_rate_limited("a")
+    assert pool.try_acquire() == (None, 10)
+
+
+def test_server_retry_delay_overrides_the_backoff():
+    pool = KeyPool([("a", 1)], cooldown_seconds=10, clock=Clock())
+    pool.report_rate_limited("a", retry_after=3.5)
+    assert pool.try_acquire() == (None, 3.5)
+
+
+def test_rate_limits_are_detected_by_status_not_message():
+    assert is_rate_limit_error(FakeAPIError(429, "RESOURCE_EXHAUSTED", "quota exceeded"))
+    try:
+        try:
+            raise FakeAPIError(429, "RESOURCE_EXHAUSTED", "quota exceeded")
+        except FakeAPIError as e:
+            raise ValueError("wrapped by the client library") from e
+    except ValueError as wrapped:
+        assert is_rate_limit_error(wrapped)
+    assert not is_rate_limit_error(RuntimeError("429 quota exceeded"))
+    assert not is_rate_limit_error(FakeAPIError(400, "INVALID_ARGUMENT", "mentions 429 quota"))
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(RuntimeError("Please retry in 7.5s.")) == 7.5
+    assert parse_retry_after(RuntimeError("retry_delay { seconds: 12 }")) == 12
+    assert parse_retry_after(RuntimeError("try later")) is None
+
+
+def test_pooled_model_moves_to_the_next_key_on_a_429():
+    clients = {"a": KeyClient("a", FakeAPIError(429, "RESOURCE_EXHAUSTED", "quota")), "b": KeyClient("b")}
+    pool = KeyPool([("a", 1), ("b", 1)], clock=Clock())
+    model = PooledChatModel(clients.__getitem__, pool)
+    assert model.invoke("hi").content == "b"
+    assert model.invoke("hi").content == "b"
+    assert clients["a"].calls == 1
+    assert pool.stats()[0]["rate_limited"] == 1
+
+
+def test_pooled_model_raises_other_errors_without_a_cooldown():
+    pool = KeyPool([("a", 1), ("b", 1)], clock=Clock())
+    model = PooledChatModel(lambda key: KeyClient(key, FakeAPIError(500, "INTERNAL", "boom")), pool)
+    with pytest.raises(FakeAPIError):
+        model.invoke("hi")
+    assert pool.available() == 2
+
+
+def test_pooled_model_gives_up_when_every_key_cools_down_too_long():
+    pool = KeyPool([("a", 1)], cooldown_seconds=60, clock=Clock())
+    pool.report_rate_limited("a")
+    model = PooledChatModel(KeyClient, pool, max_wait=1)
+    with pytest.raises(KeyPoolExhausted):
+        model.invoke("hi")
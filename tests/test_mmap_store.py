@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.common import HashingEmbedding
+from memory.mmap_store import MmapBackend
+from memory.vector_backends import SEED_TEXT
+
+TEXTS = [
+    "User asked: what is the capital of france\nFriday responded: paris",
+    "User asked: play some jazz\nFriday responded: playing jazz on spotify",
+    "User asked: weather in mumbai\nFriday responded: 31 degrees and humid",
+    "User asked: remind me to buy milk\nFriday responded: noted, buy milk",
+]
+
+
+def open_store(path, **kwargs):
+    return MmapBackend(HashingEmbedding(64), path=str(path), **kwargs)
+
+
+@pytest.fixture
+def store(tmp_path):
+    backend = open_store(tmp_path, seed=False)
+    backend.add_texts(TEXTS, [{"timestamp": 100.0 * (i + 1), "session_id": f"s{i % 2}"} for i in range(len(TEXTS))])
+    yield backend
+    backend.close()
+
+
+def test_search_returns_the_nearest_documents_with_metadata(store):
+    (doc, distance), *_ = store.search("what's the weather in mumbai", k=2)
+    assert doc.page_content == TEXTS[2]
+    assert doc.metadata == {"timestamp": 300.0, "session_id": "s0"}
+    assert 0.0 <= distance < 2.0
+    assert store.count() == 4
+
+
+def test_session_and_time_filters(store):
+    assert [d.page_content for d, _ in store.search("jazz", k=4, session_id="s1")] == [TEXTS[1], TEXTS[3]]
+    assert store.search("jazz", k=4, session_id="unknown") == []
+    rows = [d.page_content for d, _ in store.search("milk", k=4, since=200.0, until=300.0)]
+    assert sorted(rows) == sorted(TEXTS[1:3])
+
+
+def test_store_reopens_with_its_documents_and_ids(store, tmp_path):
+    ids = store.ids_after(0)
+    store.close()
+    reopened = open_store(tmp_path)
+    try:
+        # an existing store is not seeded again
+        assert reopened.count() == 4
+        assert reopened.ids_after(0) == ids
+        assert reopened.search("capital of france", k=1)[0][0].page_content == TEXTS[0]
+    finally:
+        reopened.close()
+
+
+def test_new_store_is_seeded(tmp_path):
+    backend = open_store(tmp_path)
+    try:
+        assert backend.count() == 1
+        assert backend.document(0).page_content == SEED_TEXT
+    finally:
+        backend.close()
+
+
+def test_interrupted_append_is_dropped_on_open(store, tmp_path):
+    store.close()
+    # a crash after some columns were written, but before the vectors
+    with open(tmp_path / "timestamps.f64", "ab") as f:
+        f.write(np.float64(999.0).tobytes())
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(b"\0" * 10)
+
+    reopened = open_store(tmp_path)
+    try:
+        assert reopened.count() == 4
+        assert os.path.getsize(tmp_path / "timestamps.f64") == 4 * 8
+        reopened.add_texts(["User asked: ping\nFriday responded: pong"], [{"timestamp": 500.0}])
+        assert reopened.search("ping pong", k=1, since=500.0)[0][0].metadata == {"timestamp": 500.0}
+    finally:
+        reopened.close()
+
+
+def test_fp16_store_ranks_like_the_exact_one(tmp_path):
+    exact = open_store(tmp_path / "exact", seed=False)
+    compressed = open_store(tmp_path / "fp16", seed=False, compression="fp16")
+    try:
+        for backend in (exact, compressed):
+            backend.add_texts(TEXTS)
+        for query in ("paris france", "spotify jazz", "buy milk"):
+            assert ([d.page_content for d, _ in compressed.search(query, k=2)]
+                    == [d.page_content for d, _ in exact.search(query, k=2)])
+        assert os.path.getsize(tmp_path / "fp16" / "vectors.f16") == len(TEXTS) * 64 * 2
+    finally:
+        exact.close()
+        compressed.close()
+
+
+def test_unknown_compression_is_rejected_before_anything_is_written(tmp_path):
+    with pytest.raises(ValueError):
+        open_store(tmp_path, compression="zip")
+    assert not (tmp_path / "meta.json").exists()
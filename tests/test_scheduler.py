@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from core.scheduler import (
+    ScheduledChatModel,
+    SchedulerRejected,
+    TurnScheduler,
+    current_priority,
+    parse_limits,
+    priority,
+)
+from tests.fakes import FakeChatModel
+
+
+def test_parse_limits():
+    assert parse_limits("gemini-2.5-flash:8, gemini-2.5-pro:2") == {"gemini-2.5-flash": 8, "gemini-2.5-pro": 2}
+    assert parse_limits("voice:5,background:120", float) == {"voice": 5.0, "background": 120.0}
+    assert parse_limits("") == {}
+
+
+def test_priority_context_is_scoped_and_validated():
+    assert current_priority() == "interactive"
+    with priority("voice"):
+        assert current_priority() == "voice"
+    assert current_priority() == "interactive"
+    with pytest.raises(ValueError):
+        with priority("urgent"):
+            pass
+
+
+def test_calls_within_the_limit_are_admitted_at_once():
+    scheduler = TurnScheduler({"m": 2})
+    with scheduler.slot("m"), scheduler.slot("m"):
+        assert scheduler.stats()["m"]["in_flight"] == 2
+    stats = scheduler.stats()["m"]
+    assert stats["in_flight"] == 0
+    assert stats["by_priority"]["interactive"]["admitted"] == 2
+
+
+def test_queued_calls_are_served_by_priority_then_arrival():
+    async def run():
+        scheduler = TurnScheduler({"m": 1})
+        served = []
+
+        async def call(name, prio):
+            async with scheduler.aslot("m", prio):
+                served.append(name)
+
+        async with scheduler.aslot("m"):
+            tasks = [asyncio.create_task(call(name, prio)) for name, prio in
+                     (("bg1", "background"), ("chat", "interactive"), ("bg2", "background"), ("voice", "voice"))]
+            await asyncio.sleep(0.01)
+            assert scheduler.stats()["m"]["queued"] == 4
+        await asyncio.gather(*tasks)
+        return served
+
+    assert asyncio.run(run()) == ["voice", "chat", "bg1", "bg2"]
+
+
+def test_hopeless_calls_are_rejected_up_front():
+    clock = [0.0]
+    scheduler = TurnScheduler({"m": 1}, deadlines={"interactive": 5.0}, clock=lambda: clock[0])
+    # teach the lane that a call takes far longer than the deadline
+    for _ in range(30):
+        with scheduler.slot("m"):
+            clock[0] += 100.0
+    assert scheduler.stats()["m"]["avg_call_seconds"] > 5.0
+
+    async def run():
+        async with scheduler.aslot("m"):
+            with pytest.raises(SchedulerRejected) as rejected:
+                async with scheduler.aslot("m"):
+                    pass
+        return rejected.value
+
+    assert asyncio.run(run()).priority == "interactive"
+    assert scheduler.stats()["m"]["by_priority"]["interactive"]["rejected"] == 1
+
+
+def test_calls_still_queued_at_their_deadline_are_rejected():
+    scheduler = TurnScheduler({"m": 1}, deadlines={"interactive": 0.05})
+    scheduler._lane("m").service = 0.01
+
+    async def run():
+        async with scheduler.aslot("m"):
+            with pytest.raises(SchedulerRejected):
+                async with scheduler.aslot("m"):
+                    pass
+
+    asyncio.run(run())
+    stats = scheduler.stats()["m"]
+    assert stats["queued"] == 0 and stats["in_flight"] == 0
+
+
+def test_rejected_interactive_calls_fall_back_but_background_calls_fail():
+    scheduler = TurnScheduler({"pro": 1, "flash": 4}, deadlines={"interactive": 0.05, "background": 0.05})
+    flash = ScheduledChatModel(FakeChatModel(0.0, "flash"), "flash", scheduler)
+    pro = ScheduledChatModel(FakeChatModel(0.0, "pro"), "pro", scheduler, fallback=flash)
+
+    async def run():
+        async with scheduler.aslot("pro"):
+            answer = await pro.ainvoke("hello")
+            with priority("background"):
+                with pytest.raises(SchedulerRejected):
+                    await pro.ainvoke("hello")
+        return answer
+
+    assert "flash answering" in asyncio.run(run()).content
+    assert pro.fallbacks == 1
+    assert "pro answering" in pro.invoke("hello").content
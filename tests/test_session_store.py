@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from memory.session_store import SessionStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def test_messages_are_paged_back_oldest_first(db_path):
+    store = SessionStore(db_path, batch_size=4, flush_seconds=60)
+    session = store.create_session("chat")
+    for i in range(10):
+        assert store.append(session, "user" if i % 2 == 0 else "assistant", f"m{i}", {"i": i} if i == 9 else None) == i
+
+    newest = store.load_page(session, limit=4)
+    assert [m["content"] for m in newest] == ["m6", "m7", "m8", "m9"]
+    assert newest[-1]["metadata"] == {"i": 9} and newest[0]["metadata"] == {}
+    older = store.load_page(session, before_seq=newest[0]["seq"], limit=4)
+    assert [m["seq"] for m in older] == [2, 3, 4, 5]
+    assert [m["content"] for m in store.load_page(session, before_seq=2)] == ["m0", "m1"]
+    store.close()
+
+
+def test_buffered_appends_survive_close_and_reopen(db_path):
+    store = SessionStore(db_path, batch_size=100, flush_seconds=60)
+    first, second = store.create_session(), store.create_session()
+    store.append(first, "user", "hello")
+    store.append(second, "user", "hi")
+    store.append(second, "assistant", "hi there")
+    store.close()
+
+    reopened = SessionStore(db_path)
+    assert reopened.exists(first) and not reopened.exists("missing")
+    assert reopened.message_count(second) == 2
+    assert reopened.append(second, "user", "again") == 2
+    assert reopened.latest_session() == second
+    reopened.close()
+
+
+def test_latest_session_skips_empty_sessions(db_path):
+    store = SessionStore(db_path)
+    talked = store.create_session()
+    store.append(talked, "user", "hello")
+    store.create_session()
+    assert store.latest_session() == talked
+    store.close()
+
+
+def test_prune_removes_only_idle_sessions(db_path):
+    store = SessionStore(db_path, retention_days=1)
+    old, recent = store.create_session(), store.create_session()
+    store.append(old, "user", "long ago")
+    store.append(recent, "user", "today")
+    store.flush()
+    store._conn.execute("UPDATE sessions SET updated_at = ? WHERE id = ?", (time.time() - 2 * 86400, old))
+
+    assert store.prune() == 1
+    assert not store.exists(old) and store.exists(recent)
+    assert store.load_page(old) == []
+    store.close()
@@ -0,0 +1,91 @@
+import calendar
+import json
+
+import pytest
+
+from benchmarks.common import HashingEmbedding
+from memory.sharded_store import ShardedBackend, shard_key
+
+MONTHS = ["2026-01", "2026-02", "2026-03", "2026-04", "2026-05"]
+
+
+def stamp(month: str, day: int = 15) -> float:
+    year, mon = map(int, month.split("-"))
+    return float(calendar.timegm((year, mon, day, 12, 0, 0)))
+
+
+def open_store(path, **kwargs):
+    kwargs.setdefault("shard_format", "mmap")
+    kwargs.setdefault("hot_shards", 2)
+    kwargs.setdefault("cold_shards", 1)
+    kwargs.setdefault("search_months", 0)
+    return ShardedBackend(HashingEmbedding(64), path=str(path), **kwargs)
+
+
+def fill(store):
+    for month in MONTHS:
+        store.add_texts([f"User asked: what happened in {month}\nFriday responded: notes for {month}",
+                         f"User asked: grocery list {month}\nFriday responded: eggs and bread"],
+                        [{"timestamp": stamp(month, 10)}, {"timestamp": stamp(month, 20)}])
+
+
+def test_shard_key_is_the_utc_month():
+    assert shard_key(stamp("2026-03", 1)) == "2026-03"
+    assert shard_key(None) == "1970-01"
+
+
+def test_memories_land_in_their_month_and_old_months_are_archived(tmp_path):
+    store = open_store(tmp_path, shard_format="faiss")
+    fill(store)
+    manifest = json.loads((tmp_path / "shards.json").read_text())
+    assert sorted(manifest["shards"]) == MONTHS
+    assert {key: info["format"] for key, info in manifest["shards"].items()} == {
+        "2026-01": "mmap", "2026-02": "mmap", "2026-03": "mmap", "2026-04": "faiss", "2026-05": "faiss"}
+    assert manifest["shards"]["2026-02"]["count"] == 2
+    assert store.stats()["archived"] == 3
+    # archived months keep their documents
+    assert store.search("what happened in 2026 01", k=1)[0][0].page_content.startswith(
+        "User asked: what happened in 2026-01")
+
+
+def test_time_window_only_opens_overlapping_months(tmp_path):
+    fill(open_store(tmp_path))
+    store = open_store(tmp_path)
+    hits = store.search("grocery list", k=10, since=stamp("2026-04", 1))
+    assert {shard_key(doc.metadata["timestamp"]) for doc, _ in hits} == {"2026-04", "2026-05"}
+    assert store.stats()["cold_loads"] == 0
+    hits = store.search("grocery list", k=10, since=stamp("2026-02", 15), until=stamp("2026-02", 25))
+    assert [doc.metadata["timestamp"] for doc, _ in hits] == [stamp("2026-02", 20)]
+    assert store.stats()["cold_loads"] == 1
+
+
+def test_cold_shards_are_evicted_least_recently_used(tmp_path):
+    fill(open_store(tmp_path))
+    store = open_store(tmp_path, cold_shards=2)
+    for month in ("2026-01", "2026-02", "2026-01", "2026-03"):
+        store.search("notes", k=1, since=stamp(month, 1), until=stamp(month, 28))
+    assert store.stats()["cold_open"] == ["2026-01", "2026-03"]
+
+
+@pytest.mark.parametrize("query, widened", [
+    ("what happened in 2026 05 notes for 2026 05", 0),
+    ("what happened in 2026 01 notes for 2026 01", 1),
+])
+def test_search_months_widens_to_older_months_when_recent_hits_are_far(tmp_path, query, widened):
+    fill(open_store(tmp_path))
+    store = open_store(tmp_path, search_months=1, widen_distance=0.5)
+    (doc, distance), = store.search(query, k=1)
+    assert distance <= 0.5
+    assert store.stats()["widened"] == widened
+    assert store.stats()["cold_loads"] == 3 * widened
+
+
+def test_reopened_store_keeps_its_format_and_counts(tmp_path):
+    store = open_store(tmp_path)
+    fill(store)
+    ids = store.ids_after({})
+    reopened = open_store(tmp_path, shard_format="faiss")
+    assert reopened.shard_format == "mmap"
+    assert reopened.count() == 2 * len(MONTHS)
+    assert reopened.ids_after({}) == ids
+    assert reopened.ids_after(reopened.position()) == set()
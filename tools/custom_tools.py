@@ -5,21 +5,50 @@ import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 from langchain_core.tools import Tool
 from config import SPOTIPY_CLIENT_ID, SPOTIPY_CLIENT_SECRET, SPOTIPY_REDIRECT_URI
+from core.cassette import install_http_cassette
 import subprocess
+import threading
+import time
+from config import FRIDAY_SPOTIFY_DEVICES_TTL
+# === Shared HTTP session ===
+# every HTTP call made by the tools goes through this session so it can be
+# recorded/replayed by core/cassette.py
+http = requests.Session()
+install_http_cassette(http)
 # === Spotify Client Setup ===
 try:
     sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
         client_id=SPOTIPY_CLIENT_ID,
         client_secret=SPOTIPY_CLIENT_SECRET,
         redirect_uri=SPOTIPY_REDIRECT_URI,
-        scope="user-read-playback-state user-modify-playback-state user-read-currently-playing"
-    ))
+        scope="user-read-playback-state user-modify-playback-state user-read-currently-playing",
+        requests_session=http
+    ), requests_session=http)
 except Exception as e:
     print(f"[Spotify Auth Error] Please check your credentials. {e}")
     sp = None
+# === Spotify device cache ===
+# the device list is reused for FRIDAY_SPOTIFY_DEVICES_TTL seconds instead of
+# being fetched on every play; core/warmup.py refreshes it ahead of a command
+_devices = {"value": None, "at": 0.0}
+_devices_lock = threading.Lock()
+def refresh_spotify_devices():
+    """Fetch the Spotify device list into the cache and return it."""
+    if not sp:
+        return None
+    devices = sp.devices()
+    with _devices_lock:
+        _devices["value"], _devices["at"] = devices, time.monotonic()
+    return devices
+def spotify_devices():
+    """The cached Spotify device list, refreshed when older than the TTL."""
+    with _devices_lock:
+        if _devices["value"] is not None and time.monotonic() - _devices["at"] < FRIDAY_SPOTIFY_DEVICES_TTL:
+            return _devices["value"]
+    return refresh_spotify_devices()
 def get_location_by_ip():
     try:
-        ip_info = requests.get("https://ipinfo.io").json()
+        ip_info = http.get("https://ipinfo.io").json()
         loc = ip_info["loc"].split(",")
         latitude = float(loc[0])
         longitude = float(loc[1])
@@ -33,7 +62,7 @@ def get_weather(location: str = "auto")-> str:
     try:
         # Using geocoding to find lat/lon for the location string
         geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={location}&count=1"
-        geo_response = requests.get(geo_url).json()
+        geo_response = http.get(geo_url).json()
         if not geo_response.get('results'):
             return f"Could not find location: {location}"
 
@@ -41,7 +70,7 @@ def get_weather(location: str = "auto")-> str:
         lat, lon = loc_data['latitude'], loc_data['longitude']
         
         weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true"
-        response = requests.get(weather_url, timeout=5)
+        response = http.get(weather_url, timeout=5)
         response.raise_for_status() # Raise an exception for bad status codes
         
         data = response.json().get("current_weather", {})
@@ -79,9 +108,10 @@ def play_song_spotify(song_name: str) -> str:
     
     try:
         # Check if there's an active device
-        devices = sp.devices()
+        devices = spotify_devices()
         
         if not devices or not devices.get('devices'):
+            _devices["value"] = None  # look again once the user has opened Spotify
             return "No active Spotify device found. Please open Spotify on your phone, computer, or web player first, then try again."
         
         # Check if any device is active
@@ -119,6 +149,8 @@ def play_song_spotify(song_name: str) -> str:
             
     except Exception as e:
         error_msg = str(e)
+        # the cached device list may be stale: fetch it again next time
+        _devices["value"] = None
         
         # Specific error handling
         if "NO_ACTIVE_DEVICE" in error_msg or "Player command failed" in error_msg:
@@ -179,6 +211,9 @@ app_opening_tool =Tool(
     func = open_app,
     description="Useful for opening an application on Windows. Input should be the name of the application executable, e.g., 'notepad.exe'."
 )
+#tools that change something outside Friday (apps, browser, playback); batch.py
+#swaps them for stand-ins unless told otherwise
+SIDE_EFFECT_TOOLS = {"AppOpener", "SpotifyPlayer", "SpotifyPauser", "WebsiteOpener"}
 #LIST of all tools that the agent can use
 all_tools = [
     weather_tool,
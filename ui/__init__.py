@@ -1,7 +1,7 @@
 # Friday AI — Streamlit frontend package
-from ui.state import init_state, append_message, clear_history
+from ui.state import init_state, append_message, clear_history, load_earlier, unloaded_count
 from ui.styles import inject_css
 from ui.loader import load_llms, load_memory_manager, load_agents
-from ui.router import route_query
-from ui.context import build_agent_input, save_interaction
-from ui.chat import render_message, stream_response, show_thinking_indicator
+from ui.router import route_query, aroute_query
+from ui.context import build_agent_input, abuild_agent_input, save_interaction
+from ui.chat import render_message, render_history, stream_response, show_thinking_indicator
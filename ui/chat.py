@@ -10,6 +10,25 @@ def render_message(role: str, content: str):
         st.markdown(content)
 
 
+def render_history(messages, window: int, on_load_earlier, unloaded: int = 0):
+    """Render the last `window` messages, with a "load earlier" control on top.
+
+    Only full reruns get here — the active turn is drawn by the chat fragment,
+    so the cost of a rerun is bounded by the page window, not the session length.
+    `unloaded` counts older messages still sitting in the session store.
+    """
+    start = max(0, len(messages) - window)
+    if start or unloaded:
+        st.button(
+            f"⬆ Load earlier messages ({start + unloaded} hidden)",
+            key="load_earlier",
+            on_click=on_load_earlier,
+            use_container_width=True,
+        )
+    for msg in messages[start:]:
+        render_message(msg["role"], msg["content"])
+
+
 def stream_response(response_text: str):
     """Simulate token-by-token streaming inside an assistant chat bubble."""
     with st.chat_message("assistant"):
@@ -1,10 +1,7 @@
 """Memory retriever + agent_input builder — mirrors main.py's context injection."""
 
 
-def build_agent_input(user_input: str, memory_manager):
-    """Retrieve relevant past context and format the agent input string."""
-    retriever = memory_manager.get_vector_retriever()
-    docs = retriever.invoke(user_input)
+def _format_agent_input(user_input: str, docs):
     context = "\n".join(doc.page_content for doc in docs)
 
     return (
@@ -14,9 +11,24 @@ def build_agent_input(user_input: str, memory_manager):
     )
 
 
-def save_interaction(user_input: str, response_text: str, memory_manager):
-    """Persist the exchange to vector memory and conversational memory."""
-    memory_manager.save_interaction(user_input, response_text)
+def build_agent_input(user_input: str, memory_manager):
+    """Retrieve relevant past context and format the agent input string."""
+    retriever = memory_manager.get_vector_retriever()
+    return _format_agent_input(user_input, retriever.invoke(user_input))
+
+
+async def abuild_agent_input(user_input: str, memory_manager):
+    """Async variant of build_agent_input (retrieval runs off the event loop)."""
+    retriever = memory_manager.get_vector_retriever()
+    return _format_agent_input(user_input, await retriever.ainvoke(user_input))
+
+
+def save_interaction(user_input: str, response_text: str, memory_manager, **metadata):
+    """Persist the exchange to vector memory and conversational memory.
+
+    `metadata` (session_id, tool, model) is stored alongside the memory.
+    """
+    memory_manager.save_interaction(user_input, response_text, **metadata)
     # also update the short-term conversational memory used by the agent
     memory_manager.conversational_memory.save_context(
         {"input": user_input}, {"output": response_text}
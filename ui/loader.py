@@ -4,6 +4,9 @@ import streamlit as st
 from core.llm_engine import get_flash_llm, get_pro_llm
 from memory.memory_manager import MemoryManager
 from agents.friday_agent import create_friday_agent
+from agents.tool_selector import get_tool_selector
+from agents.fast_path import FastPath
+from core.warmup import get_warmup
 
 
 @st.cache_resource(show_spinner="Loading LLM models…")
@@ -23,6 +26,20 @@ def load_memory_manager():
 @st.cache_resource(show_spinner="Creating agents…")
 def load_agents(_flash_llm, _pro_llm, _memory_manager):
     """Build flash + pro agents. Underscored args tell Streamlit not to hash them."""
-    flash_agent = create_friday_agent(_flash_llm, _memory_manager.conversational_memory)
-    pro_agent = create_friday_agent(_pro_llm, _memory_manager.conversational_memory)
+    tool_selector = get_tool_selector(_memory_manager.embedding_function)
+    flash_agent = create_friday_agent(_flash_llm, _memory_manager.conversational_memory, tool_selector)
+    pro_agent = create_friday_agent(_pro_llm, _memory_manager.conversational_memory, tool_selector)
     return flash_agent, pro_agent
+
+
+@st.cache_resource
+def load_fast_path():
+    """Return the FastPath for tool commands. Cached — one set of hit-rate stats."""
+    return FastPath()
+
+
+@st.cache_resource
+def load_warmup(_flash_llm, _pro_llm, _memory_manager):
+    """Return the Warmup for the LLMs and embeddings, or None when disabled."""
+    # without an embedding model (stand-in memory managers) only the LLMs and tools are warmed
+    return get_warmup((_flash_llm, _pro_llm), getattr(_memory_manager, "embedding_function", None))
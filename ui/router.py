@@ -1,7 +1,13 @@
-"""Wraps the existing select_model routing logic from main.py."""
+"""Wraps the existing select_model routing logic from main.py.
+
+The LLM's choice then passes through the adaptive router, which may serve a
+Pro request with Flash when Pro is too slow or failing right now.
+"""
 
 from langchain_core.prompts import PromptTemplate
 
+from core.adaptive_router import adapt
+
 
 ROUTER_TEMPLATE = """
 You are a decision-making AI that routes user queries to the correct model.
@@ -16,15 +22,24 @@ Respond with only the single word: 'standard' or 'powerful'.
 """
 
 
-def route_query(user_input: str, flash_llm):
-    """Decide whether to use flash or pro model. Returns 'standard' or 'powerful'."""
-    prompt = PromptTemplate(template=ROUTER_TEMPLATE, input_variables=["query"])
-    chain = prompt | flash_llm
-    response = chain.invoke({"query": user_input})
-
+def _parse_decision(response):
     text = response.content if hasattr(response, "content") else str(response)
     decision = text.strip().lower()
 
     if "powerful" in decision:
         return "powerful"
     return "standard"
+
+
+def route_query(user_input: str, flash_llm):
+    """Decide whether to use flash or pro model. Returns 'standard' or 'powerful'."""
+    prompt = PromptTemplate(template=ROUTER_TEMPLATE, input_variables=["query"])
+    chain = prompt | flash_llm
+    return adapt(user_input, _parse_decision(chain.invoke({"query": user_input})))
+
+
+async def aroute_query(user_input: str, flash_llm):
+    """Async variant of route_query for the concurrent serving path."""
+    prompt = PromptTemplate(template=ROUTER_TEMPLATE, input_variables=["query"])
+    chain = prompt | flash_llm
+    return adapt(user_input, _parse_decision(await chain.ainvoke({"query": user_input})))
@@ -1,22 +1,69 @@
 """Session state initialization and chat history helpers."""
 
 import streamlit as st
+from memory.session_store import get_session_store
+
+# messages shown per "load earlier" page of chat history
+PAGE_SIZE = 30
 
 
 def init_state():
     """Set up default session_state keys if they don't exist yet."""
+    if "session_id" not in st.session_state:
+        _open_session()
     if "messages" not in st.session_state:
         st.session_state.messages = []
     if "last_model" not in st.session_state:
         st.session_state.last_model = None
+    if "history_window" not in st.session_state:
+        st.session_state.history_window = PAGE_SIZE
+
+
+def _open_session():
+    """Resume the session named in the URL (?session=...), loading only its
+    newest page of messages. New sessions are created on the first message."""
+    store = get_session_store()
+    requested = st.query_params.get("session")
+    if requested and store.exists(requested):
+        st.session_state.session_id = requested
+        if "messages" not in st.session_state:
+            st.session_state.messages = store.load_page(requested, limit=PAGE_SIZE)
+    else:
+        st.session_state.session_id = None
+
+
+def append_message(role: str, content: str, metadata: dict = None):
+    """Add a message dict to the chat history and persist it to the session store."""
+    store = get_session_store()
+    if st.session_state.session_id is None:
+        st.session_state.session_id = store.create_session(title=content[:80])
+        st.query_params["session"] = st.session_state.session_id
+    seq = store.append(st.session_state.session_id, role, content, metadata)
+    st.session_state.messages.append({"role": role, "content": content, "seq": seq})
+
+
+def unloaded_count() -> int:
+    """Number of older messages still in the store and not yet loaded."""
+    messages = st.session_state.messages
+    return messages[0].get("seq", 0) if messages else 0
 
 
-def append_message(role: str, content: str):
-    """Add a message dict to the chat history."""
-    st.session_state.messages.append({"role": role, "content": content})
+def load_earlier():
+    """Widen the rendered history window by one page, fetching older
+    messages from the session store when the loaded ones run out."""
+    st.session_state.history_window += PAGE_SIZE
+    messages = st.session_state.messages
+    if st.session_state.history_window > len(messages) and unloaded_count():
+        older = get_session_store().load_page(
+            st.session_state.session_id, before_seq=messages[0]["seq"], limit=PAGE_SIZE
+        )
+        st.session_state.messages = older + messages
 
 
 def clear_history():
-    """Wipe chat history and reset model badge."""
+    """Start a fresh session: wipe chat history and reset model badge."""
     st.session_state.messages = []
     st.session_state.last_model = None
+    st.session_state.history_window = PAGE_SIZE
+    st.session_state.session_id = None
+    st.query_params.clear()
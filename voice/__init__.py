@@ -0,0 +1,8 @@
+# Friday AI — voice input package (speech-to-text, streaming recognition, speculative turns, barge-in)
+from voice.streaming import (
+    SAMPLE_RATE, StreamingRecognizer, VoskRecognizer, ScriptedRecognizer,
+    wav_chunks, microphone_chunks, transcribe_stream,
+)
+from voice.speculation import StabilityTracker, SpeculativeTurn
+from voice.bargein import Playback, EnergyVAD, play_with_barge_in, until_silence
+from voice.stt import SpeechToText, GoogleSTT, WhisperSTT, get_stt
@@ -0,0 +1,150 @@
+"""Barge-in: stop spoken answers as soon as the user starts talking.
+
+``play_with_barge_in`` plays a TTS file in a child process (mpg123) while
+reading the microphone in short chunks. An energy-based voice-activity
+detector watches those chunks. Its noise floor is the loudest level heard in
+the first second of playback — the player's start-up and a stretch of
+Friday's own voice through the speakers — so speaker echo does not count as
+speech; speech in that first second is not detected. when the user speaks, playback is killed and the
+audio captured so far — including a short pre-roll, so the first syllable
+is not lost — continues straight into the command recognizer.
+"""
+
+import array
+import math
+import subprocess
+import time
+from collections import deque
+from typing import Iterator, Optional
+
+PLAYER = ("mpg123", "-q")
+
+
+class Playback:
+    """One audio file playing in a child process that can be stopped at any time."""
+
+    def __init__(self, path: str, command: tuple = PLAYER):
+        self.process = subprocess.Popen([*command, path], stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL)
+
+    @property
+    def done(self) -> bool:
+        return self.process.poll() is not None
+
+    def stop(self):
+        if not self.done:
+            self.process.kill()
+        self.process.wait()
+
+    def wait(self):
+        self.process.wait()
+
+
+def rms(chunk: bytes) -> float:
+    """Root-mean-square level of a 16-bit PCM chunk."""
+    samples = array.array("h", chunk[:len(chunk) - len(chunk) % 2])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class EnergyVAD:
+    """Speech when the level stays `ratio` times above the adaptive noise floor
+    (and above `min_rms`) for `speech_chunks` consecutive chunks.
+
+    The floor starts as the peak level of the first `calibration_chunks`
+    chunks (about 1 s of 30 ms chunks), long enough to include speaker echo
+    rather than just the silence before playback starts.
+    """
+
+    def __init__(self, ratio: float = 3.0, min_rms: float = 300.0, speech_chunks: int = 2,
+                 calibration_chunks: int = 33, alpha: float = 0.05):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.speech_chunks = speech_chunks
+        self.calibration_chunks = calibration_chunks
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self.floor = None
+        self.seen = 0
+        self.run = 0
+
+    def is_loud(self, chunk: bytes) -> bool:
+        level = rms(chunk)
+        self.seen += 1
+        if self.floor is None:
+            self.floor = level
+        if self.seen <= self.calibration_chunks:
+            self.floor = max(self.floor, level)
+            return False
+        loud = level > max(self.min_rms, self.ratio * self.floor)
+        if not loud:
+            self.floor += self.alpha * (level - self.floor)
+        return loud
+
+    def __call__(self, chunk: bytes) -> bool:
+        """Feed one chunk; True once speech has started."""
+        self.run = self.run + 1 if self.is_loud(chunk) else 0
+        return self.run >= self.speech_chunks
+
+
+def play_with_barge_in(path: str, chunks: Iterator[bytes], vad: Optional[EnergyVAD] = None,
+                       command: tuple = PLAYER, preroll_chunks: int = 10) -> Optional[Iterator[bytes]]:
+    """Play `path` while watching `chunks` (live microphone audio) for speech.
+
+    Returns None when playback finished uninterrupted (the microphone is
+    released), or, on barge-in, an iterator over the captured audio: the
+    pre-roll followed by the rest of the live stream.
+    """
+    vad = vad or EnergyVAD()
+    player = Playback(path, command)
+    preroll = deque(maxlen=preroll_chunks)
+    interrupted = False
+    try:
+        for chunk in chunks:
+            if player.done:
+                break
+            preroll.append(chunk)
+            if vad(chunk):
+                started = time.perf_counter()
+                player.stop()
+                interrupted = True
+                print(f"[Voice] Barge-in: playback stopped in {(time.perf_counter() - started) * 1000:.0f} ms")
+                return _captured(list(preroll), chunks)
+        return None
+    finally:
+        if not interrupted:
+            player.stop()
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+
+def _captured(preroll: list, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    try:
+        yield from preroll
+        yield from chunks
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def until_silence(chunks: Iterator[bytes], vad: Optional[EnergyVAD] = None,
+                  silence_ms: int = 800, chunk_ms: int = 30, max_seconds: float = 15.0) -> bytes:
+    """Collect audio from `chunks` until `silence_ms` of quiet (or `max_seconds`),
+    for recognizers that need the whole utterance at once. Pass the VAD used
+    during playback to keep its noise floor."""
+    vad = vad or EnergyVAD(ratio=0.0, calibration_chunks=0)
+    quiet_needed = max(1, silence_ms // chunk_ms)
+    captured, quiet = [], 0
+    try:
+        for chunk in chunks:
+            captured.append(chunk)
+            quiet = 0 if vad.is_loud(chunk) else quiet + 1
+            if quiet >= quiet_needed or len(captured) * chunk_ms >= max_seconds * 1000:
+                break
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return b"".join(captured)
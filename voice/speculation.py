@@ -0,0 +1,138 @@
+"""Start routing and retrieval from stable partial transcripts.
+
+While the user is still talking, ``SpeculativeTurn`` watches the partial
+hypotheses. Once a prefix of at least ``min_words`` words has stayed the
+same for ``repeats`` updates, or the whole partial has stopped changing
+(the user paused), it launches the route decision and the memory lookup
+for that text in the background. When the final transcript
+arrives, ``resolve`` reconciles:
+
+* final == speculated text      → both results are reused
+* speculated text is a prefix covering ``reuse_ratio`` of the final words
+                                → retrieval is reused, routing is redone
+                                  (a late "in detail" can change it)
+* otherwise                     → both are recomputed from the final text
+"""
+
+import contextvars
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="friday-speculate")
+
+
+def _words(text: str) -> list:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+class StabilityTracker:
+    """Tracks which words of the partial hypotheses have settled.
+
+    ``stable`` is the prefix that stayed unchanged across the last `repeats`
+    partials, ignoring each partial's last word (recognizers keep revising
+    it). ``paused`` is true once the whole partial has stayed unchanged for
+    `pause_updates` partials, as it does while the recognizer waits out the
+    silence at the end of an utterance.
+    """
+
+    def __init__(self, repeats: int = 2, pause_updates: int = 4):
+        self.repeats = repeats
+        self.pause_updates = pause_updates
+        self.history = []
+
+    def update(self, partial: str) -> tuple:
+        """Record one partial; returns (stable_words, paused)."""
+        self.history = (self.history + [_words(partial)])[-max(self.repeats, self.pause_updates):]
+        recent = self.history[-self.pause_updates:]
+        if len(recent) == self.pause_updates and all(words == recent[0] for words in recent):
+            return list(recent[0]), True
+        if len(self.history) < self.repeats:
+            return [], False
+        stable = []
+        for column in zip(*(words[:-1] for words in self.history[-self.repeats:])):
+            if any(word != column[0] for word in column):
+                break
+            stable.append(column[0])
+        return stable, False
+
+
+class SpeculativeTurn:
+    """Speculative route + retrieval for one utterance."""
+
+    def __init__(self, route_fn: Callable[[str], str], retrieve_fn: Callable[[str], list],
+                 min_words: int = 3, repeats: int = 2, pause_updates: int = 4,
+                 reuse_ratio: float = 0.7, max_speculations: int = 2):
+        self.route_fn = route_fn
+        self.retrieve_fn = retrieve_fn
+        self.min_words = min_words
+        self.reuse_ratio = reuse_ratio
+        self.max_speculations = max_speculations
+        self.tracker = StabilityTracker(repeats, pause_updates)
+        self.speculated = None      # word list the futures were started for
+        self.route_future = None
+        self.retrieve_future = None
+        self.speculations = 0
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _submit(fn, text: str):
+        # carry the caller's context (e.g. its scheduler priority) into the worker
+        return _executor.submit(contextvars.copy_context().run, fn, text)
+
+    def on_partial(self, partial: str):
+        """Feed every partial hypothesis here (safe to call from the audio thread)."""
+        stable, paused = self.tracker.update(partial)
+        if len(stable) < self.min_words:
+            return
+        with self._lock:
+            if stable == self.speculated:
+                return
+            if not paused:
+                # mid-utterance: bounded, and only once the prefix grew meaningfully
+                if self.speculations >= self.max_speculations:
+                    return
+                if self.speculated and stable[:len(self.speculated)] == self.speculated \
+                        and len(stable) < len(self.speculated) + self.min_words:
+                    return
+            # a pause always gets one more try: it is the likeliest final text
+            text = " ".join(stable)
+            self.speculated = stable
+            self.speculations += 1
+            self.route_future = self._submit(self.route_fn, text)
+            self.retrieve_future = self._submit(self.retrieve_fn, text)
+            print(f"[Voice] Speculating on: \"{text}\"")
+
+    def resolve(self, final: str) -> tuple:
+        """Return (route, retrieved_docs) for the final transcript, reusing
+        speculative work where it is still valid."""
+        words = _words(final)
+        with self._lock:
+            speculated = self.speculated
+            route_future, retrieve_future = self.route_future, self.retrieve_future
+
+        same = speculated is not None and speculated == words
+        prefix = (speculated is not None and words[:len(speculated)] == speculated
+                  and len(speculated) >= self.reuse_ratio * len(words))
+
+        if same:
+            route = route_future.result()
+        else:
+            route_future = self._submit(self.route_fn, final)
+        if same or prefix:
+            docs = retrieve_future.result()
+        else:
+            docs = self.retrieve_fn(final)
+        if not same:
+            route = route_future.result()
+
+        self.stats = {"speculations": self.speculations, "route_reused": same,
+                      "retrieval_reused": same or prefix}
+        return route, docs
+
+    def cancel(self):
+        for future in (self.route_future, self.retrieve_future):
+            if future is not None:
+                future.cancel()
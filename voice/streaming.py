@@ -0,0 +1,178 @@
+"""Streaming speech recognition: audio sources, recognizers, partial hypotheses.
+
+A streaming recognizer takes short PCM chunks (16-bit mono) as they arrive
+and reports a growing hypothesis after each one, so downstream work can
+start before the user stops speaking:
+
+* ``VoskRecognizer``     — offline Kaldi models via ``pip install vosk``
+* ``ScriptedRecognizer`` — stand-in that "hears" a known transcript in step
+  with the audio fed to it (a WAV file plus a sidecar ``.txt``), for tests
+  and benchmarks without a speech model
+"""
+
+import array
+import json
+import os
+import time
+import wave
+from typing import Callable, Iterator, Optional
+
+SAMPLE_RATE = 16000
+
+
+# ── audio sources ──────────────────────────────────
+def wav_chunks(path: str, chunk_ms: int = 100, realtime: bool = True, speed: float = 1.0) -> Iterator[bytes]:
+    """Yield a WAV file's frames in `chunk_ms` pieces, paced like a live
+    microphone when `realtime` (`speed` > 1 replays faster)."""
+    with wave.open(path, "rb") as wav:
+        frames = max(1, wav.getframerate() * chunk_ms // 1000)
+        start = time.perf_counter()
+        sent = 0.0
+        while True:
+            data = wav.readframes(frames)
+            if not data:
+                return
+            if realtime:
+                sent += chunk_ms / 1000 / speed
+                delay = start + sent - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            yield data
+
+
+def microphone_chunks(chunk_ms: int = 100, max_seconds: float = 15.0,
+                      sample_rate: int = SAMPLE_RATE) -> Iterator[bytes]:
+    """Yield live microphone audio until the consumer stops or `max_seconds` pass."""
+    import pyaudio
+
+    audio = pyaudio.PyAudio()
+    frames = sample_rate * chunk_ms // 1000
+    stream = audio.open(format=pyaudio.paInt16, channels=1, rate=sample_rate,
+                        input=True, frames_per_buffer=frames)
+    try:
+        for _ in range(int(max_seconds * 1000 / chunk_ms)):
+            yield stream.read(frames, exception_on_overflow=False)
+    finally:
+        stream.stop_stream()
+        stream.close()
+        audio.terminate()
+
+
+# ── recognizers ────────────────────────────────────
+class StreamingRecognizer:
+    """Interface: feed chunks, get (hypothesis, is_final) back."""
+
+    def accept(self, chunk: bytes) -> tuple:
+        """Consume one chunk; return the current hypothesis and whether the
+        recognizer has detected the end of the utterance."""
+        raise NotImplementedError
+
+    def finish(self) -> str:
+        """Final transcript for the audio fed so far (when the source ran out)."""
+        raise NotImplementedError
+
+    def reset(self):
+        """Forget the current utterance."""
+
+
+class VoskRecognizer(StreamingRecognizer):
+    """Offline streaming recognition with a Vosk (Kaldi) model, loaded once."""
+
+    _models = {}
+
+    def __init__(self, model_path: str, sample_rate: int = SAMPLE_RATE):
+        try:
+            from vosk import KaldiRecognizer, Model, SetLogLevel
+        except ImportError as e:
+            raise ImportError("Streaming STT needs `pip install vosk` and a model from "
+                              "https://alphacephei.com/vosk/models") from e
+        SetLogLevel(-1)
+        if model_path not in self._models:
+            print(f"[Voice] Loading Vosk model from {model_path}...")
+            self._models[model_path] = Model(model_path)
+        self._factory = lambda: KaldiRecognizer(self._models[model_path], sample_rate)
+        self._recognizer = self._factory()
+
+    def accept(self, chunk):
+        if self._recognizer.AcceptWaveform(chunk):
+            return json.loads(self._recognizer.Result()).get("text", ""), True
+        return json.loads(self._recognizer.PartialResult()).get("partial", ""), False
+
+    def finish(self):
+        return json.loads(self._recognizer.FinalResult()).get("text", "")
+
+    def reset(self):
+        self._recognizer = self._factory()
+
+
+class ScriptedRecognizer(StreamingRecognizer):
+    """Stand-in recognizer that reveals a known transcript as audio arrives.
+
+    Words are spread evenly over the first `speech_fraction` of `duration`
+    seconds of audio; the rest plays the part of the trailing pause a real
+    recognizer waits out before ending the utterance. The newest word of a
+    partial is shown half-heard (truncated) like a real recognizer revising
+    its hypothesis, and the utterance ends when `duration` seconds have been
+    fed (or at ``finish()``).
+    """
+
+    def __init__(self, transcript: str, duration: float, sample_rate: int = SAMPLE_RATE,
+                 speech_fraction: float = 0.8):
+        self.words = transcript.split()
+        self.duration = duration
+        self.speech = duration * speech_fraction
+        self.bytes_per_second = sample_rate * 2
+        self.fed = 0
+
+    @classmethod
+    def for_wav(cls, path: str, silence: int = 500) -> "ScriptedRecognizer":
+        """Recognizer for `clip.wav`, using the transcript in `clip.txt`.
+
+        Speech is taken to end at the last sample louder than `silence`.
+        """
+        with wave.open(path, "rb") as wav:
+            rate = wav.getframerate()
+            samples = array.array("h", wav.readframes(wav.getnframes()))
+        last = next((i for i in range(len(samples) - 1, -1, -1) if abs(samples[i]) > silence), len(samples))
+        duration = len(samples) / rate
+        with open(os.path.splitext(path)[0] + ".txt", encoding="utf-8") as f:
+            return cls(f.read().strip(), duration, rate,
+                       speech_fraction=max(0.01, (last + 1) / max(1, len(samples))))
+
+    def accept(self, chunk):
+        self.fed += len(chunk)
+        heard = self.fed / self.bytes_per_second
+        if heard >= self.duration:
+            return " ".join(self.words), True
+        exact = len(self.words) * min(1.0, heard / self.speech)
+        count = int(exact)
+        partial = self.words[:count]
+        if count < len(self.words) and exact - count >= 0.5:
+            word = self.words[count]
+            partial.append(word[:max(1, len(word) // 2)])
+        return " ".join(partial), False
+
+    def finish(self):
+        return " ".join(self.words)
+
+    def reset(self):
+        self.fed = 0
+
+
+def transcribe_stream(chunks: Iterator[bytes], recognizer: StreamingRecognizer,
+                      on_partial: Optional[Callable[[str], None]] = None) -> str:
+    """Run `chunks` through `recognizer`, calling `on_partial` with the partial
+    hypothesis after every chunk (repeats included: an unchanged partial is
+    how stability shows), and return the final transcript."""
+    try:
+        for chunk in chunks:
+            text, final = recognizer.accept(chunk)
+            if final:
+                return text
+            if text and on_partial is not None:
+                on_partial(text)
+        return recognizer.finish()
+    finally:
+        recognizer.reset()
+        if hasattr(chunks, "close"):
+            chunks.close()
@@ -0,0 +1,138 @@
+"""Speech-to-text backends for one-shot voice commands.
+
+``listen()`` hands each finished utterance (16-bit mono PCM) to the backend
+chosen with ``FRIDAY_STT_BACKEND``:
+
+* ``google``  — ``recognize_google`` (network, rate-limited); recorded to and
+                replayed from the cassette when ``FRIDAY_CASSETTE_MODE`` is set
+* ``whisper`` — faster-whisper on the CPU, in-process and offline. The model
+                (``FRIDAY_WHISPER_MODEL``) is loaded once and stays warm;
+                ``FRIDAY_STT_THREADS`` sets its CPU threads and
+                ``FRIDAY_STT_BATCH_SIZE`` > 1 decodes the segments of long
+                recordings in batches
+"""
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from config import (
+    FRIDAY_STT_BACKEND,
+    FRIDAY_WHISPER_MODEL,
+    FRIDAY_STT_THREADS,
+    FRIDAY_STT_BATCH_SIZE,
+)
+from core.cassette import Cassette, get_cassette
+from voice.streaming import SAMPLE_RATE
+
+
+class SpeechToText:
+    """Interface: PCM audio in, transcript out."""
+
+    name = "base"
+
+    def transcribe(self, pcm: bytes, sample_rate: int = SAMPLE_RATE) -> str:
+        raise NotImplementedError
+
+    def transcribe_many(self, clips: list, sample_rate: int = SAMPLE_RATE) -> list:
+        """Transcribe several utterances (in order)."""
+        return [self.transcribe(pcm, sample_rate) for pcm in clips]
+
+
+class GoogleSTT(SpeechToText):
+    """The Google Web Speech API via speech_recognition (the original path)."""
+
+    name = "google"
+
+    def __init__(self, language: str = "en-in", cassette: Optional[Cassette] = None):
+        self.language = language
+        self.cassette = cassette if cassette is not None else get_cassette()
+
+    def transcribe(self, pcm, sample_rate=SAMPLE_RATE):
+        key = hashlib.sha1(pcm).hexdigest()
+        if self.cassette is not None and self.cassette.mode == "replay":
+            entry = self.cassette.replay("stt", key)
+            self.cassette.delay(entry)
+            return entry["response"]["text"]
+
+        import speech_recognition as sr
+
+        start = time.perf_counter()
+        try:
+            text = sr.Recognizer().recognize_google(sr.AudioData(pcm, sample_rate, 2), language=self.language)
+        except sr.UnknownValueError:
+            text = ""
+        if self.cassette is not None:
+            self.cassette.record("stt", key, {"language": self.language, "seconds": len(pcm) / 2 / sample_rate},
+                                 {"text": text}, time.perf_counter() - start)
+        return text
+
+
+class WhisperSTT(SpeechToText):
+    """faster-whisper (CTranslate2) on the CPU with int8 weights."""
+
+    name = "whisper"
+
+    def __init__(self, model: str = FRIDAY_WHISPER_MODEL, threads: int = FRIDAY_STT_THREADS,
+                 batch_size: int = FRIDAY_STT_BATCH_SIZE, workers: int = 1,
+                 compute_type: str = "int8", beam_size: int = 1, language: str = "en"):
+        try:
+            from faster_whisper import BatchedInferencePipeline, WhisperModel
+        except ImportError as e:
+            raise ImportError("The whisper STT backend needs `pip install faster-whisper`") from e
+        print(f"[Voice] Loading Whisper model '{model}' ({threads or 'default'} threads)...")
+        start = time.perf_counter()
+        self.model = WhisperModel(model, device="cpu", compute_type=compute_type,
+                                  cpu_threads=threads, num_workers=workers)
+        self.load_seconds = time.perf_counter() - start
+        self.batched = BatchedInferencePipeline(self.model) if batch_size > 1 else None
+        self.batch_size = batch_size
+        self.workers = workers
+        self.beam_size = beam_size
+        self.language = language
+
+    @staticmethod
+    def _samples(pcm: bytes, sample_rate: int):
+        import numpy as np
+
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        if sample_rate != SAMPLE_RATE:
+            positions = np.arange(0, len(audio), sample_rate / SAMPLE_RATE)
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+        return audio
+
+    def transcribe(self, pcm, sample_rate=SAMPLE_RATE):
+        audio = self._samples(pcm, sample_rate)
+        if self.batched is not None:
+            segments, _ = self.batched.transcribe(audio, language=self.language, beam_size=self.beam_size,
+                                                  batch_size=self.batch_size)
+        else:
+            segments, _ = self.model.transcribe(audio, language=self.language, beam_size=self.beam_size,
+                                                vad_filter=True, condition_on_previous_text=False)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+    def transcribe_many(self, clips, sample_rate=SAMPLE_RATE):
+        """Transcribe utterances concurrently on `workers` model workers."""
+        if self.workers <= 1:
+            return super().transcribe_many(clips, sample_rate)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda pcm: self.transcribe(pcm, sample_rate), clips))
+
+
+BACKENDS = {"google": GoogleSTT, "whisper": WhisperSTT}
+
+_stt = {}
+_stt_lock = threading.Lock()
+
+
+def get_stt(backend: Optional[str] = None) -> SpeechToText:
+    """Return the process-wide STT backend (created, and its model loaded, once)."""
+    backend = (backend or FRIDAY_STT_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown STT backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    with _stt_lock:
+        if backend not in _stt:
+            _stt[backend] = BACKENDS[backend]()
+        return _stt[backend]